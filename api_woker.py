@@ -1,37 +1,101 @@
+import time
 import requests
-from PySide6.QtCore import QObject, Signal, QBuffer, QByteArray, QIODevice
+from PySide6.QtCore import QObject, Signal
 from config import API_BASE_URL, API_TIMEOUT
+from services.result_cache import get_result_cache, make_cache_key
+from services.network_profile import get_network_profiler, encode_for_upload
+from services.preprocessing import preprocess_frame, frame_digest
+from services.resilience import RetryPolicy, CircuitOpenError, get_circuit_breaker
+
+class EncodingError(Exception):
+    pass
+
 
 class ApiWorker(QObject):
     finished = Signal(dict)
     error = Signal(str)
 
-    def __init__(self, screening_type, patient_data, image_pixmap):
+    def __init__(self, screening_type, patient_data, image_frame):
         super().__init__()
         self.screening_type = screening_type
         self.patient_data = patient_data
-        self.image_pixmap = image_pixmap
+        # Frame RGB (numpy) yang tidak diubah lagi oleh pemanggil
+        self.image_frame = image_frame
+        self.encoded_image = None
+        self.network_profile = None
+        self.sent_size = None
 
-    def run(self):
+    def post_image(self, api_url, form_data, files, timeout=API_TIMEOUT):
+        profiler = get_network_profiler()
+        size = len(self.encoded_image)
+        started = time.perf_counter()
         try:
-            byte_array = QByteArray()
-            buffer = QBuffer(byte_array)
-            buffer.open(QIODevice.WriteOnly)
+            response = requests.post(api_url, data=form_data, files=files, timeout=timeout)
+        except requests.exceptions.Timeout:
+            # Durasi sebenarnya minimal sebesar timeout
+            profiler.record_transfer(size, timeout)
+            raise
+        profiler.record_transfer(size, time.perf_counter() - started)
+        response.raise_for_status()
+        return response.json()
 
-            if not self.image_pixmap.save(buffer, "PNG"):
-                self.error.emit("Gagal mengkonversi gambar ke format PNG.")
-                return
+    def analyze(self, digest, form_data):
+        """Prapemrosesan, encode sesuai profil jaringan, lalu kirim ke server.
 
-            api_url = f"{API_BASE_URL}/api/{self.screening_type}"
-            form_data = self.patient_data.copy()
-            files = {'image': ('screening.png', byte_array.data(), 'image/png')}
+        Mengembalikan entri cache: respons server beserta gambar yang dikirim,
+        ukurannya, dan profil jaringan, agar hit/coalesced tetap lengkap.
+        """
+        # Normalisasi warna/pencahayaan per jenis screening sebelum di-encode
+        frame = preprocess_frame(self.image_frame, self.screening_type, digest=digest)
+        profiler = get_network_profiler()
+        height, width = frame.shape[:2]
+        profile = profiler.choose_profile(width, height)
+        self.encoded_image, filename, mime, self.sent_size = encode_for_upload(frame, profile)
+        if self.encoded_image is None:
+            raise EncodingError("Gagal mengkonversi gambar untuk dikirim.")
+        self.network_profile = profile["name"]
+        profiler.record_encoding(profile, self.sent_size[0] * self.sent_size[1], len(self.encoded_image))
+        timeout = profiler.timeout_for(profile, width, height)
 
-            response = requests.post(api_url, data=form_data, files=files, timeout=API_TIMEOUT)
-            response.raise_for_status()
+        api_url = f"{API_BASE_URL}/api/{self.screening_type}"
+        files = {'image': (filename, self.encoded_image, mime)}
+        # POST analisis tidak diulang jika mungkin sudah sampai ke server
+        retry_policy = RetryPolicy(idempotent=False)
+        breaker = get_circuit_breaker()
+        response = retry_policy.call(lambda: self.post_image(api_url, form_data, files, timeout), breaker)
+        return {
+            "response": response,
+            "encoded_image": self.encoded_image,
+            "sent_size": self.sent_size,
+            "network_profile": self.network_profile,
+        }
 
-            result = response.json()
+    def run(self):
+        try:
+            form_data = self.patient_data.copy()
+            # Kunci dari tangkapan mentah: cache hit tidak perlu prapemrosesan/encode
+            digest = frame_digest(self.image_frame)
+            cache_key = make_cache_key(digest, self.screening_type)
+            entry, cache_source = get_result_cache().get_or_compute(
+                cache_key, lambda: self.analyze(digest, form_data)
+            )
+            result = entry["response"]
+            self.encoded_image = entry["encoded_image"]
+            self.sent_size = entry["sent_size"]
+            self.network_profile = entry["network_profile"]
+            if cache_source != "miss":
+                # Hasil dari cache bisa berasal dari kiriman pasien lain
+                result["user"] = {**result.get("user", {}), **form_data}
+            result["cache"] = cache_source
+            result["network_profile"] = self.network_profile
             self.finished.emit(result)
 
+        except EncodingError as e:
+            self.error.emit(str(e))
+        except CircuitOpenError:
+            wait = int(get_circuit_breaker().retry_after())
+            hint = f"Coba lagi dalam {wait} detik." if wait else "Coba lagi sebentar lagi."
+            self.error.emit(f"Server analisis sedang tidak dapat dihubungi. {hint}")
         except requests.exceptions.Timeout:
             self.error.emit("Permintaan timeout. Pastikan server API sedang berjalan dan jaringan stabil.")
         except requests.exceptions.ConnectionError:
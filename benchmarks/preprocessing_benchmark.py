@@ -0,0 +1,179 @@
+"""Benchmark prapemrosesan gambar MedScan per tahap dan per jenis screening.
+
+Mengukur biaya setiap tahap di PREPROCESSING_PIPELINES (cache dimatikan) pada
+beberapa resolusi tangkapan, ditambah biaya hash input dan pipeline penuh saat
+gambar yang sama dikirim ulang (cache hit). Jalankan di perangkat kiosk (ARM)
+untuk mengetahui biaya sebenarnya; arsitektur mesin dicatat di laporan.
+
+Contoh:
+    python benchmarks/preprocessing_benchmark.py
+    python benchmarks/preprocessing_benchmark.py --sizes 640x480,1280x960 --output prep.json
+    python benchmarks/preprocessing_benchmark.py --compare prep.json
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+import statistics
+import subprocess
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+os.chdir(ROOT_DIR)
+
+import cv2  # noqa: E402
+import numpy as np  # noqa: E402
+
+from config import PREPROCESSING_PIPELINES  # noqa: E402
+from services.preprocessing import (  # noqa: E402
+    STAGES, StageCache, PreprocessingPipeline, frame_digest, worth_caching
+)
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT_DIR, stderr=subprocess.DEVNULL
+        ).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def summarize(samples):
+    ordered = sorted(samples)
+    return {
+        "median_ms": round(statistics.median(ordered), 3),
+        "p90_ms": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.9))], 3),
+        "min_ms": round(ordered[0], 3),
+        "runs": len(ordered),
+    }
+
+
+def measure(fn, repeat):
+    # Satu panggilan pemanasan (alokasi thread pool OpenCV, dsb.) tidak dihitung
+    fn()
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    return summarize(samples)
+
+
+def synthetic_frame(screening_type, width, height, seed=0):
+    """Frame RGB dengan gradasi, pencahayaan kekuningan, noise sensor, dan kartu netral."""
+    rng = np.random.default_rng(seed)
+    y, x = np.mgrid[0:height, 0:width].astype(np.float32)
+    frame = np.dstack([
+        150 + 60 * x / width,
+        120 + 50 * y / height,
+        90 + 30 * (x + y) / (width + height),
+    ])
+    frame += rng.normal(0, 6, frame.shape)
+    if screening_type == "diabetic_retinopathy":
+        mask = np.zeros((height, width), dtype=np.uint8)
+        cv2.circle(mask, (width // 2, height // 2), int(0.45 * min(width, height)), 1, -1)
+        frame *= mask[:, :, None]
+    else:
+        frame[int(0.03 * height):int(0.12 * height), int(0.03 * width):int(0.12 * width)] = (215, 185, 150)
+    frame = np.clip(frame, 0, 255).astype(np.uint8)
+    frame.flags.writeable = False
+    return frame
+
+
+def parse_sizes(text):
+    sizes = []
+    for item in text.split(","):
+        width, height = item.lower().split("x")
+        sizes.append((int(width), int(height)))
+    return sizes
+
+
+def run_benchmarks(sizes, repeat):
+    metrics = {}
+    for width, height in sizes:
+        label = f"{width}x{height}"
+        frame = synthetic_frame("anemia", width, height)
+        metrics[f"hash.{label}"] = measure(lambda: frame_digest(frame), repeat)
+
+        for screening_type, stages in PREPROCESSING_PIPELINES.items():
+            frame = synthetic_frame(screening_type, width, height)
+            prefix = f"{screening_type}.{label}"
+
+            # Setiap tahap diukur pada input yang sama seperti saat pipeline berjalan
+            current = frame
+            for spec in stages:
+                params = dict(spec)
+                name = params.pop("stage")
+                stage_input = current
+                metrics[f"{prefix}.{name}"] = measure(lambda: STAGES[name](stage_input, **params), repeat)
+                current = STAGES[name](stage_input, **params)
+
+            uncached = PreprocessingPipeline(stages)
+            metrics[f"{prefix}.total"] = measure(lambda: uncached.run(frame), repeat)
+
+            # Pipeline murah tidak memakai cache di aplikasi (lihat worth_caching)
+            if worth_caching(stages):
+                cached = PreprocessingPipeline(stages, StageCache())
+                cached.run(frame)
+                metrics[f"{prefix}.cache_hit"] = measure(lambda: cached.run(frame), repeat)
+    return metrics
+
+
+def build_report(metrics, sizes, repeat):
+    return {
+        "commit": git_commit(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "python": platform.python_version(),
+        "opencv": cv2.__version__,
+        "opencv_threads": cv2.getNumThreads(),
+        "sizes": [f"{width}x{height}" for width, height in sizes],
+        "repeat": repeat,
+        "metrics": metrics,
+    }
+
+
+def print_report(report, baseline=None):
+    print(f"MedScan preprocessing benchmark @ {report['commit']} "
+          f"({report['machine']}, OpenCV {report['opencv']}, {report['opencv_threads']} thread)")
+    print(f"{'metrik':<48}{'median':>10}{'p90':>10}{'delta':>10}")
+    for name, values in report["metrics"].items():
+        delta = ""
+        if baseline and name in baseline.get("metrics", {}):
+            old = baseline["metrics"][name]["median_ms"]
+            if old:
+                delta = f"{(values['median_ms'] - old) / old * 100:+.1f}%"
+        print(f"{name:<48}{values['median_ms']:>10.2f}{values['p90_ms']:>10.2f}{delta:>10}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="640x480,1280x960,1920x1080", help="resolusi tangkapan, dipisah koma")
+    parser.add_argument("--repeat", type=int, default=10, help="jumlah pengulangan per metrik")
+    parser.add_argument("--threads", type=int, help="batasi thread OpenCV (mis. 1 untuk meniru core tunggal)")
+    parser.add_argument("--output", help="tulis laporan JSON ke file ini")
+    parser.add_argument("--compare", help="laporan JSON sebelumnya untuk dibandingkan")
+    args = parser.parse_args()
+
+    if args.threads is not None:
+        cv2.setNumThreads(args.threads)
+    sizes = parse_sizes(args.sizes)
+    report = build_report(run_benchmarks(sizes, max(1, args.repeat)), sizes, args.repeat)
+
+    baseline = None
+    if args.compare:
+        with open(args.compare, "r") as f:
+            baseline = json.load(f)
+    print_report(report, baseline)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,342 @@
+"""Soak test MedScan: ribuan siklus screening penuh tanpa layar untuk mendeteksi kebocoran.
+
+MainWindow dijalankan dengan QT_QPA_PLATFORM=offscreen, kamera sintetis
+menggantikan cv2.VideoCapture, dan analisis dikirim ke tools/stub_server.py.
+Setiap siklus berjalan lewat sinyal yang sama dengan yang dipicu operator
+(pilih screening -> isi data -> ambil gambar -> hasil -> kembali), bergantian
+mode tunggal, antrian, dan screening gabungan. RSS, jumlah QObject, thread, dan
+file descriptor dicatat berkala; skrip keluar dengan kode 1 jika pertumbuhan
+setelah pemanasan melewati ambang.
+
+Contoh:
+    python benchmarks/soak_test.py --cycles 2000
+    python benchmarks/soak_test.py --cycles 500 --output soak.json --max-rss-growth-mb 30
+"""
+import os
+import gc
+import sys
+import json
+import time
+import shutil
+import argparse
+import resource
+import tempfile
+import threading
+import statistics
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+os.chdir(ROOT_DIR)
+
+from tools.stub_server import start_in_background  # noqa: E402
+
+PATIENTS = [
+    {"name": "Budi Santoso", "age": "30", "gender": "male"},
+    {"name": "Siti Aminah", "age": "8", "gender": "female"},
+    {"name": "Andi", "age": "5", "gender": "male"},
+]
+SCREENING_TYPES = ["anemia", "malnutrisi", "diabetic_retinopathy"]
+
+
+class SyntheticCapture:
+    """Pengganti cv2.VideoCapture: frame bergradasi dengan objek bergerak."""
+
+    instances = 0
+    FRAME_INTERVAL = 1 / 30
+
+    def __init__(self, index=0, width=640, height=480):
+        import numpy as np
+        SyntheticCapture.instances += 1
+        self.np = np
+        self.opened = True
+        self.count = 0
+        y, x = np.mgrid[0:height, 0:width]
+        self.base = np.dstack([(x * 255 // width), (y * 255 // height), np.full_like(x, 96)]).astype(np.uint8)
+        self.seed = SyntheticCapture.instances
+        self.next_frame_at = 0.0
+
+    def isOpened(self):
+        return self.opened
+
+    def read(self, image=None):
+        np = self.np
+        if not self.opened:
+            return False, None
+        # Seperti kamera sungguhan, read() menunggu frame berikutnya (~30 fps)
+        now = time.monotonic()
+        if now < self.next_frame_at:
+            time.sleep(self.next_frame_at - now)
+        self.next_frame_at = max(now, self.next_frame_at) + self.FRAME_INTERVAL
+        if image is None or image.shape != self.base.shape:
+            image = np.empty_like(self.base)
+        np.copyto(image, self.base)
+        self.count += 1
+        # Posisi berubah tiap frame agar hasil encode tidak pernah kena cache
+        offset = (self.count * 7 + self.seed * 131) % 400
+        image[120:240, offset:offset + 120] = (self.seed * 37 % 255, self.count % 255, 200)
+        return True, image
+
+    def get(self, prop):
+        return 30.0
+
+    def set(self, prop, value):
+        return True
+
+    def release(self):
+        self.opened = False
+
+
+def read_rss_mb():
+    try:
+        with open("/proc/self/statm") as f:
+            pages = int(f.read().split()[1])
+        return pages * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    except (OSError, ValueError):
+        # Fallback non-Linux: puncak RSS (ru_maxrss dalam KB di Linux, byte di macOS)
+        usage = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return usage / (1024 * 1024) if sys.platform == "darwin" else usage / 1024
+
+
+def count_threads():
+    try:
+        return len(os.listdir("/proc/self/task"))
+    except OSError:
+        return threading.active_count()
+
+
+def count_fds():
+    for path in ("/proc/self/fd", "/dev/fd"):
+        try:
+            return len(os.listdir(path))
+        except OSError:
+            continue
+    return -1
+
+
+def count_qobjects(app):
+    from PySide6.QtCore import QObject
+    tree = set()
+    for widget in app.topLevelWidgets():
+        tree.add(widget)
+        tree.update(widget.findChildren(QObject))
+    wrappers = sum(1 for obj in gc.get_objects() if isinstance(obj, QObject))
+    return len(tree), wrappers
+
+
+class SoakRunner:
+    def __init__(self, app, window, step_timeout):
+        self.app = app
+        self.window = window
+        self.step_timeout = step_timeout
+
+    def process_events(self):
+        from PySide6.QtCore import QEvent
+        self.app.processEvents()
+        # Tanpa app.exec() deleteLater tidak pernah dijalankan; kirim manual
+        # agar objek yang memang sudah dilepas tidak terhitung bocor
+        self.app.sendPostedEvents(None, QEvent.DeferredDelete)
+
+    def pump(self, condition, step):
+        deadline = time.monotonic() + self.step_timeout
+        while not condition():
+            if time.monotonic() > deadline:
+                raise RuntimeError(f"Macet di langkah '{step}'")
+            self.process_events()
+            time.sleep(0.002)
+        self.process_events()
+
+    def capture_current(self):
+        page = self.window.capture_page
+        self.pump(lambda: page.camera_active() and page.capture_button.isEnabled(), "buka kamera")
+        page.on_capture_clicked()
+        self.pump(lambda: page.captured_frame is not None, "ambil gambar")
+
+    def single_cycle(self, screening_type, patient):
+        window = self.window
+        window.menu_page.startScreening.emit(screening_type)
+        window.input_page.dataSubmitted.emit(dict(patient))
+        self.capture_current()
+        window.capture_page.on_next_clicked()
+        result_page = window.result_page
+        self.pump(lambda: result_page.status_text_label.text() != "Menganalisis...", "hasil analisis")
+        self.pump(lambda: result_page.api_thread is None, "thread analisis selesai")
+        result_page.goHomeClicked.emit()
+
+    def queued_cycle(self, screening_type, patient):
+        window = self.window
+        queue = window.analysis_queue
+        window.menu_page.startScreening.emit(screening_type)
+        window.input_page.dataSubmitted.emit(dict(patient))
+        self.capture_current()
+        window.capture_page.on_queue_clicked()
+        self.pump(lambda: queue.in_flight_count() == 0 and queue.pending_count() == 0, "antrian selesai")
+        window.navigate_to_home_and_reset()
+
+    def multi_cycle(self, patient):
+        window = self.window
+        queue = window.session_queue
+        window.menu_page.startMultiScreening.emit(list(SCREENING_TYPES))
+        window.input_page.dataSubmitted.emit(dict(patient))
+        for _ in SCREENING_TYPES:
+            self.capture_current()
+            window.capture_page.on_next_clicked()
+        self.pump(lambda: queue.in_flight_count() == 0 and queue.pending_count() == 0, "screening gabungan")
+        window.multi_result_page.goHomeClicked.emit()
+
+    def history_visit(self):
+        self.window.navigate_to_history()
+        self.process_events()
+        self.window.history_page.backClicked.emit()
+
+    def run_cycle(self, index):
+        patient = PATIENTS[index % len(PATIENTS)]
+        screening_type = SCREENING_TYPES[index % len(SCREENING_TYPES)]
+        if index % 7 == 6:
+            self.multi_cycle(patient)
+            return "multi"
+        if index % 5 == 4:
+            self.queued_cycle(screening_type, patient)
+            return "queued"
+        self.single_cycle(screening_type, patient)
+        if index % 50 == 49:
+            self.history_visit()
+        return "single"
+
+
+def sample(runner, cycle, started):
+    app = runner.app
+    runner.process_events()
+    gc.collect()
+    qobjects_tree, qobjects_python = count_qobjects(app)
+    return {
+        "cycle": cycle,
+        "elapsed_s": round(time.monotonic() - started, 1),
+        "rss_mb": round(read_rss_mb(), 1),
+        "qobjects_tree": qobjects_tree,
+        "qobjects_python": qobjects_python,
+        "threads": count_threads(),
+        "fds": count_fds(),
+    }
+
+
+def stable_value(samples, key):
+    """Median beberapa sampel agar lonjakan sesaat tidak dianggap kebocoran."""
+    return statistics.median(s[key] for s in samples)
+
+
+def evaluate(samples, warmup_index, thresholds):
+    baseline = samples[warmup_index:warmup_index + 3]
+    final = samples[-3:]
+    failures = []
+    growth = {}
+    for key, limit in thresholds.items():
+        delta = stable_value(final, key) - stable_value(baseline, key)
+        growth[key] = round(delta, 1)
+        if delta > limit:
+            failures.append(f"{key} naik {delta:.1f} (batas {limit})")
+    return growth, failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--cycles", type=int, default=2000, help="jumlah siklus screening")
+    parser.add_argument("--warmup", type=int, default=50, help="siklus pemanasan sebelum baseline")
+    parser.add_argument("--sample-every", type=int, default=50, help="interval pengambilan sampel (siklus)")
+    parser.add_argument("--latency", type=float, default=0.02, help="latensi stub server (detik)")
+    parser.add_argument("--step-timeout", type=float, default=30.0, help="batas waktu tiap langkah (detik)")
+    parser.add_argument("--max-rss-growth-mb", type=float, default=40.0)
+    parser.add_argument("--max-qobject-growth", type=int, default=50)
+    parser.add_argument("--max-thread-growth", type=int, default=4)
+    parser.add_argument("--max-fd-growth", type=int, default=8)
+    parser.add_argument("--output", help="tulis deret sampel dan ringkasan ke file JSON")
+    args = parser.parse_args()
+
+    server, base_url = start_in_background(latency=args.latency)
+    os.environ["MEDSCAN_API_BASE_URL"] = base_url
+
+    import cv2
+    import config
+
+    tmp_dir = tempfile.mkdtemp(prefix="medscan-soak-")
+    config.DATA_DIR = tmp_dir
+    config.HISTORY_DB_PATH = os.path.join(tmp_dir, "history.db")
+    config.HISTORY_IMAGE_DIR = os.path.join(tmp_dir, "images")
+    config.THUMBNAIL_CACHE_DIR = os.path.join(tmp_dir, "thumbnails")
+    config.REPORT_OUTPUT_DIR = os.path.join(tmp_dir, "reports")
+    config.CAMERA_METRICS_PATH = os.path.join(tmp_dir, "camera_metrics.json")
+    config.PREVIEW_SUSPEND_WHEN_INACTIVE = False
+    config.SYNC_INTERVAL_MS = 10 * 1000
+    cv2.VideoCapture = SyntheticCapture
+
+    from PySide6.QtWidgets import QApplication
+    app = QApplication.instance() or QApplication(sys.argv)
+    with open("assets/style.qss", "r") as f:
+        app.setStyleSheet(f.read())
+
+    from main_window import MainWindow
+
+    window = MainWindow()
+    window.show()
+    runner = SoakRunner(app, window, args.step_timeout)
+
+    samples = []
+    modes = {}
+    failures = []
+    started = time.monotonic()
+    warmup_index = None
+    try:
+        for cycle in range(args.cycles):
+            mode = runner.run_cycle(cycle)
+            modes[mode] = modes.get(mode, 0) + 1
+            done = cycle + 1
+            if done == args.warmup or (done > args.warmup and done % args.sample_every == 0) or done == args.cycles:
+                if done >= args.warmup and warmup_index is None:
+                    warmup_index = len(samples)
+                samples.append(sample(runner, done, started))
+                s = samples[-1]
+                print(f"siklus {done:>6}  rss {s['rss_mb']:>7.1f} MB  qobject {s['qobjects_tree']:>5}/"
+                      f"{s['qobjects_python']:<5}  thread {s['threads']:>3}  fd {s['fds']:>4}", flush=True)
+    except RuntimeError as e:
+        failures.append(str(e))
+    finally:
+        window.close()
+        app.processEvents()
+        server.shutdown()
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    growth = {}
+    if warmup_index is not None and len(samples) - warmup_index >= 2:
+        growth, limit_failures = evaluate(samples, warmup_index, {
+            "rss_mb": args.max_rss_growth_mb,
+            "qobjects_tree": args.max_qobject_growth,
+            "qobjects_python": args.max_qobject_growth,
+            "threads": args.max_thread_growth,
+            "fds": args.max_fd_growth,
+        })
+        failures.extend(limit_failures)
+    else:
+        print("Sampel setelah pemanasan kurang dari dua; pertumbuhan tidak dievaluasi.")
+
+    summary = {
+        "cycles": sum(modes.values()),
+        "modes": modes,
+        "duration_s": round(time.monotonic() - started, 1),
+        "growth": growth,
+        "failures": failures,
+        "samples": samples,
+    }
+    print(f"Selesai {summary['cycles']} siklus {modes} dalam {summary['duration_s']} s; pertumbuhan {growth}")
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(summary, f, indent=2)
+
+    if failures:
+        print("GAGAL: " + "; ".join(failures))
+        sys.exit(1)
+    print("OK")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,231 @@
+"""Benchmark UI MedScan tanpa layar (QT_QPA_PLATFORM=offscreen).
+
+Mengukur waktu konstruksi setiap halaman di MainWindow.init_pages, latensi
+pindah halaman di QStackedWidget, waktu repaint penuh per halaman, dan waktu
+update ScreeningResultPage untuk payload on_analysis_finished sintetis.
+
+Contoh:
+    python benchmarks/ui_benchmark.py --output bench.json
+    python benchmarks/ui_benchmark.py --append benchmarks/ui_history.jsonl
+    python benchmarks/ui_benchmark.py --compare bench.json
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import platform
+import tempfile
+import statistics
+import subprocess
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+os.chdir(ROOT_DIR)
+
+import config  # noqa: E402
+
+# Data benchmark tidak boleh mengotori riwayat kiosk
+_TMP_DIR = tempfile.mkdtemp(prefix="medscan-bench-")
+config.DATA_DIR = _TMP_DIR
+config.HISTORY_DB_PATH = os.path.join(_TMP_DIR, "history.db")
+config.HISTORY_IMAGE_DIR = os.path.join(_TMP_DIR, "images")
+config.THUMBNAIL_CACHE_DIR = os.path.join(_TMP_DIR, "thumbnails")
+config.PREVIEW_SUSPEND_WHEN_INACTIVE = False
+
+from PySide6 import __version__ as PYSIDE_VERSION  # noqa: E402
+from PySide6.QtGui import QFont  # noqa: E402
+from PySide6.QtWidgets import QApplication  # noqa: E402
+
+SYNTHETIC_RESULTS = {
+    "normal": {
+        "detections": [{"class": 0, "conf": 0.97}],
+        "category": "Normal",
+        "user": {"name": "Budi Santoso", "age": 30, "gender": "male"},
+    },
+    "detected": {
+        "detections": [{"class": 1, "conf": 0.88}, {"class": 1, "conf": 0.61}],
+        "category": "Anemia",
+        "user": {"name": "Siti Aminah", "age": 8, "gender": "female"},
+    },
+    "no_detection": {
+        "detections": [],
+        "user": {"name": "Andi", "age": 5, "gender": "male"},
+    },
+}
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT_DIR, stderr=subprocess.DEVNULL
+        ).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def summarize(samples):
+    ordered = sorted(samples)
+    return {
+        "median_ms": round(statistics.median(ordered), 3),
+        "p90_ms": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.9))], 3),
+        "min_ms": round(ordered[0], 3),
+        "runs": len(ordered),
+    }
+
+
+def measure(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    return summarize(samples)
+
+
+def page_factories(window):
+    """Pembuat halaman dengan argumen yang sama seperti MainWindow.init_pages."""
+    from pages.home_page import HomePage
+    from pages.screening_menu_page import ScreeningMenuPage
+    from pages.input_data_page import InputDataPage
+    from pages.image_capture_page import ImageCapturePage
+    from pages.screening_result_page import ScreeningResultPage
+    from pages.history_page import HistoryPage
+    from pages.multi_result_page import MultiResultPage
+
+    return {
+        "home_page": lambda: HomePage(),
+        "menu_page": lambda: ScreeningMenuPage(),
+        "input_page": lambda: InputDataPage(analysis_queue=window.analysis_queue),
+        "capture_page": lambda: ImageCapturePage(),
+        "result_page": lambda: ScreeningResultPage(history_store=window.history_store),
+        "history_page": lambda: HistoryPage(window.history_store),
+        "multi_result_page": lambda: MultiResultPage(window.session_queue),
+    }
+
+
+def run_benchmarks(repeat):
+    app = QApplication.instance() or QApplication(sys.argv)
+    with open("assets/style.qss", "r") as f:
+        app.setStyleSheet(f.read())
+    app.setFont(QFont("Segoe UI", 10))
+
+    from main_window import MainWindow
+
+    metrics = {}
+
+    started = time.perf_counter()
+    window = MainWindow()
+    metrics["main_window.construct"] = summarize([(time.perf_counter() - started) * 1000])
+    window.resize(1280, 900)
+    window.show()
+    app.processEvents()
+
+    for name, factory in page_factories(window).items():
+        def construct():
+            page = factory()
+            page.deleteLater()
+        metrics[f"construct.{name}"] = measure(construct, repeat)
+        app.processEvents()
+
+    stacked = window.stacked_widget
+    for index in range(stacked.count()):
+        name = type(stacked.widget(index)).__name__
+        other = 0 if index != 0 else 1
+
+        def switch():
+            stacked.setCurrentIndex(index)
+            app.processEvents()
+
+        def reset():
+            stacked.setCurrentIndex(other)
+            app.processEvents()
+
+        samples = []
+        for _ in range(repeat):
+            reset()
+            started = time.perf_counter()
+            switch()
+            samples.append((time.perf_counter() - started) * 1000)
+        metrics[f"switch.{name}"] = summarize(samples)
+
+        stacked.setCurrentIndex(index)
+        app.processEvents()
+        page = stacked.widget(index)
+        metrics[f"repaint.{name}"] = measure(page.grab, repeat)
+
+    result_page = window.result_page
+    stacked.setCurrentWidget(result_page)
+    app.processEvents()
+    patient = {"name": "Budi Santoso", "age": 30, "gender": "male"}
+    for name, payload in SYNTHETIC_RESULTS.items():
+        def update():
+            result_page.reset_view("anemia", patient)
+            result_page.on_analysis_finished(json.loads(json.dumps(payload)))
+            app.processEvents()
+            result_page.repaint()
+        metrics[f"result_update.{name}"] = measure(update, repeat)
+
+    window.close()
+    app.processEvents()
+    return metrics
+
+
+def build_report(metrics, repeat):
+    return {
+        "commit": git_commit(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "python": platform.python_version(),
+        "pyside6": PYSIDE_VERSION,
+        "qpa": os.environ.get("QT_QPA_PLATFORM"),
+        "repeat": repeat,
+        "metrics": metrics,
+    }
+
+
+def print_report(report, baseline=None):
+    print(f"MedScan UI benchmark @ {report['commit']} ({report['machine']}, PySide6 {report['pyside6']})")
+    print(f"{'metrik':<40}{'median':>10}{'p90':>10}{'delta':>10}")
+    for name, values in report["metrics"].items():
+        delta = ""
+        if baseline and name in baseline.get("metrics", {}):
+            old = baseline["metrics"][name]["median_ms"]
+            if old:
+                delta = f"{(values['median_ms'] - old) / old * 100:+.1f}%"
+        print(f"{name:<40}{values['median_ms']:>10.2f}{values['p90_ms']:>10.2f}{delta:>10}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=10, help="jumlah pengulangan per metrik")
+    parser.add_argument("--output", help="tulis laporan JSON ke file ini")
+    parser.add_argument("--append", help="tambahkan laporan sebagai satu baris JSON (riwayat antar commit)")
+    parser.add_argument("--compare", help="laporan JSON sebelumnya untuk dibandingkan")
+    args = parser.parse_args()
+
+    try:
+        report = build_report(run_benchmarks(max(1, args.repeat)), args.repeat)
+    finally:
+        shutil.rmtree(_TMP_DIR, ignore_errors=True)
+
+    baseline = None
+    if args.compare:
+        with open(args.compare, "r") as f:
+            baseline = json.load(f)
+    print_report(report, baseline)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    if args.append:
+        with open(args.append, "a") as f:
+            f.write(json.dumps(report) + "\n")
+
+
+if __name__ == "__main__":
+    main()
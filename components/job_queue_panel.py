@@ -0,0 +1,112 @@
+import qtawesome as qta
+from PySide6.QtCore import Qt, Signal
+from PySide6.QtGui import QFont, QColor
+from PySide6.QtWidgets import (
+    QWidget,
+    QLabel,
+    QVBoxLayout,
+    QListWidget,
+    QListWidgetItem,
+)
+from services.result_parser import parse_result, SCREENING_TITLES
+
+
+class JobQueuePanel(QWidget):
+    """Daftar job analisis yang berjalan di latar belakang pada mode antrian."""
+
+    jobSelected = Signal(int)
+
+    STATUS_TEXT = {
+        "queued": ("Menunggu antrian", "fa5s.clock", "#6B7280"),
+        "running": ("Menganalisis...", "fa5s.spinner", "#10B981"),
+        "failed": ("Analisis gagal", "fa5s.times-circle", "#EF4444"),
+    }
+
+    def __init__(self, analysis_queue, parent=None):
+        super().__init__(parent)
+        self.analysis_queue = analysis_queue
+        self.items = {}
+
+        self.setAttribute(Qt.WA_StyledBackground, True)
+        self.setObjectName("card")
+        self.setMaximumWidth(700)
+
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(24, 20, 24, 20)
+        layout.setSpacing(12)
+
+        self.title_label = QLabel("Hasil Analisis Antrian")
+        self.title_label.setFont(QFont("Segoe UI", 16, QFont.Bold))
+        self.summary_label = QLabel("")
+        self.summary_label.setObjectName("p")
+
+        self.list_widget = QListWidget()
+        self.list_widget.setMinimumHeight(160)
+        self.list_widget.setStyleSheet("border: none;")
+        self.list_widget.itemActivated.connect(self.on_item_activated)
+
+        layout.addWidget(self.title_label)
+        layout.addWidget(self.summary_label)
+        layout.addWidget(self.list_widget)
+
+        self.analysis_queue.jobQueued.connect(self.on_job_changed)
+        self.analysis_queue.jobStarted.connect(self.on_job_changed)
+        self.analysis_queue.jobFinished.connect(self.on_job_changed)
+        self.analysis_queue.jobFailed.connect(self.on_job_changed)
+        self.analysis_queue.jobRemoved.connect(self.on_job_removed)
+        self.analysis_queue.jobSaveFailed.connect(self.on_job_changed)
+
+        self.setVisible(False)
+
+    def on_job_changed(self, job_id, *args):
+        job = self.analysis_queue.jobs.get(job_id)
+        if job is None:
+            return
+
+        item = self.items.get(job_id)
+        if item is None:
+            item = QListWidgetItem()
+            item.setData(Qt.UserRole, job_id)
+            self.list_widget.insertItem(0, item)
+            self.items[job_id] = item
+
+        patient = job["patient_data"].get("name", "-")
+        screening = SCREENING_TITLES.get(job["screening_type"], job["screening_type"])
+        if job["status"] == "done":
+            parsed = parse_result(job["result"])
+            status_text = f"{parsed['status']} ({parsed['confidence']:.2f}%)"
+            icon_name, color = parsed["icon"], parsed["color"]
+            if job.get("save_error"):
+                status_text += " • tidak tersimpan"
+                icon_name, color = "fa5s.exclamation-triangle", "#EF4444"
+                item.setToolTip(f"Hasil tidak tersimpan ke riwayat: {job['save_error']}")
+        else:
+            status_text, icon_name, color = self.STATUS_TEXT[job["status"]]
+            if job["status"] == "failed":
+                item.setToolTip(job["error"])
+
+        item.setText(f"{patient} • {screening} — {status_text}")
+        item.setIcon(qta.icon(icon_name, color=color))
+        item.setForeground(QColor(color))
+
+        self.update_summary()
+        self.setVisible(True)
+
+    def on_job_removed(self, job_id):
+        item = self.items.pop(job_id, None)
+        if item is not None:
+            self.list_widget.takeItem(self.list_widget.row(item))
+
+    def update_summary(self):
+        running = self.analysis_queue.in_flight_count()
+        pending = self.analysis_queue.pending_count()
+        self.summary_label.setText(
+            f"{running} sedang dianalisis, {pending} menunggu. "
+            "Klik dua kali hasil untuk melihat detail."
+        )
+
+    def on_item_activated(self, item):
+        job_id = item.data(Qt.UserRole)
+        job = self.analysis_queue.jobs.get(job_id)
+        if job and job["status"] == "done":
+            self.jobSelected.emit(job_id)
@@ -0,0 +1,96 @@
+import qtawesome as qta
+from PySide6.QtCore import Qt, QSize
+from PySide6.QtGui import QFont
+from PySide6.QtWidgets import (
+    QWidget,
+    QLabel,
+    QVBoxLayout,
+    QSizePolicy,
+)
+from services.result_parser import parse_result, SCREENING_TITLES
+
+
+class ResultSummaryCard(QWidget):
+    """Kartu ringkas hasil satu jenis screening, dipakai di halaman hasil gabungan."""
+
+    def __init__(self, screening_type, parent=None):
+        super().__init__(parent)
+        self.screening_type = screening_type
+
+        self.setAttribute(Qt.WA_StyledBackground, True)
+        self.setObjectName("card")
+        self.setFixedWidth(300)
+        self.setSizePolicy(QSizePolicy.Fixed, QSizePolicy.Minimum)
+
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(24, 24, 24, 24)
+        layout.setSpacing(12)
+        layout.setAlignment(Qt.AlignTop)
+
+        self.title_label = QLabel(SCREENING_TITLES.get(screening_type, screening_type))
+        self.title_label.setFont(QFont("Segoe UI", 16, QFont.Bold))
+        self.title_label.setAlignment(Qt.AlignCenter)
+
+        self.icon_label = QLabel()
+        self.icon_label.setAlignment(Qt.AlignCenter)
+
+        self.status_label = QLabel()
+        self.status_label.setFont(QFont("Segoe UI", 22, QFont.Bold))
+        self.status_label.setAlignment(Qt.AlignCenter)
+
+        self.summary_label = QLabel()
+        self.summary_label.setObjectName("p")
+        self.summary_label.setAlignment(Qt.AlignCenter)
+        self.summary_label.setWordWrap(True)
+
+        self.confidence_label = QLabel()
+        self.confidence_label.setObjectName("stepLabel")
+        self.confidence_label.setAlignment(Qt.AlignCenter)
+
+        layout.addWidget(self.title_label)
+        layout.addWidget(self.icon_label)
+        layout.addWidget(self.status_label)
+        layout.addWidget(self.summary_label)
+        self.save_error_label = QLabel()
+        self.save_error_label.setAlignment(Qt.AlignCenter)
+        self.save_error_label.setWordWrap(True)
+        self.save_error_label.setStyleSheet("color: #EF4444;")
+
+        layout.addWidget(self.confidence_label, alignment=Qt.AlignCenter)
+        layout.addWidget(self.save_error_label)
+
+        self.set_pending()
+
+    def set_icon(self, icon_name, color):
+        self.icon_label.setPixmap(qta.icon(icon_name, color=color).pixmap(QSize(48, 48)))
+
+    def set_pending(self, text="Menunggu gambar..."):
+        self.set_icon("fa5s.spinner", "#10B981")
+        self.status_label.setText("Menganalisis...")
+        self.status_label.setStyleSheet("")
+        self.summary_label.setText(text)
+        self.confidence_label.setVisible(False)
+        self.save_error_label.setVisible(False)
+
+    def set_result(self, result_data, elapsed=None):
+        parsed = parse_result(result_data)
+        self.set_icon(parsed["icon"], parsed["color"])
+        self.status_label.setText(parsed["status"])
+        self.status_label.setStyleSheet(f"color: {parsed['color']};")
+        summary = parsed["summary"]
+        if elapsed is not None:
+            summary += f"\nSelesai dalam {elapsed:.1f} detik."
+        self.summary_label.setText(summary)
+        self.confidence_label.setText(f"Keyakinan AI: {parsed['confidence']:.2f}%")
+        self.confidence_label.setVisible(True)
+
+    def set_save_error(self, error_msg):
+        self.save_error_label.setText(f"Hasil tidak tersimpan ke riwayat: {error_msg}")
+        self.save_error_label.setVisible(True)
+
+    def set_error(self, error_msg):
+        self.set_icon("fa5s.times-circle", "#EF4444")
+        self.status_label.setText("Analisis Gagal")
+        self.status_label.setStyleSheet("color: #EF4444;")
+        self.summary_label.setText(error_msg)
+        self.confidence_label.setVisible(False)
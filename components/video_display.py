@@ -0,0 +1,52 @@
+from PySide6.QtCore import QRect
+from PySide6.QtGui import QPainter
+from PySide6.QtWidgets import QLabel
+
+from services.frame_pool import wrap_qimage
+
+
+class VideoDisplay(QLabel):
+    """Label preview kamera yang melukis frame numpy langsung di paintEvent.
+
+    Frame dibungkus QImage tanpa salinan dan digambar dengan QPainter, jadi
+    tidak ada konversi QPixmap per frame. Selama buffer pool yang sama dipakai
+    ulang, QImage pembungkusnya juga dipakai ulang. Teks dan pixmap biasa
+    (pesan status, thumbnail hasil tangkapan) tetap memakai perilaku QLabel.
+    """
+
+    def __init__(self, text="", parent=None):
+        super().__init__(text, parent)
+        # Referensi array disimpan agar memori di bawah QImage tetap hidup
+        self.frame = None
+        self.frame_image = None
+
+    def set_frame(self, frame):
+        if self.frame_image is None:
+            super().clear()
+        if frame is not self.frame:
+            self.frame = frame
+            self.frame_image = wrap_qimage(frame)
+        self.update()
+
+    def clear_frame(self):
+        self.frame = None
+        self.frame_image = None
+
+    def setText(self, text):
+        self.clear_frame()
+        super().setText(text)
+
+    def setPixmap(self, pixmap):
+        self.clear_frame()
+        super().setPixmap(pixmap)
+
+    def paintEvent(self, event):
+        # Latar dari stylesheet tetap digambar QLabel
+        super().paintEvent(event)
+        if self.frame_image is None:
+            return
+        image_rect = QRect(0, 0, self.frame_image.width(), self.frame_image.height())
+        image_rect.moveCenter(self.contentsRect().center())
+        painter = QPainter(self)
+        painter.drawImage(image_rect, self.frame_image)
+        painter.end()
@@ -1,2 +1,131 @@
-API_BASE_URL = "https://medscan.my.id"
+import os
+
+# Bisa diarahkan ke server lokal (tools/stub_server.py) lewat environment
+API_BASE_URL = os.environ.get("MEDSCAN_API_BASE_URL", "https://medscan.my.id")
 API_TIMEOUT = 30
+
+# Penyimpanan lokal (riwayat screening & gambar)
+DATA_DIR = "data"
+HISTORY_DB_PATH = f"{DATA_DIR}/history.db"
+HISTORY_IMAGE_DIR = f"{DATA_DIR}/images"
+HISTORY_PAGE_SIZE = 200
+
+# Thumbnail (dibuat di worker pool, disimpan di cache disk berbasis hash konten)
+THUMBNAIL_CACHE_DIR = f"{DATA_DIR}/thumbnails"
+THUMBNAIL_SIZES = {
+    "preview": (640, 480),
+    "list": (64, 48),
+}
+THUMBNAIL_WORKERS = 2
+# Batas cache thumbnail di disk (kiosk berjalan berbulan-bulan tanpa pengawasan);
+# file terlama dihapus lebih dulu, dibaca ulang = diperbarui (LRU berbasis mtime)
+THUMBNAIL_CACHE_MAX_BYTES = 200 * 1024 * 1024
+THUMBNAIL_CACHE_MAX_AGE_DAYS = 90
+THUMBNAIL_CACHE_PRUNE_EVERY = 100
+
+# Mode antrian: operator lanjut ke pasien berikutnya selagi analisis berjalan
+ANALYSIS_QUEUE_ENABLED = True
+ANALYSIS_MAX_IN_FLIGHT = 2
+
+# Cache hasil analisis (deduplikasi gambar yang dikirim ulang)
+API_MODEL_VERSION = "v1"
+RESULT_CACHE_TTL = 6 * 60 * 60
+RESULT_CACHE_MAX_ENTRIES = 500
+
+# Region of interest per jenis screening (koordinat relatif terhadap frame)
+ROI_ENABLED = True
+ROI_GUIDES = {
+    "diabetic_retinopathy": {"shape": "circle", "center": (0.5, 0.5), "radius": 0.45, "auto_detect": True},
+    "anemia": {"shape": "rect", "rect": (0.2, 0.15, 0.6, 0.7)},
+    "malnutrisi": {"shape": "rect", "rect": (0.2, 0.05, 0.6, 0.9)},
+}
+
+# Pacing preview kamera
+PREVIEW_CPU_BUDGET = 0.3
+PREVIEW_MIN_INTERVAL_MS = 15
+PREVIEW_MAX_INTERVAL_MS = 200
+PREVIEW_SUSPEND_WHEN_INACTIVE = True
+
+# Profil jaringan adaptif: kualitas upload dipilih dari pengukuran link
+# (diurutkan dari kualitas terbaik; est_bpp = perkiraan awal byte per piksel)
+NETWORK_PROFILES = [
+    {"name": "full", "max_side": 1280, "format": "png", "quality": None, "est_bpp": 1.6},
+    {"name": "high", "max_side": 1024, "format": "jpeg", "quality": 92, "est_bpp": 0.35},
+    {"name": "medium", "max_side": 800, "format": "jpeg", "quality": 85, "est_bpp": 0.22},
+    {"name": "low", "max_side": 512, "format": "jpeg", "quality": 75, "est_bpp": 0.15},
+]
+NETWORK_DEFAULT_PROFILE = "high"
+NETWORK_TARGET_LATENCY = 8.0
+NETWORK_SAMPLE_WINDOW = 20
+# Perkiraan awal overhead per request (RTT + inferensi server, detik) sebelum bisa diukur
+NETWORK_PRIOR_OVERHEAD = 1.0
+NETWORK_TIMEOUT_FACTOR = 3.0
+NETWORK_TIMEOUT_MIN = 10
+NETWORK_TIMEOUT_MAX = 60
+
+# Burst capture: N frame berturut-turut diselaraskan dan digabung untuk kondisi redup
+BURST_FRAME_COUNT = 5
+BURST_DEFAULT_TYPES = ("anemia",)
+BURST_CLIP_SIGMA = 2.5
+BURST_REGISTER_MAX_SIDE = 320
+BURST_MIN_RESPONSE = 0.05
+
+# Kotak deteksi digambar di klien; gambar anotasi server hanya diunduh jika True
+FETCH_SERVER_ANNOTATED_IMAGE = False
+
+# Laporan pasien (PDF/HTML) dibuat di worker pool latar belakang
+REPORT_OUTPUT_DIR = f"{DATA_DIR}/reports"
+REPORT_TEMPLATE_PATH = "assets/report_template.html"
+REPORT_MAX_WORKERS = 2
+# Batas laporan ekspor massal yang sudah dijadwalkan tapi belum selesai
+REPORT_BATCH_MAX_PENDING = 8
+REPORT_IMAGE_WIDTH = 320
+
+# Sinkronisasi delta riwayat ke server pusat (batch JSON gzip, checkpoint di database)
+SYNC_ENABLED = True
+SYNC_ENDPOINT = f"{API_BASE_URL}/api/sync"
+SYNC_INTERVAL_MS = 5 * 60 * 1000
+SYNC_BATCH_SIZE = 500
+SYNC_MAX_BYTES_PER_SEC = 256 * 1024
+SYNC_TIMEOUT = 30
+
+# Watchdog kamera: deteksi macet dan buka ulang perangkat di background dengan backoff
+CAMERA_WATCHDOG_INTERVAL_MS = 500
+CAMERA_STALL_TIMEOUT_MS = 3000
+CAMERA_MAX_READ_FAILURES = 15
+CAMERA_REOPEN_BASE_DELAY_MS = 500
+CAMERA_REOPEN_MAX_DELAY_MS = 30000
+CAMERA_METRICS_PATH = f"{DATA_DIR}/camera_metrics.json"
+CAMERA_METRICS_FLUSH_MS = 60 * 1000
+
+# Ketahanan endpoint analisis: retry dengan backoff, circuit breaker, dan health probe
+API_RETRY_ATTEMPTS = 3
+API_RETRY_BASE_DELAY = 0.5
+API_RETRY_MAX_DELAY = 4.0
+API_RETRY_DEADLINE = 60
+API_BREAKER_FAILURE_THRESHOLD = 3
+API_BREAKER_RESET_TIMEOUT = 30
+API_HEALTH_PATH = "/api/health"
+API_HEALTH_INTERVAL_MS = 5000
+API_HEALTH_TIMEOUT_MS = 3000
+
+# Prapemrosesan gambar sebelum di-encode ApiWorker; tahap dijalankan berurutan.
+# resize ditaruh paling depan agar tahap berikutnya bekerja pada piksel lebih sedikit.
+# patch reference_patch: (x, y, w, h) relatif terhadap gambar hasil crop ROI.
+PREPROCESSING_ENABLED = True
+PREPROCESSING_PIPELINES = {
+    "anemia": [
+        {"stage": "resize", "max_side": 1280},
+        {"stage": "white_balance", "method": "reference_patch", "patch": (0.02, 0.02, 0.12, 0.12)},
+        {"stage": "denoise", "method": "bilateral", "strength": 5},
+    ],
+    "diabetic_retinopathy": [
+        {"stage": "resize", "max_side": 1280},
+        {"stage": "clahe", "clip_limit": 2.0, "tile_grid": 8, "space": "lab"},
+    ],
+    "malnutrisi": [
+        {"stage": "resize", "max_side": 1280},
+        {"stage": "white_balance", "method": "gray_world"},
+    ],
+}
+PREPROCESSING_CACHE_ENTRIES = 12
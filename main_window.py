@@ -1,6 +1,5 @@
 from PySide6.QtWidgets import QMainWindow, QStackedWidget
-from PySide6.QtCore import Slot
-from PySide6.QtGui import QPixmap
+from PySide6.QtCore import Slot, QThread, QTimer
 
 # Import halaman
 from pages.home_page import HomePage
@@ -8,6 +7,17 @@ from pages.screening_menu_page import ScreeningMenuPage
 from pages.input_data_page import InputDataPage
 from pages.image_capture_page import ImageCapturePage
 from pages.screening_result_page import ScreeningResultPage
+from pages.history_page import HistoryPage
+from pages.multi_result_page import MultiResultPage
+
+from config import HISTORY_DB_PATH, HISTORY_IMAGE_DIR, SYNC_ENABLED, SYNC_INTERVAL_MS
+from services.result_parser import SCREENING_TITLES
+from services.analysis_queue import AnalysisQueue
+from services.history_store import HistoryStore
+from services.report_generator import get_report_service
+from services.resilience import HealthProbe, get_circuit_breaker
+from services.sync_engine import SyncWorker
+from services.thumbnailer import get_thumbnail_service
 
 class MainWindow(QMainWindow):
     def __init__(self):
@@ -19,6 +29,19 @@ class MainWindow(QMainWindow):
         # State Aplikasi
         self.current_screening_type = None
         self.current_patient_data = None
+        self.history_store = HistoryStore(HISTORY_DB_PATH, HISTORY_IMAGE_DIR)
+        self.analysis_queue = AnalysisQueue(parent=self)
+        # Screening gabungan: semua jenis dianalisis paralel
+        self.session_queue = AnalysisQueue(max_in_flight=len(SCREENING_TITLES), parent=self)
+        self.session_types = []
+        self.session_index = 0
+        self.sync_thread = None
+        self.sync_worker = None
+        self.last_sync_stats = None
+        self.sync_timer = QTimer(self)
+        self.sync_timer.setInterval(SYNC_INTERVAL_MS)
+        # Menutup circuit breaker API begitu server kembali sehat
+        self.health_probe = HealthProbe(get_circuit_breaker(), parent=self)
 
         # Router
         self.stacked_widget = QStackedWidget()
@@ -29,28 +52,45 @@ class MainWindow(QMainWindow):
 
         self.stacked_widget.setCurrentIndex(0)
 
+        self.health_probe.start()
+        if SYNC_ENABLED:
+            self.sync_timer.start()
+
     def init_pages(self):
         self.home_page = HomePage()
         self.menu_page = ScreeningMenuPage()
-        self.input_page = InputDataPage()
+        self.input_page = InputDataPage(analysis_queue=self.analysis_queue)
         self.capture_page = ImageCapturePage()
-        self.result_page = ScreeningResultPage()
+        self.result_page = ScreeningResultPage(history_store=self.history_store)
+        self.history_page = HistoryPage(self.history_store)
+        self.multi_result_page = MultiResultPage(self.session_queue)
 
         self.stacked_widget.addWidget(self.home_page)
         self.stacked_widget.addWidget(self.menu_page)
         self.stacked_widget.addWidget(self.input_page)
         self.stacked_widget.addWidget(self.capture_page)
         self.stacked_widget.addWidget(self.result_page)
+        self.stacked_widget.addWidget(self.history_page)
+        self.stacked_widget.addWidget(self.multi_result_page)
 
     def connect_signals(self):
         self.home_page.startClicked.connect(self.navigate_to_menu)
+        self.home_page.header.historyClicked.connect(self.navigate_to_history)
         self.menu_page.startScreening.connect(self.on_screening_selected)
+        self.menu_page.startMultiScreening.connect(self.on_multi_screening_selected)
         self.menu_page.goBack.connect(self.navigate_to_home)
         self.input_page.dataSubmitted.connect(self.on_data_submitted)
         self.input_page.backClicked.connect(self.navigate_to_menu)
         self.capture_page.imageReady.connect(self.on_image_ready)
+        self.capture_page.imageQueued.connect(self.on_image_queued)
         self.capture_page.backClicked.connect(self.on_capture_back)
         self.result_page.goHomeClicked.connect(self.navigate_to_home_and_reset)
+        self.history_page.backClicked.connect(self.navigate_to_home)
+        self.analysis_queue.jobFinished.connect(self.on_job_finished)
+        self.session_queue.jobFinished.connect(self.on_job_finished)
+        self.multi_result_page.goHomeClicked.connect(self.navigate_to_home_and_reset)
+        self.input_page.jobs_panel.jobSelected.connect(self.on_job_selected)
+        self.sync_timer.timeout.connect(self.start_sync)
 
     @Slot()
     def navigate_to_home(self):
@@ -61,6 +101,11 @@ class MainWindow(QMainWindow):
         self.input_page.reset_form()
         self.stacked_widget.setCurrentIndex(0)
 
+    @Slot()
+    def navigate_to_history(self):
+        self.history_page.refresh()
+        self.stacked_widget.setCurrentIndex(5)
+
     @Slot()
     def navigate_to_menu(self):
         self.capture_page.stop_camera()
@@ -69,11 +114,25 @@ class MainWindow(QMainWindow):
     @Slot(str)
     def on_screening_selected(self, screening_type: str):
         self.current_screening_type = screening_type
+        self.session_types = []
+        self.stacked_widget.setCurrentIndex(2)
+
+    @Slot(list)
+    def on_multi_screening_selected(self, screening_types: list):
+        self.session_types = list(screening_types)
+        self.current_screening_type = self.session_types[0]
         self.stacked_widget.setCurrentIndex(2)
 
     @Slot(dict)
     def on_data_submitted(self, patient_data: dict):
         self.current_patient_data = patient_data
+        if self.session_types:
+            self.session_index = 0
+            self.current_screening_type = self.session_types[0]
+            self.multi_result_page.start_session(patient_data, self.session_types)
+            self.capture_page.set_session_progress(0, len(self.session_types))
+        else:
+            self.capture_page.set_session_progress()
         self.stacked_widget.setCurrentIndex(3)
         self.capture_page.start_camera(self.current_screening_type)
 
@@ -81,19 +140,114 @@ class MainWindow(QMainWindow):
     def on_capture_back(self):
         self.stacked_widget.setCurrentIndex(2)
 
-    @Slot(QPixmap)
-    def on_image_ready(self, captured_pixmap: QPixmap):
+    @Slot(object)
+    def on_image_ready(self, captured_frame):
+        if self.session_types:
+            self.on_session_image_ready(captured_frame)
+            return
         self.stacked_widget.setCurrentIndex(4)
         self.result_page.start_analysis(
             self.current_screening_type,
             self.current_patient_data,
-            captured_pixmap
+            captured_frame
+        )
+
+    def on_session_image_ready(self, captured_frame):
+        # Analisis langsung dikirim, selagi gambar berikutnya diambil
+        job_id = self.session_queue.submit(
+            self.current_screening_type,
+            self.current_patient_data,
+            captured_frame
+        )
+        self.multi_result_page.bind_job(self.current_screening_type, job_id)
+
+        self.session_index += 1
+        if self.session_index < len(self.session_types):
+            self.current_screening_type = self.session_types[self.session_index]
+            self.capture_page.set_session_progress(self.session_index, len(self.session_types))
+            self.capture_page.start_camera(self.current_screening_type)
+        else:
+            self.stacked_widget.setCurrentIndex(6)
+
+    @Slot(object)
+    def on_image_queued(self, captured_frame):
+        self.analysis_queue.submit(
+            self.current_screening_type,
+            self.current_patient_data,
+            captured_frame
+        )
+        # Operator langsung lanjut ke pasien berikutnya
+        self.input_page.reset_form()
+        self.stacked_widget.setCurrentIndex(2)
+
+    @Slot(int, dict)
+    def on_job_finished(self, job_id: int, result_data: dict):
+        queue = self.sender()
+        job = queue.jobs[job_id]
+        try:
+            job["record_id"] = self.history_store.record_screening(
+                job["screening_type"], job["patient_data"], result_data,
+                started_at=job["queued_at"], encoded_image=job["encoded_image"]
+            )
+        except Exception as e:
+            queue.mark_save_failed(job_id, str(e))
+        job["encoded_image"] = None
+
+    @Slot(int)
+    def on_job_selected(self, job_id: int):
+        job = self.analysis_queue.jobs[job_id]
+        self.stacked_widget.setCurrentIndex(4)
+        self.result_page.show_result(
+            job["screening_type"],
+            job["patient_data"],
+            job["result"],
+            record_id=job.get("record_id")
         )
 
+    @Slot()
+    def start_sync(self):
+        """Menjalankan satu putaran sinkronisasi riwayat di background thread."""
+        if self.sync_thread is not None:
+            return
+        self.sync_thread = QThread()
+        self.sync_worker = SyncWorker(self.history_store.db_path, self.history_store.image_dir)
+        self.sync_worker.moveToThread(self.sync_thread)
+        self.sync_thread.started.connect(self.sync_worker.run)
+        self.sync_worker.finished.connect(self.on_sync_finished)
+        self.sync_worker.error.connect(self.on_sync_error)
+        self.sync_worker.finished.connect(self.sync_thread.quit)
+        self.sync_worker.error.connect(self.sync_thread.quit)
+        self.sync_thread.finished.connect(self.on_sync_thread_finished)
+        self.sync_thread.start()
+
+    @Slot(dict)
+    def on_sync_finished(self, stats: dict):
+        # Disimpan untuk diagnosa (soak test), tidak dicetak setiap putaran
+        self.last_sync_stats = stats
+
+    @Slot(str)
+    def on_sync_error(self, error_msg: str):
+        print(error_msg)
+
+    @Slot()
+    def on_sync_thread_finished(self):
+        self.sync_thread.wait()
+        self.sync_thread = None
+        self.sync_worker = None
+
     def closeEvent(self, event):
         """Memastikan resource dibersihkan saat aplikasi ditutup."""
-        self.capture_page.stop_camera()
-        if self.result_page.api_thread and self.result_page.api_thread.isRunning():
-            self.result_page.api_thread.quit()
-            self.result_page.api_thread.wait()
+        self.sync_timer.stop()
+        self.health_probe.stop()
+        if self.sync_thread is not None:
+            self.sync_worker.stop()
+            self.sync_thread.quit()
+            self.sync_thread.wait()
+        self.capture_page.shutdown()
+        self.result_page.shutdown()
+        self.analysis_queue.shutdown()
+        self.session_queue.shutdown()
+        get_thumbnail_service().shutdown()
+        get_report_service().shutdown()
+        self.history_store.close()
         event.accept()
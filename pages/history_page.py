@@ -0,0 +1,294 @@
+import qtawesome as qta
+from PySide6.QtCore import Qt, Signal, QTimer, QSize, QAbstractTableModel, QModelIndex
+from PySide6.QtGui import QColor, QPixmap
+from PySide6.QtWidgets import (
+    QWidget, QLabel, QVBoxLayout, QHBoxLayout, QLineEdit,
+    QComboBox, QTableView, QHeaderView, QAbstractItemView, QPushButton, QProgressBar
+)
+from components.header import Header
+from config import HISTORY_PAGE_SIZE
+from services.result_parser import COLOR_MAP, GENDER_LABELS, SCREENING_TITLES
+from services.report_generator import get_report_service
+from services.thumbnailer import get_thumbnail_service
+
+
+class HistoryTableModel(QAbstractTableModel):
+    """Model tabel riwayat yang mengambil baris dari database secara bertahap."""
+
+    COLUMNS = [
+        ("captured_image_path", "Gambar"),
+        ("completed_at", "Tanggal"),
+        ("patient_name", "Nama"),
+        ("patient_age", "Umur"),
+        ("patient_gender", "Jenis Kelamin"),
+        ("screening_type", "Jenis Screening"),
+        ("status", "Hasil"),
+        ("confidence", "Keyakinan"),
+        ("network_profile", "Profil Upload"),
+    ]
+
+    MAX_CACHED_THUMBNAILS = 2000
+
+    def __init__(self, history_store, page_size=HISTORY_PAGE_SIZE, parent=None):
+        super().__init__(parent)
+        self.history_store = history_store
+        self.page_size = page_size
+        self.rows = []
+        self.exhausted = False
+        self.screening_type = None
+        self.name_query = None
+        # Thumbnail hanya diminta untuk baris yang benar-benar ditampilkan view
+        self.thumbnails = {}
+        self.pending_thumbnails = {}
+        self.pending_paths = set()
+        self.thumbnailer = get_thumbnail_service()
+        self.thumbnailer.thumbnailReady.connect(self.on_thumbnail_ready)
+        self.thumbnailer.thumbnailFailed.connect(self.on_thumbnail_failed)
+
+    def set_filters(self, screening_type=None, name_query=None):
+        self.screening_type = screening_type or None
+        self.name_query = name_query or None
+        self.reload()
+
+    def reload(self):
+        self.beginResetModel()
+        self.rows = []
+        self.exhausted = False
+        self.pending_thumbnails = {}
+        self.pending_paths = set()
+        self.endResetModel()
+        # Isi halaman pertama agar view langsung terisi
+        if self.canFetchMore(QModelIndex()):
+            self.fetchMore(QModelIndex())
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.COLUMNS)
+
+    def canFetchMore(self, parent):
+        return not parent.isValid() and not self.exhausted
+
+    def fetchMore(self, parent):
+        if parent.isValid() or self.exhausted:
+            return
+        after = None
+        if self.rows:
+            last = self.rows[-1]
+            after = (last["completed_at"], last["id"])
+        page = self.history_store.fetch_page(
+            self.page_size, after=after,
+            screening_type=self.screening_type, name_query=self.name_query
+        )
+        if len(page) < self.page_size:
+            self.exhausted = True
+        if not page:
+            return
+        start = len(self.rows)
+        self.beginInsertRows(QModelIndex(), start, start + len(page) - 1)
+        self.rows.extend(page)
+        self.endInsertRows()
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return self.COLUMNS[section][1]
+        return None
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        record = self.rows[index.row()]
+        key = self.COLUMNS[index.column()][0]
+
+        if role == Qt.DecorationRole and key == "captured_image_path":
+            return self.thumbnail_for(index.row(), record)
+        if role == Qt.DisplayRole:
+            value = record.get(key)
+            if key == "captured_image_path":
+                return None
+            if key == "patient_gender":
+                return GENDER_LABELS.get(value, value or "-")
+            if key == "screening_type":
+                return SCREENING_TITLES.get(value, value)
+            if key == "confidence":
+                return f"{value or 0:.2f}%"
+            return "-" if value is None else str(value)
+        if role == Qt.ForegroundRole and key == "status":
+            return QColor(COLOR_MAP.get(record.get("status"), "#4B5563"))
+        if role == Qt.UserRole:
+            return record
+        return None
+
+    def thumbnail_for(self, row, record):
+        path = record.get("captured_image_path")
+        if not path:
+            return None
+        if path in self.thumbnails:
+            return self.thumbnails[path]
+        if path not in self.pending_paths:
+            tag = self.thumbnailer.request(path, ("list",))
+            self.pending_thumbnails[tag] = (path, row)
+            self.pending_paths.add(path)
+        return None
+
+    def on_thumbnail_ready(self, tag, size_name, image):
+        pending = self.pending_thumbnails.pop(tag, None)
+        if pending is None:
+            return
+        path, row = pending
+        self.pending_paths.discard(path)
+        if len(self.thumbnails) >= self.MAX_CACHED_THUMBNAILS:
+            self.thumbnails.pop(next(iter(self.thumbnails)))
+        self.thumbnails[path] = QPixmap.fromImage(image)
+        index = self.index(row, 0)
+        self.dataChanged.emit(index, index, [Qt.DecorationRole])
+
+    def on_thumbnail_failed(self, tag, error_msg):
+        pending = self.pending_thumbnails.pop(tag, None)
+        if pending:
+            # Tidak dicoba ulang agar file yang hilang tidak diminta terus-menerus
+            self.thumbnails[pending[0]] = None
+
+
+class HistoryPage(QWidget):
+    backClicked = Signal()
+
+    def __init__(self, history_store, parent=None):
+        super().__init__(parent)
+        self.history_store = history_store
+        self.report_service = get_report_service()
+        self.export_batch_id = None
+        self.export_error = None
+        self.search_timer = QTimer(self)
+        self.search_timer.setSingleShot(True)
+        self.search_timer.setInterval(300)
+        self.init_ui()
+        self.connect_signals()
+
+    def init_ui(self):
+        main_layout = QVBoxLayout(self)
+        main_layout.setContentsMargins(40, 20, 40, 40)
+        main_layout.setSpacing(20)
+
+        self.header = Header(self)
+        self.header.history_button.setText("Kembali")
+        self.header.history_button.setIcon(qta.icon("fa5s.chevron-left", color="#374151"))
+        self.header.history_button.clicked.disconnect()
+        self.header.history_button.clicked.connect(self.backClicked.emit)
+
+        title_layout = QVBoxLayout()
+        title_layout.setAlignment(Qt.AlignCenter)
+        title = QLabel("Riwayat Screening")
+        title.setObjectName("h2")
+        title.setAlignment(Qt.AlignCenter)
+        self.count_label = QLabel("")
+        self.count_label.setObjectName("p")
+        self.count_label.setAlignment(Qt.AlignCenter)
+        title_layout.addWidget(title, alignment=Qt.AlignCenter)
+        title_layout.addWidget(self.count_label, alignment=Qt.AlignCenter)
+
+        # Filter
+        filter_layout = QHBoxLayout()
+        filter_layout.setSpacing(16)
+        self.search_input = QLineEdit()
+        self.search_input.setPlaceholderText("Cari nama pasien...")
+        self.type_filter = QComboBox()
+        self.type_filter.addItem("Semua Jenis Screening", "")
+        for type_str, label in SCREENING_TITLES.items():
+            self.type_filter.addItem(label, type_str)
+        self.export_button = QPushButton("Ekspor Semua")
+        self.export_button.setObjectName("secondaryButton")
+        self.export_button.setIcon(qta.icon("fa5s.file-export"))
+        filter_layout.addWidget(self.search_input, 2)
+        filter_layout.addWidget(self.type_filter, 1)
+        filter_layout.addWidget(self.export_button)
+
+        # Progres ekspor laporan
+        self.export_progress = QProgressBar()
+        self.export_progress.setVisible(False)
+        self.export_label = QLabel("")
+        self.export_label.setObjectName("p")
+        self.export_label.setAlignment(Qt.AlignCenter)
+        self.export_label.setVisible(False)
+
+        # Tabel
+        self.model = HistoryTableModel(self.history_store, parent=self)
+        self.table_view = QTableView()
+        self.table_view.setModel(self.model)
+        self.table_view.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.table_view.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.table_view.setAlternatingRowColors(True)
+        self.table_view.verticalHeader().setVisible(False)
+        # Tinggi baris tetap agar view tidak perlu mengukur setiap baris
+        self.table_view.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
+        self.table_view.verticalHeader().setDefaultSectionSize(56)
+        self.table_view.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        self.table_view.horizontalHeader().setSectionResizeMode(0, QHeaderView.Fixed)
+        self.table_view.setColumnWidth(0, 80)
+        self.table_view.setIconSize(QSize(64, 48))
+
+        main_layout.addWidget(self.header, 0, Qt.AlignTop | Qt.AlignHCenter)
+        main_layout.addLayout(title_layout)
+        main_layout.addLayout(filter_layout)
+        main_layout.addWidget(self.export_progress)
+        main_layout.addWidget(self.export_label)
+        main_layout.addWidget(self.table_view, 1)
+
+    def connect_signals(self):
+        self.search_input.textChanged.connect(self.search_timer.start)
+        self.search_timer.timeout.connect(self.apply_filters)
+        self.type_filter.currentIndexChanged.connect(self.apply_filters)
+        self.export_button.clicked.connect(self.on_export_clicked)
+        self.report_service.batchProgress.connect(self.on_export_progress)
+        self.report_service.batchFinished.connect(self.on_export_finished)
+        # Kegagalan membaca riwayat dilaporkan dengan tag batch_id
+        self.report_service.reportFailed.connect(self.on_export_failed)
+
+    def apply_filters(self):
+        screening_type = self.type_filter.currentData()
+        name_query = self.search_input.text().strip()
+        self.model.set_filters(screening_type, name_query)
+        total = self.history_store.count(screening_type or None, name_query or None)
+        self.count_label.setText(f"{total} catatan screening")
+
+    def refresh(self):
+        self.apply_filters()
+
+    def on_export_clicked(self):
+        """Mengekspor laporan semua catatan yang cocok dengan filter saat ini."""
+        screening_type = self.type_filter.currentData() or None
+        name_query = self.search_input.text().strip() or None
+        self.export_button.setEnabled(False)
+        self.export_progress.setValue(0)
+        self.export_progress.setVisible(True)
+        self.export_label.setVisible(False)
+        self.export_error = None
+        self.export_batch_id = self.report_service.export_batch(
+            self.history_store.db_path, self.history_store.image_dir, screening_type, name_query
+        )
+
+    def on_export_progress(self, batch_id, done, total):
+        if batch_id != self.export_batch_id:
+            return
+        self.export_progress.setMaximum(total)
+        self.export_progress.setValue(done)
+
+    def on_export_failed(self, tag, error_msg):
+        if tag == self.export_batch_id:
+            self.export_error = error_msg
+
+    def on_export_finished(self, batch_id, succeeded, failed):
+        if batch_id != self.export_batch_id:
+            return
+        self.export_batch_id = None
+        self.export_button.setEnabled(True)
+        self.export_progress.setVisible(False)
+        text = f"{succeeded} laporan diekspor ke {self.report_service.output_dir}"
+        if failed:
+            text += f" ({failed} gagal)"
+        if self.export_error:
+            text = f"Ekspor terhenti. {self.export_error}\n{text}"
+            self.export_error = None
+        self.export_label.setText(text)
+        self.export_label.setVisible(True)
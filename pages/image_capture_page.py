@@ -1,14 +1,27 @@
 import sys
-import cv2
+import time
+import numpy as np
 import qtawesome as qta
 
-from PySide6.QtCore import Qt, QTimer, QSize, Signal
-from PySide6.QtGui import QPixmap, QImage, QFont
+from PySide6.QtCore import Qt, QTimer, QSize, Signal, QThread, QDeadlineTimer
+from PySide6.QtGui import QPixmap, QFont
 from PySide6.QtWidgets import (
-    QWidget, QLabel, QPushButton, QVBoxLayout, QHBoxLayout,
-    QMessageBox, QFileDialog, QSpacerItem, QSizePolicy
+    QApplication, QWidget, QLabel, QPushButton, QVBoxLayout, QHBoxLayout,
+    QMessageBox, QFileDialog, QSpacerItem, QSizePolicy, QCheckBox
 )
 from components.header import Header
+from components.video_display import VideoDisplay
+from config import (
+    ANALYSIS_QUEUE_ENABLED, PREVIEW_SUSPEND_WHEN_INACTIVE,
+    BURST_FRAME_COUNT, BURST_DEFAULT_TYPES
+)
+from services.burst_fusion import BurstStack, fuse_burst
+from services.camera_watchdog import CameraWatchdog, CameraOpener, CameraGrabber, release_device
+from services.frame_pool import FramePool, fit_for_display
+from services.image_utils import load_image_file
+from services.preview_pacer import PreviewPacer
+from services.roi import crop_to_roi, draw_guide_overlay
+from services.thumbnailer import get_thumbnail_service
 
 try:
     from picamera2 import Picamera2
@@ -17,23 +30,47 @@ except ImportError:
     PICAMERA_AVAILABLE = False
 
 class ImageCapturePage(QWidget):
-    imageReady = Signal(QPixmap)
+    imageReady = Signal(object)
+    imageQueued = Signal(object)
     backClicked = Signal()
 
     def __init__(self, parent=None):
         super().__init__(parent)
         self.guides = {
             "diabetic_retinopathy": "Pastikan retina terlihat jelas dan pencahayaan cukup.",
-            "anemia": "Fokus pada kuku tangan. Pastikan pencahayaan merata.",
+            "anemia": "Fokus pada kuku tangan. Letakkan kartu abu-abu di kotak kecil berwarna oranye.",
             "malnutrisi": "Fokus pada wajah subjek, terutama pipi dan dagu."
         }
-        self.captured_pixmap = None
-        self.capture = None
-        self.picam = None
-        self.timer = QTimer(self)
-        self.timer.timeout.connect(self.update_frame_generic)
+        self.captured_frame = None
+        self.screening_type = None
+        self.grabber = None
+        self.grabber_thread = None
+        # Grabber yang sedang berhenti (read() bisa masih memblokir) -> thread-nya
+        self.retired_grabbers = {}
+        self.frames_wanted = 0
+        self.burst_capture = False
+        self.frame_pool = FramePool()
+        self.burst_stack = BurstStack()
+        self.pending_thumbnail = None
+        self.thumbnailer = get_thumbnail_service()
+        self.thumbnailer.thumbnailReady.connect(self.on_thumbnail_ready)
+        self.thumbnailer.thumbnailFailed.connect(self.on_thumbnail_failed)
+        self.pacer = PreviewPacer()
+        self.preview_suspended = False
+        self.camera_num = 0
+        self.opener_thread = None
+        self.opener = None
+        self.active_opener = None
+        self.open_requested = False
+        self.watchdog = CameraWatchdog(parent=self)
+        self.watchdog.stallDetected.connect(self.on_camera_stalled)
+        self.reopen_timer = QTimer(self)
+        self.reopen_timer.setSingleShot(True)
+        self.reopen_timer.timeout.connect(self.reopen_camera)
         self.init_ui()
         self.connect_signals()
+        if PREVIEW_SUSPEND_WHEN_INACTIVE:
+            QApplication.instance().applicationStateChanged.connect(self.on_application_state_changed)
 
     def init_ui(self):
         main_layout = QVBoxLayout(self)
@@ -47,16 +84,16 @@ class ImageCapturePage(QWidget):
         # Title
         title_layout = QVBoxLayout()
         title_layout.setAlignment(Qt.AlignCenter)
-        step_label = QLabel("Langkah 3 dari 4")
-        step_label.setObjectName("stepLabel")
-        step_label.setAlignment(Qt.AlignCenter)
+        self.step_label = QLabel("Langkah 3 dari 4")
+        self.step_label.setObjectName("stepLabel")
+        self.step_label.setAlignment(Qt.AlignCenter)
         title = QLabel("Ambil atau Upload Gambar")
         title.setObjectName("h2")
         title.setAlignment(Qt.AlignCenter)
         self.subtitle_guide = QLabel("Posisikan subjek sesuai panduan...")
         self.subtitle_guide.setObjectName("p")
         self.subtitle_guide.setAlignment(Qt.AlignCenter)
-        title_layout.addWidget(step_label, alignment=Qt.AlignCenter)
+        title_layout.addWidget(self.step_label, alignment=Qt.AlignCenter)
         title_layout.addSpacing(10)
         title_layout.addWidget(title, alignment=Qt.AlignCenter)
         title_layout.addWidget(self.subtitle_guide, alignment=Qt.AlignCenter)
@@ -69,7 +106,7 @@ class ImageCapturePage(QWidget):
         camera_col = QVBoxLayout()
         camera_col.setAlignment(Qt.AlignCenter)
 
-        self.video_display = QLabel("Menyalakan Kamera...")
+        self.video_display = VideoDisplay("Menyalakan Kamera...")
         self.video_display.setFixedSize(QSize(640, 480))
         self.video_display.setAlignment(Qt.AlignCenter)
         self.video_display.setScaledContents(True)
@@ -97,6 +134,9 @@ class ImageCapturePage(QWidget):
         # Tambahkan tombol
         camera_col.addLayout(button_layout)
 
+        self.burst_checkbox = QCheckBox(f"Mode cahaya redup (gabungkan {BURST_FRAME_COUNT} frame)")
+        camera_col.addWidget(self.burst_checkbox, alignment=Qt.AlignCenter)
+
         # Guide Box
         guide_box = QWidget()
         guide_box.setObjectName("guideBox")
@@ -128,8 +168,13 @@ class ImageCapturePage(QWidget):
         self.next_button = QPushButton("Selesai & Lihat Hasil")
         self.next_button.setObjectName("primaryButton")
         self.next_button.setIcon(qta.icon("fa5s.arrow-right", color="white"))
+        self.queue_button = QPushButton("Antrikan & Pasien Berikutnya")
+        self.queue_button.setObjectName("secondaryButton")
+        self.queue_button.setIcon(qta.icon("fa5s.user-plus"))
+        self.queue_button.setVisible(ANALYSIS_QUEUE_ENABLED)
         nav_layout.addWidget(self.back_button)
         nav_layout.addStretch()
+        nav_layout.addWidget(self.queue_button)
         nav_layout.addWidget(self.next_button)
 
         # Add all to main layout
@@ -143,139 +188,296 @@ class ImageCapturePage(QWidget):
     def connect_signals(self):
         self.back_button.clicked.connect(self.on_back_clicked)
         self.next_button.clicked.connect(self.on_next_clicked)
+        self.queue_button.clicked.connect(self.on_queue_clicked)
         self.capture_button.clicked.connect(self.on_capture_clicked)
         self.upload_button.clicked.connect(self.on_upload_clicked)
 
+    def set_session_progress(self, index=None, total=None):
+        """Menandai posisi pengambilan gambar pada screening gabungan (None = satu jenis)."""
+        if index is None or not total:
+            self.step_label.setText("Langkah 3 dari 4")
+            self.next_button.setText("Selesai & Lihat Hasil")
+            self.queue_button.setVisible(ANALYSIS_QUEUE_ENABLED)
+            return
+        self.step_label.setText(f"Gambar {index + 1} dari {total}")
+        self.next_button.setText("Selesai & Lihat Hasil" if index + 1 == total else "Gambar Berikutnya")
+        self.queue_button.setVisible(False)
+
     def start_camera(self, screening_type):
         self.subtitle_guide.setText(self.guides.get(screening_type, "..."))
-        self.captured_pixmap = None
+        self.screening_type = screening_type
+        self.captured_frame = None
+        self.pending_thumbnail = None
+        self.burst_checkbox.setChecked(screening_type in BURST_DEFAULT_TYPES)
         self.video_display.setText("Menyalakan Kamera...")
 
         self.stop_camera()
 
         # Pilih camera_num berdasarkan screening_type
-        camera_num = 1 if screening_type == "diabetic_retinopathy" else 0
-
-        try:
-            self.timer.timeout.disconnect()
-        except TypeError:
-            pass
-
-        if PICAMERA_AVAILABLE:
-            try:
-                self.picam = Picamera2()
-                config = self.picam.create_preview_configuration(main={"size": (640, 480)})
-                self.picam.configure(config)
-                self.picam.start()
-                self.capture_button.setEnabled(True)
-                self.timer.timeout.connect(self.update_frame_picam)
-                self.timer.start(30)
-            except Exception as e:
-                self.video_display.setText(f"Gagal membuka Picamera2: {e}\nMencoba OpenCV...")
-                self.capture_button.setEnabled(False)
-                self.capture = cv2.VideoCapture(camera_num)
-                if not self.capture.isOpened():
-                    self.video_display.setText("Error: Gagal membuka kamera.")
-                    self.capture_button.setEnabled(False)
-                    return
-                self.capture_button.setEnabled(True)
-                self.timer.timeout.connect(self.update_frame)
-                self.timer.start(30)
+        self.camera_num = 1 if screening_type == "diabetic_retinopathy" else 0
+        self.watchdog.reset_backoff()
+        self.open_camera_async()
+
+    def open_camera_async(self):
+        """Membuka kamera di background thread agar UI tidak membeku."""
+        if self.opener_thread is not None:
+            # Tunggu pembuka sebelumnya selesai; hasilnya akan diabaikan
+            self.open_requested = True
+            return
+        self.open_requested = False
+        self.capture_button.setEnabled(False)
+        self.opener_thread = QThread()
+        # self.opener menahan objek selama thread berjalan; active_opener hanya
+        # menandai pembuka yang hasilnya masih diterima
+        released = [grabber.released for grabber in self.retired_grabbers.values()]
+        self.opener = CameraOpener(self.camera_num, PICAMERA_AVAILABLE, released)
+        self.active_opener = self.opener
+        self.opener.moveToThread(self.opener_thread)
+        self.opener_thread.started.connect(self.opener.run)
+        self.opener.opened.connect(self.on_camera_opened)
+        self.opener.failed.connect(self.on_camera_open_failed)
+        self.opener.opened.connect(self.opener_thread.quit)
+        self.opener.failed.connect(self.opener_thread.quit)
+        self.opener_thread.finished.connect(self.on_opener_thread_finished)
+        self.opener_thread.start()
+
+    def on_opener_thread_finished(self):
+        self.opener_thread.wait()
+        self.opener_thread = None
+        self.opener = None
+        if self.open_requested:
+            self.open_camera_async()
+
+    def on_camera_opened(self, kind, device):
+        if self.sender() is not self.active_opener:
+            # Halaman sudah ditinggalkan/kamera diganti selama proses membuka
+            release_device(device)
+            return
+        self.active_opener = None
+        self.start_grabber(kind, device)
+        self.capture_button.setEnabled(True)
+        self.pacer.reset()
+        self.watchdog.start(self.camera_num)
+        self.preview_suspended = False
+        if not self.isVisible():
+            # Kamera tetap terbuka; preview jalan lagi saat halaman terlihat
+            self.suspend_preview()
+
+    def start_grabber(self, kind, device):
+        """read() kamera berjalan di thread sendiri; frame datang lewat sinyal queued."""
+        self.grabber_thread = QThread()
+        self.grabber = CameraGrabber(kind, device)
+        self.grabber.moveToThread(self.grabber_thread)
+        self.grabber_thread.started.connect(self.grabber.run)
+        self.grabber.frameReady.connect(self.on_frame_ready)
+        self.grabber.readFailed.connect(self.on_frame_failed)
+        # Langsung dari thread grabber: shutdown() menunggu thread ini di UI thread
+        self.grabber.finished.connect(self.grabber_thread.quit, Qt.DirectConnection)
+        self.grabber_thread.finished.connect(self.on_grabber_thread_finished)
+        self.grabber_thread.start()
+
+    def retire_grabber(self):
+        """Menghentikan grabber tanpa menunggu: read() yang macet tidak boleh menahan UI."""
+        if self.grabber is None:
+            return
+        self.grabber.stop()
+        self.retired_grabbers[self.grabber_thread] = self.grabber
+        self.grabber = None
+        self.grabber_thread = None
+
+    def on_grabber_thread_finished(self):
+        thread = self.sender()
+        thread.wait()
+        self.retired_grabbers.pop(thread, None)
+        if thread is self.grabber_thread:
+            # Grabber berhenti sendiri (mis. perangkat error saat dilepas)
+            self.grabber = None
+            self.grabber_thread = None
+
+    def on_camera_open_failed(self, error_msg):
+        if self.sender() is not self.active_opener:
+            return
+        self.active_opener = None
+        self.capture_button.setEnabled(False)
+        delay = self.watchdog.reopen_delay_ms()
+        self.video_display.setText(f"Error: {error_msg}\nMencoba lagi dalam {delay / 1000:.1f} detik...")
+        self.reopen_timer.start(delay)
+
+    def on_camera_stalled(self, reason):
+        """Kamera macet: hentikan grabber dan buka ulang di background dengan backoff."""
+        self.capture_button.setEnabled(False)
+        self.retire_grabber()
+        self.frame_pool.clear()
+        if self.frames_wanted:
+            self.frames_wanted = 0
+            QMessageBox.warning(self, "Kamera Error", "Gagal mengambil gambar dari kamera.")
+        delay = self.watchdog.reopen_delay_ms()
+        self.video_display.setText(f"Kamera tidak merespons ({reason}).\nMenyambung ulang...")
+        self.reopen_timer.start(delay)
+
+    def reopen_camera(self):
+        self.open_camera_async()
+
+    def camera_active(self):
+        return self.grabber is not None
+
+    def suspend_preview(self):
+        if self.grabber is not None and not self.preview_suspended:
+            self.grabber.pause()
+            self.watchdog.pause()
+            self.preview_suspended = True
+
+    def resume_preview(self):
+        if self.preview_suspended and self.camera_active():
+            self.preview_suspended = False
+            self.grabber.resume()
+            self.watchdog.resume()
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        self.resume_preview()
+
+    def hideEvent(self, event):
+        self.suspend_preview()
+        super().hideEvent(event)
+
+    def on_application_state_changed(self, state):
+        if state == Qt.ApplicationActive:
+            if self.isVisible():
+                self.resume_preview()
         else:
-            self.capture = cv2.VideoCapture(camera_num)
-            if not self.capture.isOpened():
-                self.video_display.setText("Error: Gagal membuka kamera.")
-                self.capture_button.setEnabled(False)
-                return
-            self.capture_button.setEnabled(True)
-            self.timer.timeout.connect(self.update_frame)
-            self.timer.start(30)
+            self.suspend_preview()
 
-    def stop_camera(self):
-        self.timer.stop()
-        if self.capture:
-            self.capture.release()
-            self.capture = None
-        if self.picam:
-            self.picam.stop()
-            self.picam.close()
-            self.picam = None
-
-    def update_frame_generic(self):
-        if PICAMERA_AVAILABLE and self.picam:
-            self.update_frame_picam()
-        elif self.capture:
-            self.update_frame()
-
-    def update_frame(self):
-        if not self.capture:
+    def on_frame_ready(self, frame, convert_ms):
+        grabber = self.sender()
+        if grabber is not self.grabber:
             return
-        ret, frame = self.capture.read()
-        if ret:
-            frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-            frame = cv2.flip(frame, 1)
-            h, w, ch = frame.shape
-            bytes_per_line = ch * w
-            q_image = QImage(frame.data, w, h, bytes_per_line, QImage.Format_RGB888)
-            pixmap = QPixmap.fromImage(q_image)
-            self.video_display.setPixmap(pixmap.scaled(
-                self.video_display.size(), Qt.KeepAspectRatio, Qt.SmoothTransformation
-            ))
-
-    def update_frame_picam(self):
-        if not self.picam:
+        self.watchdog.record_frame()
+        if self.frames_wanted:
+            self.take_frame(frame)
+        if self.grabber is not grabber:
+            # Pengambilan gambar selesai dan kamera sudah dimatikan
             return
-        frame = self.picam.capture_array()
-        frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        h, w, ch = frame.shape
-        bytes_per_line = ch * w
-        q_image = QImage(frame.data, w, h, bytes_per_line, QImage.Format_RGB888)
-        pixmap = QPixmap.fromImage(q_image)
-        self.video_display.setPixmap(pixmap.scaled(
-            self.video_display.size(), Qt.KeepAspectRatio, Qt.SmoothTransformation
-        ))
+        started = time.perf_counter()
+        self.show_preview(frame)
+        # Frame sudah disalin ke buffer tampilan; buffer grabber boleh ditulis lagi
+        grabber.frame_consumed()
+        self.pacer.record_tick((time.perf_counter() - started) * 1000 + convert_ms)
+        grabber.set_min_interval(self.pacer.interval_ms())
+
+    def on_frame_failed(self):
+        if self.sender() is self.grabber:
+            self.watchdog.record_failure()
+
+    def stop_camera(self):
+        if self.camera_active() or self.reopen_timer.isActive():
+            self.watchdog.stop()
+        self.reopen_timer.stop()
+        self.retire_grabber()
+        self.preview_suspended = False
+        self.active_opener = None
+        self.open_requested = False
+        self.frames_wanted = 0
+        self.frame_pool.clear()
+        self.burst_stack.clear()
+
+    def shutdown(self):
+        """Dipanggil saat aplikasi ditutup: tunggu thread pembuka dan grabber kamera selesai."""
+        self.stop_camera()
+        if self.opener_thread is not None:
+            self.opener_thread.quit()
+            self.opener_thread.wait()
+        for thread in list(self.retired_grabbers):
+            if not thread.wait(QDeadlineTimer(CameraGrabber.SHUTDOWN_TIMEOUT_MS)):
+                # Driver yang macet di read() tidak akan kembali; jangan tahan penutupan aplikasi
+                thread.terminate()
+                thread.wait()
+        self.retired_grabbers.clear()
+
+    def show_preview(self, frame):
+        # Selalu ditulis ke buffer "display" milik halaman: overlay tidak boleh
+        # mengenai buffer grabber, dan buffer itu dipakai ulang setelah frame_consumed()
+        display = fit_for_display(
+            self.frame_pool, frame, self.video_display.width(), self.video_display.height()
+        )
+        draw_guide_overlay(display, self.screening_type)
+        # Buffer pool dilukis langsung; tidak ada QPixmap per frame
+        self.video_display.set_frame(display)
 
     def on_capture_clicked(self):
-        if PICAMERA_AVAILABLE and self.picam:
-            frame = self.picam.capture_array()
-            frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        elif self.capture and self.capture.isOpened():
-            ret, frame = self.capture.read()
-            if not ret:
-                QMessageBox.warning(self, "Kamera Error", "Gagal mengambil gambar dari kamera.")
-                return
-            frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-            frame = cv2.flip(frame, 1)
-        else:
+        if not self.camera_active():
             QMessageBox.warning(self, "Kamera Error", "Kamera tidak aktif.")
             return
-
-        h, w, ch = frame.shape
-        bytes_per_line = ch * w
-        q_image = QImage(frame.data, w, h, bytes_per_line, QImage.Format_RGB888)
-        self.captured_pixmap = QPixmap.fromImage(q_image)
-        self.video_display.setPixmap(self.captured_pixmap.scaled(
-            self.video_display.size(), Qt.KeepAspectRatio, Qt.SmoothTransformation
-        ))
+        if self.frames_wanted:
+            return
+        # Frame diambil dari aliran grabber berikutnya (lihat take_frame)
+        self.burst_capture = self.burst_checkbox.isChecked()
+        self.frames_wanted = BURST_FRAME_COUNT if self.burst_capture else 1
+        self.burst_stack.clear()
+        self.capture_button.setEnabled(False)
+
+    def take_frame(self, frame):
+        """Mengumpulkan frame untuk tangkapan; burst memakai BURST_FRAME_COUNT frame berturut-turut."""
+        if self.burst_capture:
+            if self.burst_stack.count == 0:
+                self.burst_stack.reset(BURST_FRAME_COUNT, frame.shape)
+            self.burst_stack.add(frame)
+            self.frames_wanted -= 1
+            if self.frames_wanted:
+                return
+            frame = fuse_burst(self.burst_stack.active())
+        else:
+            self.frames_wanted = 0
+
+        # Hanya area subjek yang dikirim ke server
+        cropped = crop_to_roi(frame, self.screening_type)
+        # Buffer grabber dipakai ulang, jadi hasil tangkapan disalin sekali
+        if np.shares_memory(cropped, frame) and not self.burst_capture:
+            cropped = cropped.copy()
+        self.set_captured_frame(cropped)
         self.stop_camera()
 
+    def set_captured_frame(self, frame):
+        frame.flags.writeable = False
+        self.captured_frame = frame
+        self.pending_thumbnail = self.thumbnailer.request(frame, ("preview",))
+
     def on_upload_clicked(self):
         file_path, _ = QFileDialog.getOpenFileName(self, "Pilih Gambar", "", "Image Files (*.png *.jpg *.bmp)")
         if file_path:
             self.stop_camera()
-            self.captured_pixmap = QPixmap(file_path)
-            if self.captured_pixmap.isNull():
+            frame = load_image_file(file_path)
+            if frame is None:
+                self.captured_frame = None
                 QMessageBox.warning(self, "Error", "Gagal membaca file gambar.")
                 return
-            self.video_display.setPixmap(self.captured_pixmap.scaled(
-                self.video_display.size(), Qt.KeepAspectRatio, Qt.SmoothTransformation
-            ))
+            self.video_display.setText("Memuat gambar...")
+            self.set_captured_frame(crop_to_roi(frame, self.screening_type, use_guide=False))
+
+    def on_thumbnail_ready(self, tag, size_name, image):
+        # Abaikan thumbnail lama jika pengguna sudah mengambil gambar lain
+        if tag != self.pending_thumbnail:
+            return
+        self.pending_thumbnail = None
+        self.video_display.setPixmap(QPixmap.fromImage(image))
+
+    def on_thumbnail_failed(self, tag, error_msg):
+        if tag != self.pending_thumbnail:
+            return
+        self.pending_thumbnail = None
+        self.video_display.setText(f"Gagal menampilkan gambar: {error_msg}\nSilakan ambil atau upload ulang.")
 
     def on_next_clicked(self):
-        if not self.captured_pixmap or self.captured_pixmap.isNull():
+        if self.captured_frame is None:
+            QMessageBox.warning(self, "Tidak Ada Gambar", "Silakan ambil atau upload gambar terlebih dahulu.")
+            return
+        self.imageReady.emit(self.captured_frame)
+
+    def on_queue_clicked(self):
+        if self.captured_frame is None:
             QMessageBox.warning(self, "Tidak Ada Gambar", "Silakan ambil atau upload gambar terlebih dahulu.")
             return
-        self.imageReady.emit(self.captured_pixmap)
+        self.imageQueued.emit(self.captured_frame)
 
     def on_back_clicked(self):
         self.stop_camera()
@@ -6,13 +6,16 @@ from PySide6.QtWidgets import (
     QButtonGroup, QRadioButton
 )
 from components.header import Header
+from components.job_queue_panel import JobQueuePanel
 
 class InputDataPage(QWidget):
     dataSubmitted = Signal(dict)
     backClicked = Signal()
 
-    def __init__(self, parent=None):
+    def __init__(self, analysis_queue=None, parent=None):
         super().__init__(parent)
+        self.analysis_queue = analysis_queue
+        self.jobs_panel = None
         self.init_ui()
         self.connect_signals()
 
@@ -97,6 +100,11 @@ class InputDataPage(QWidget):
         main_layout.addWidget(form_card, 0, Qt.AlignCenter)
         main_layout.addSpacing(20)
         main_layout.addLayout(nav_layout)
+
+        if self.analysis_queue is not None:
+            self.jobs_panel = JobQueuePanel(self.analysis_queue)
+            main_layout.addSpacing(10)
+            main_layout.addWidget(self.jobs_panel, 0, Qt.AlignCenter)
         main_layout.addStretch()
 
     def connect_signals(self):
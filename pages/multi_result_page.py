@@ -0,0 +1,149 @@
+import qtawesome as qta
+from datetime import datetime
+
+from PySide6.QtCore import Qt, Signal
+from PySide6.QtWidgets import (
+    QWidget,
+    QLabel,
+    QPushButton,
+    QVBoxLayout,
+    QHBoxLayout,
+    QScrollArea
+)
+from components.header import Header
+from components.result_summary_card import ResultSummaryCard
+
+
+class MultiResultPage(QWidget):
+    """Hasil screening gabungan; setiap kartu terisi begitu analisisnya selesai."""
+
+    goHomeClicked = Signal()
+
+    def __init__(self, session_queue, parent=None):
+        super().__init__(parent)
+        self.session_queue = session_queue
+        self.cards = {}
+        self.job_types = {}
+        self.init_ui()
+        self.connect_signals()
+
+    def init_ui(self):
+        scroll = QScrollArea(self)
+        scroll.setWidgetResizable(True)
+        content = QWidget()
+        scroll.setWidget(content)
+
+        main_layout = QVBoxLayout(content)
+        main_layout.setContentsMargins(40, 20, 40, 40)
+        main_layout.setSpacing(20)
+        main_layout.setAlignment(Qt.AlignTop | Qt.AlignHCenter)
+
+        self.header = Header(self)
+        self.header.history_button.setVisible(False)
+        main_layout.addWidget(self.header, 0, Qt.AlignTop | Qt.AlignHCenter)
+
+        title_layout = QVBoxLayout()
+        title_layout.setAlignment(Qt.AlignCenter)
+        title = QLabel("Hasil Screening Gabungan")
+        title.setObjectName("h2")
+        title.setAlignment(Qt.AlignCenter)
+        self.patient_info_label = QLabel("")
+        self.patient_info_label.setObjectName("p")
+        self.patient_info_label.setAlignment(Qt.AlignCenter)
+        self.progress_label = QLabel("")
+        self.progress_label.setObjectName("stepLabel")
+        self.progress_label.setAlignment(Qt.AlignCenter)
+        title_layout.addWidget(title, alignment=Qt.AlignCenter)
+        title_layout.addWidget(self.patient_info_label, alignment=Qt.AlignCenter)
+        title_layout.addSpacing(10)
+        title_layout.addWidget(self.progress_label, alignment=Qt.AlignCenter)
+        main_layout.addLayout(title_layout)
+        main_layout.addSpacing(20)
+
+        self.card_layout = QHBoxLayout()
+        self.card_layout.setAlignment(Qt.AlignCenter)
+        self.card_layout.setSpacing(32)
+        main_layout.addLayout(self.card_layout)
+        main_layout.addSpacing(20)
+
+        self.home_button = QPushButton("Kembali ke Menu Utama")
+        self.home_button.setObjectName("primaryButton")
+        self.home_button.setIcon(qta.icon("fa5s.home", color="white"))
+        main_layout.addWidget(self.home_button, 0, Qt.AlignCenter)
+        main_layout.addStretch()
+
+        window_layout = QVBoxLayout(self)
+        window_layout.addWidget(scroll)
+
+    def connect_signals(self):
+        self.home_button.clicked.connect(self.goHomeClicked.emit)
+        self.session_queue.jobFinished.connect(self.on_job_finished)
+        self.session_queue.jobFailed.connect(self.on_job_failed)
+        self.session_queue.jobSaveFailed.connect(self.on_job_save_failed)
+
+    def start_session(self, patient_data, screening_types):
+        for card in self.cards.values():
+            self.card_layout.removeWidget(card)
+            card.deleteLater()
+        self.cards = {}
+        self.job_types = {}
+
+        for screening_type in screening_types:
+            card = ResultSummaryCard(screening_type)
+            self.card_layout.addWidget(card)
+            self.cards[screening_type] = card
+
+        gender = {"male": "Pria", "female": "Wanita"}.get(patient_data.get("gender"), "N/A")
+        self.patient_info_label.setText(
+            f"Nama: {patient_data.get('name', 'N/A')} | Umur: {patient_data.get('age', 'N/A')} | "
+            f"Jenis Kelamin: {gender}"
+        )
+        self.update_progress()
+
+    def bind_job(self, screening_type, job_id):
+        self.job_types[job_id] = screening_type
+        card = self.cards.get(screening_type)
+        if card:
+            card.set_pending("Mengirim data dan menunggu hasil...")
+        # Job bisa saja sudah selesai sebelum halaman ini ditampilkan
+        job = self.session_queue.jobs.get(job_id)
+        if job and job["status"] == "done":
+            self.on_job_finished(job_id, job["result"])
+        elif job and job["status"] == "failed":
+            self.on_job_failed(job_id, job["error"])
+
+    def on_job_finished(self, job_id, result_data):
+        card = self.cards.get(self.job_types.get(job_id))
+        if card is None:
+            return
+        job = self.session_queue.jobs.get(job_id)
+        elapsed = job["finished_time"] - job["submitted_time"] if job else None
+        card.set_result(result_data, elapsed=elapsed)
+        if job and job.get("save_error"):
+            card.set_save_error(job["save_error"])
+        self.update_progress()
+
+    def on_job_save_failed(self, job_id, error_msg):
+        card = self.cards.get(self.job_types.get(job_id))
+        if card is not None:
+            card.set_save_error(error_msg)
+
+    def on_job_failed(self, job_id, error_msg):
+        card = self.cards.get(self.job_types.get(job_id))
+        if card is None:
+            return
+        card.set_error(error_msg)
+        self.update_progress()
+
+    def update_progress(self):
+        finished = sum(
+            1 for job_id in self.job_types
+            if self.session_queue.jobs.get(job_id, {}).get("status") in ("done", "failed")
+        )
+        total = len(self.cards)
+        if total and finished == total:
+            self.progress_label.setText(
+                f"Selesai pada {datetime.now().strftime('%d %b %Y, %H:%M')}"
+            )
+        else:
+            self.progress_label.setText(f"{finished} dari {total} analisis selesai")
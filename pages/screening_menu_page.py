@@ -1,13 +1,15 @@
 import qtawesome as qta
 from PySide6.QtCore import Qt, Signal
 from PySide6.QtWidgets import (
-    QWidget, QLabel, QVBoxLayout, QHBoxLayout,
+    QWidget, QLabel, QVBoxLayout, QHBoxLayout, QCheckBox,
+    QPushButton, QMessageBox
 )
 from components.header import Header
 from components.card import ScreeningChoiceCard
 
 class ScreeningMenuPage(QWidget):
     startScreening = Signal(str)
+    startMultiScreening = Signal(list)
     goBack = Signal()
 
     def __init__(self, parent=None):
@@ -73,9 +75,39 @@ class ScreeningMenuPage(QWidget):
         card_layout.addWidget(card2)
         card_layout.addWidget(card3)
 
+        # Screening gabungan: data pasien diisi sekali untuk beberapa jenis screening
+        multi_box = QWidget()
+        multi_box.setObjectName("guideBox")
+        multi_layout = QHBoxLayout(multi_box)
+        multi_layout.setSpacing(20)
+        multi_label = QLabel("Screening Gabungan:")
+        multi_label.setObjectName("p")
+        multi_layout.addWidget(multi_label)
+        self.multi_checkboxes = {}
+        for card in (card1, card2, card3):
+            checkbox = QCheckBox(card.title_label.text())
+            self.multi_checkboxes[card.type] = checkbox
+            multi_layout.addWidget(checkbox)
+        self.multi_button = QPushButton("Mulai Screening Gabungan")
+        self.multi_button.setObjectName("primaryButton")
+        self.multi_button.setIcon(qta.icon("fa5s.layer-group", color="white"))
+        self.multi_button.clicked.connect(self.on_multi_clicked)
+        multi_layout.addWidget(self.multi_button)
+
         main_layout.addWidget(self.header, 0, Qt.AlignTop | Qt.AlignHCenter)
         main_layout.addSpacing(30)
         main_layout.addLayout(title_layout)
         main_layout.addSpacing(30)
         main_layout.addLayout(card_layout)
+        main_layout.addSpacing(30)
+        main_layout.addWidget(multi_box, 0, Qt.AlignCenter)
         main_layout.addStretch()
+
+    def on_multi_clicked(self):
+        screening_types = [
+            type_str for type_str, checkbox in self.multi_checkboxes.items() if checkbox.isChecked()
+        ]
+        if len(screening_types) < 2:
+            QMessageBox.warning(self, "Pilihan Kurang", "Pilih minimal dua jenis screening untuk screening gabungan.")
+            return
+        self.startMultiScreening.emit(screening_types)
@@ -8,22 +8,46 @@ from PySide6.QtWidgets import (
     QLabel,
     QPushButton,
     QVBoxLayout,
-    QMessageBox,
+    QHBoxLayout,
     QScrollArea
 )
 from PySide6.QtNetwork import QNetworkAccessManager, QNetworkRequest, QNetworkReply
 
 from api_woker import ApiWorker
-from config import API_BASE_URL
+from config import API_BASE_URL, FETCH_SERVER_ANNOTATED_IMAGE
 from components.header import Header
+from services.detection_overlay import draw_detections
+from services.history_store import now_timestamp
+from services.image_utils import load_image_file
+from services.report_generator import get_report_service
+from services.result_parser import parse_result
+from services.thumbnailer import get_thumbnail_service
 
 class ScreeningResultPage(QWidget):
     goHomeClicked = Signal()
 
-    def __init__(self, parent=None):
+    def __init__(self, history_store=None, parent=None):
         super().__init__(parent)
         self.api_thread = None
         self.api_worker = None
+        # Thread lama yang masih berjalan setelah analisis baru dimulai
+        self.retiring_threads = {}
+        self.history_store = history_store
+        self.current_screening_type = None
+        self.current_patient_data = None
+        self.started_at = None
+        self.current_record_id = None
+        self.current_frame = None
+        self.sent_size = None
+        self.local_image_shown = False
+        self.current_overlay = None
+        self.pending_thumbnail = None
+        self.pending_report = None
+        self.thumbnailer = get_thumbnail_service()
+        self.thumbnailer.thumbnailReady.connect(self.on_thumbnail_ready)
+        self.report_service = get_report_service()
+        self.report_service.reportReady.connect(self.on_report_ready)
+        self.report_service.reportFailed.connect(self.on_report_failed)
         self.image_downloader = QNetworkAccessManager(self)
         self.image_downloader.finished.connect(self.on_image_downloaded)
         self.init_ui()
@@ -102,11 +126,31 @@ class ScreeningResultPage(QWidget):
         main_layout.addWidget(result_card, 0, Qt.AlignCenter)
         main_layout.addSpacing(20)
 
-        # Home button
+        # Tombol laporan dan home
+        button_layout = QHBoxLayout()
+        button_layout.setSpacing(20)
+        button_layout.setAlignment(Qt.AlignCenter)
+        self.report_button = QPushButton("Unduh Laporan")
+        self.report_button.setObjectName("secondaryButton")
+        self.report_button.setIcon(qta.icon("fa5s.file-pdf"))
+        self.report_button.setEnabled(False)
         self.home_button = QPushButton("Kembali ke Menu Utama")
         self.home_button.setObjectName("primaryButton")
         self.home_button.setIcon(qta.icon("fa5s.home", color="white"))
-        main_layout.addWidget(self.home_button, 0, Qt.AlignCenter)
+        self.retry_button = QPushButton("Coba Lagi")
+        self.retry_button.setObjectName("secondaryButton")
+        self.retry_button.setIcon(qta.icon("fa5s.redo"))
+        self.retry_button.setVisible(False)
+        button_layout.addWidget(self.retry_button)
+        button_layout.addWidget(self.report_button)
+        button_layout.addWidget(self.home_button)
+        main_layout.addLayout(button_layout)
+
+        self.report_status_label = QLabel("")
+        self.report_status_label.setObjectName("p")
+        self.report_status_label.setAlignment(Qt.AlignCenter)
+        self.report_status_label.setWordWrap(True)
+        main_layout.addWidget(self.report_status_label, 0, Qt.AlignCenter)
         main_layout.addStretch()
 
         # Layout utama window
@@ -115,8 +159,10 @@ class ScreeningResultPage(QWidget):
 
     def connect_signals(self):
         self.home_button.clicked.connect(self.goHomeClicked.emit)
+        self.report_button.clicked.connect(self.on_report_clicked)
+        self.retry_button.clicked.connect(self.on_retry_clicked)
 
-    def start_analysis(self, screening_type, patient_data, image_pixmap):
+    def reset_view(self, screening_type, patient_data):
         # Reset UI
         self.status_text_label.setText("Menganalisis...")
         self.status_text_label.setStyleSheet("")
@@ -125,69 +171,108 @@ class ScreeningResultPage(QWidget):
         self.confidence_label.setVisible(False)
         self.patient_info_label.setText("")
         self.date_label.setText("")
+        self.report_button.setEnabled(False)
+        self.retry_button.setVisible(False)
+        self.report_status_label.setText("")
+        self.report_status_label.setStyleSheet("")
+
+        self.current_screening_type = screening_type
+        self.current_patient_data = patient_data
+        self.started_at = now_timestamp()
+        self.current_record_id = None
+        self.current_frame = None
+        self.sent_size = None
+        self.local_image_shown = False
+        self.current_overlay = None
+        self.pending_thumbnail = None
+        self.pending_report = None
 
         # Loading spinner
         loading_icon = qta.icon("fa5s.spinner", color="#10B981")
         self.status_icon_label.setPixmap(loading_icon.pixmap(QSize(64, 64)))
 
-        # Stop worker lama
-        if self.api_thread and self.api_thread.isRunning():
-            self.api_thread.quit()
-            self.api_thread.wait()
+    def start_analysis(self, screening_type, patient_data, image_frame):
+        self.reset_view(screening_type, patient_data)
+        self.current_frame = image_frame
+
+        # Worker lama dibiarkan selesai di background; hasilnya diabaikan
+        self.retire_api_worker()
 
         # Start worker baru
         self.api_thread = QThread()
-        self.api_worker = ApiWorker(screening_type, patient_data, image_pixmap)
+        self.api_worker = ApiWorker(screening_type, patient_data, image_frame)
         self.api_worker.moveToThread(self.api_thread)
         self.api_thread.started.connect(self.api_worker.run)
         self.api_worker.finished.connect(self.on_analysis_finished)
         self.api_worker.error.connect(self.on_analysis_error)
         self.api_worker.finished.connect(self.api_thread.quit)
         self.api_worker.error.connect(self.api_thread.quit)
+        self.api_thread.finished.connect(self.on_api_thread_finished)
         self.api_thread.start()
+
+    def retire_api_worker(self):
+        if self.api_thread is None:
+            return
+        self.api_worker.finished.disconnect(self.on_analysis_finished)
+        self.api_worker.error.disconnect(self.on_analysis_error)
+        self.retiring_threads[self.api_thread] = self.api_worker
+        self.api_thread = None
+        self.api_worker = None
+
+    def on_api_thread_finished(self):
+        # Thread dan worker dimiliki Python: dilepas di sini setelah thread
+        # benar-benar berhenti, bukan lewat deleteLater (bisa terhapus dua kali)
+        thread = self.sender()
+        thread.wait()
+        self.retiring_threads.pop(thread, None)
+        if thread is self.api_thread:
+            self.api_thread = None
+            self.api_worker = None
+
+    def shutdown(self):
+        """Menunggu semua thread analisis selesai (dipanggil saat aplikasi ditutup)."""
+        threads = list(self.retiring_threads)
+        if self.api_thread is not None:
+            threads.append(self.api_thread)
+        for thread in threads:
+            thread.quit()
+            thread.wait()
         
+    def show_result(self, screening_type, patient_data, result_data, record_id=None):
+        """Menampilkan hasil yang sudah selesai dianalisis di luar halaman ini (mode antrian)."""
+        self.reset_view(screening_type, patient_data)
+        self.current_record_id = record_id
+        self.current_frame = self.load_captured_frame(record_id)
+        if self.current_frame is not None:
+            # Gambar riwayat adalah gambar yang dikirim, jadi ukurannya = sent_size
+            self.sent_size = (self.current_frame.shape[1], self.current_frame.shape[0])
+        self.display_result(result_data)
+
+    def load_captured_frame(self, record_id):
+        """Gambar yang dikirim ke server, dibaca dari riwayat (mode antrian)."""
+        if not (self.history_store and record_id):
+            return None
+        record = self.history_store.get_record(record_id)
+        if not record or not record.get("captured_image_path"):
+            return None
+        return load_image_file(record["captured_image_path"])
+
     def on_analysis_finished(self, result_data):
+        if self.api_worker:
+            self.sent_size = self.api_worker.sent_size
+        self.save_to_history(result_data)
+        self.display_result(result_data)
+
+    def display_result(self, result_data):
         try:
-            detections = result_data.get("detections", [])
             user = result_data.get("user", {})
 
-            # Default values
-            confidence = 0
-            if not detections:
-                status = "Gagal Deteksi"
-                summary = "AI gagal mendeteksi apapun dari gambar ini."
-            else:
-                detected_class = int(detections[0].get("class", -1))
-                confidence = float(detections[0].get("conf", 0)) * 100
-
-                if detected_class == 0:
-                    status = "Normal"
-                    summary = "Hasil normal, tidak ada abnormalitas."
-                elif detected_class == 1:
-                    status = result_data.get("category", "Terdeteksi")
-                    summary = f"Terdeteksi {status} pada gambar."
-                else:
-                    status = result_data.get("category", "Terdeteksi")
-                    summary = f"Terdeteksi {status} pada gambar."
-
-            # Mapping warna & icon
-            color_map = {
-                "Normal": "#10B981",
-                "Anemia": "#F59E0B",
-                "Malnutrisi": "#EF4444",
-                "Diabetic Retinopathy": "#EF4444",
-                "Gagal Deteksi": "#6B7280"
-            }
-            icon_map = {
-                "Normal": "fa5s.check-circle",
-                "Anemia": "fa5s.exclamation-triangle",
-                "Malnutrisi": "fa5s.exclamation-triangle",
-                "Diabetic Retinopathy": "fa5s.exclamation-triangle",
-                "Gagal Deteksi": "fa5s.times-circle"
-            }
-
-            result_color = color_map.get(status, "#4B5563")
-            result_icon = qta.icon(icon_map.get(status, "fa5s.question-circle"), color=result_color)
+            parsed = parse_result(result_data)
+            status = parsed["status"]
+            summary = parsed["summary"]
+            confidence = parsed["confidence"]
+            result_color = parsed["color"]
+            result_icon = qta.icon(parsed["icon"], color=result_color)
 
             # Update UI
             self.status_icon_label.setPixmap(result_icon.pixmap(QSize(64, 64)))
@@ -203,15 +288,44 @@ class ScreeningResultPage(QWidget):
             )
             self.date_label.setText(f"Dihasilkan pada {datetime.now().strftime('%d %b %Y, %H:%M')}")
 
-            # Download gambar hasil
+            self.show_local_overlay(result_data)
+            self.report_button.setEnabled(bool(self.history_store and self.current_record_id))
+
+            # Gambar anotasi server hanya diunduh di latar belakang jika diaktifkan
             image_path = result_data.get("image_path")
-            if image_path:
+            if image_path and FETCH_SERVER_ANNOTATED_IMAGE:
                 url = f"{API_BASE_URL}/api/{image_path}"
-                self.image_downloader.get(QNetworkRequest(QUrl(url)))
+                request = QNetworkRequest(QUrl(url))
+                request.setAttribute(QNetworkRequest.User, self.current_record_id)
+                self.image_downloader.get(request)
 
         except Exception as e:
             self.on_analysis_error(f"Gagal mem-parsing data: {str(e)}")
 
+    def show_local_overlay(self, result_data):
+        """Menggambar deteksi di atas gambar yang masih dipegang klien, tanpa round trip."""
+        if self.current_frame is None:
+            return
+        overlay = draw_detections(self.current_frame, result_data, self.sent_size)
+        if overlay is None:
+            overlay = self.current_frame
+        self.current_overlay = overlay
+        self.local_image_shown = True
+        self.pending_thumbnail = self.thumbnailer.request(overlay, ("preview",))
+
+    def save_to_history(self, result_data):
+        if not self.history_store:
+            return
+        try:
+            encoded_image = self.api_worker.encoded_image if self.api_worker else None
+            self.current_record_id = self.history_store.record_screening(
+                self.current_screening_type, self.current_patient_data, result_data,
+                started_at=self.started_at, encoded_image=encoded_image
+            )
+        except Exception as e:
+            # Hasil tetap ditampilkan, tapi operator harus tahu catatannya tidak tersimpan
+            self.report_status_label.setText(f"Hasil tidak tersimpan ke riwayat: {e}")
+            self.report_status_label.setStyleSheet("color: #EF4444;")
 
     def on_analysis_error(self, error_msg):
         error_icon = qta.icon("fa5s.times-circle", color="#EF4444")
@@ -220,21 +334,54 @@ class ScreeningResultPage(QWidget):
         self.status_text_label.setStyleSheet("color: #EF4444;")
         self.summary_label.setText(error_msg)
         self.date_label.setText("")
-        QMessageBox.critical(self, "Error API", error_msg)
+        # Tanpa dialog modal: operator bisa langsung mencoba lagi atau kembali ke menu
+        self.retry_button.setVisible(self.current_frame is not None and self.current_record_id is None)
+
+    def on_retry_clicked(self):
+        self.start_analysis(self.current_screening_type, self.current_patient_data, self.current_frame)
 
     def on_image_downloaded(self, reply):
         try:
             if reply.error() == QNetworkReply.NoError:
-                data = reply.readAll()
-                pixmap = QPixmap()
-                if pixmap.loadFromData(data):
-                    self.result_image_label.setPixmap(pixmap.scaled(
-                        640, 480, Qt.KeepAspectRatio, Qt.SmoothTransformation
-                    ))
-                    self.result_image_label.setVisible(True)
+                data = reply.readAll().data()
+                record_id = reply.request().attribute(QNetworkRequest.User)
+                if self.history_store and record_id:
+                    path = self.history_store.store_image(data)
+                    self.history_store.set_result_image(record_id, path)
+                if record_id == self.current_record_id and not self.local_image_shown:
+                    self.pending_thumbnail = self.thumbnailer.request(data, ("preview",))
             else:
                 print(f"Image download error: {reply.errorString()}")
         except Exception as e:
             print(f"Error processing image: {e}")
         finally:
             reply.deleteLater()
+
+    def on_thumbnail_ready(self, tag, size_name, image):
+        if tag != self.pending_thumbnail:
+            return
+        self.pending_thumbnail = None
+        self.result_image_label.setPixmap(QPixmap.fromImage(image))
+        self.result_image_label.setVisible(True)
+
+    def on_report_clicked(self):
+        record = self.history_store.get_record(self.current_record_id) if self.history_store else None
+        if not record:
+            return
+        self.report_button.setEnabled(False)
+        self.report_status_label.setText("Membuat laporan...")
+        self.pending_report = self.report_service.request(record, self.current_overlay)
+
+    def on_report_ready(self, tag, path):
+        if tag != self.pending_report:
+            return
+        self.pending_report = None
+        self.report_button.setEnabled(True)
+        self.report_status_label.setText(f"Laporan disimpan di {path}")
+
+    def on_report_failed(self, tag, error_msg):
+        if tag != self.pending_report:
+            return
+        self.pending_report = None
+        self.report_button.setEnabled(True)
+        self.report_status_label.setText(f"Gagal membuat laporan: {error_msg}")
@@ -0,0 +1,149 @@
+import time
+import itertools
+from collections import deque
+
+from PySide6.QtCore import QObject, QThread, Signal, Slot
+
+from api_woker import ApiWorker
+from config import ANALYSIS_MAX_IN_FLIGHT
+from services.history_store import now_timestamp
+
+
+class AnalysisQueue(QObject):
+    """Antrian job analisis dengan batas jumlah request yang berjalan bersamaan.
+
+    Setiap job dijalankan oleh ApiWorker di QThread sendiri, sama seperti alur
+    satu pasien di ScreeningResultPage. Worker dimiliki Python dan baru dilepas
+    setelah thread-nya benar-benar berhenti; thread dihapus dengan deleteLater.
+    """
+
+    jobQueued = Signal(int)
+    jobStarted = Signal(int)
+    jobFinished = Signal(int, dict)
+    jobFailed = Signal(int, str)
+    jobRemoved = Signal(int)
+    jobSaveFailed = Signal(int, str)
+
+    MAX_FINISHED_JOBS = 50
+
+    def __init__(self, max_in_flight=ANALYSIS_MAX_IN_FLIGHT, parent=None):
+        super().__init__(parent)
+        self.max_in_flight = max(1, max_in_flight)
+        self.jobs = {}
+        self.pending = deque()
+        self.running = {}
+        # Worker yang sudah selesai tetap direferensikan sampai thread-nya berhenti
+        self.retiring = {}
+        self._ids = itertools.count(1)
+
+    def submit(self, screening_type, patient_data, image_frame):
+        job_id = next(self._ids)
+        self.jobs[job_id] = {
+            "id": job_id,
+            "screening_type": screening_type,
+            "patient_data": dict(patient_data),
+            "image": image_frame,
+            "status": "queued",
+            "queued_at": now_timestamp(),
+            "submitted_time": time.monotonic(),
+            "finished_time": None,
+            "started_at": None,
+            "result": None,
+            "error": None,
+            "encoded_image": None,
+            "save_error": None,
+        }
+        self.pending.append(job_id)
+        self.jobQueued.emit(job_id)
+        self.start_pending()
+        return job_id
+
+    def mark_save_failed(self, job_id, error_msg):
+        """Hasil job selesai tetapi gagal disimpan ke riwayat."""
+        job = self.jobs.get(job_id)
+        if job is None:
+            return
+        job["save_error"] = error_msg
+        self.jobSaveFailed.emit(job_id, error_msg)
+
+    def in_flight_count(self):
+        return len(self.running)
+
+    def pending_count(self):
+        return len(self.pending)
+
+    def start_pending(self):
+        while self.pending and len(self.running) < self.max_in_flight:
+            job_id = self.pending.popleft()
+            job = self.jobs[job_id]
+            job["status"] = "running"
+            job["started_at"] = now_timestamp()
+
+            thread = QThread(self)
+            worker = ApiWorker(job["screening_type"], job["patient_data"], job["image"])
+            worker.moveToThread(thread)
+            thread.started.connect(worker.run)
+            worker.finished.connect(self.on_worker_finished)
+            worker.error.connect(self.on_worker_error)
+            worker.finished.connect(thread.quit)
+            worker.error.connect(thread.quit)
+            thread.finished.connect(self.on_thread_finished)
+
+            self.running[worker] = (job_id, thread)
+            thread.start()
+            self.jobStarted.emit(job_id)
+
+    def take_worker(self):
+        worker = self.sender()
+        job_id, thread = self.running.pop(worker, (None, None))
+        if job_id is None:
+            return None
+        self.retiring[thread] = worker
+        job = self.jobs[job_id]
+        job["finished_time"] = time.monotonic()
+        job["encoded_image"] = worker.encoded_image
+        # Gambar penuh tidak lagi dibutuhkan setelah terkirim
+        job["image"] = None
+        return job
+
+    @Slot(dict)
+    def on_worker_finished(self, result_data):
+        job = self.take_worker()
+        if job is None:
+            return
+        job["status"] = "done"
+        job["result"] = result_data
+        self.jobFinished.emit(job["id"], result_data)
+        self.prune_finished()
+        self.start_pending()
+
+    @Slot(str)
+    def on_worker_error(self, error_msg):
+        job = self.take_worker()
+        if job is None:
+            return
+        job["status"] = "failed"
+        job["error"] = error_msg
+        self.jobFailed.emit(job["id"], error_msg)
+        self.prune_finished()
+        self.start_pending()
+
+    def prune_finished(self):
+        finished = [job_id for job_id, job in self.jobs.items() if job["status"] in ("done", "failed")]
+        for job_id in finished[:-self.MAX_FINISHED_JOBS]:
+            del self.jobs[job_id]
+            self.jobRemoved.emit(job_id)
+
+    @Slot()
+    def on_thread_finished(self):
+        thread = self.sender()
+        thread.wait()
+        self.retiring.pop(thread, None)
+        thread.deleteLater()
+
+    def shutdown(self):
+        self.pending.clear()
+        threads = [thread for _, thread in self.running.values()] + list(self.retiring)
+        for thread in threads:
+            thread.quit()
+            thread.wait()
@@ -0,0 +1,123 @@
+import cv2
+import numpy as np
+
+from config import BURST_CLIP_SIGMA, BURST_REGISTER_MAX_SIDE, BURST_MIN_RESPONSE
+
+
+class BurstStack:
+    """Tumpukan N frame RGB yang dialokasikan sekali lalu dipakai ulang."""
+
+    def __init__(self):
+        self.frames = None
+        self.count = 0
+
+    def reset(self, size, shape):
+        if self.frames is None or self.frames.shape != (size,) + shape:
+            self.frames = np.empty((size,) + shape, dtype=np.uint8)
+        self.count = 0
+
+    def add(self, frame):
+        np.copyto(self.frames[self.count], frame)
+        self.count += 1
+
+    def full(self):
+        return self.frames is not None and self.count == len(self.frames)
+
+    def active(self):
+        return self.frames[:self.count]
+
+    def clear(self):
+        self.frames = None
+        self.count = 0
+
+
+def _registration_gray(frame, scale):
+    gray = cv2.cvtColor(frame, cv2.COLOR_RGB2GRAY)
+    if scale != 1.0:
+        gray = cv2.resize(gray, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+    return gray.astype(np.float32)
+
+
+def register_frames(frames, max_side=BURST_REGISTER_MAX_SIDE, min_response=BURST_MIN_RESPONSE):
+    """Menyelaraskan frame (in-place) ke frame tengah dengan phase correlation.
+
+    Hanya pergeseran translasi yang dikoreksi (getaran tangan saat memegang
+    kamera); estimasi dilakukan pada versi grayscale kecil lalu diskalakan.
+    Frame yang korelasinya terlalu lemah dibiarkan apa adanya.
+    """
+    count, height, width = frames.shape[:3]
+    if count < 2:
+        return []
+    scale = min(1.0, max_side / max(width, height))
+    reference_index = count // 2
+    reference = _registration_gray(frames[reference_index], scale)
+    window = cv2.createHanningWindow(reference.shape[::-1], cv2.CV_32F)
+
+    shifts = []
+    aligned = np.empty_like(frames[0])
+    for index in range(count):
+        if index == reference_index:
+            continue
+        (dx, dy), response = cv2.phaseCorrelate(
+            reference, _registration_gray(frames[index], scale), window
+        )
+        dx, dy = dx / scale, dy / scale
+        if response < min_response or (abs(dx) < 0.5 and abs(dy) < 0.5):
+            continue
+        matrix = np.float32([[1, 0, -dx], [0, 1, -dy]])
+        cv2.warpAffine(frames[index], matrix, (width, height), dst=aligned,
+                       flags=cv2.INTER_LINEAR, borderMode=cv2.BORDER_REFLECT)
+        np.copyto(frames[index], aligned)
+        shifts.append((index, dx, dy))
+    return shifts
+
+
+def _stack_median(frames):
+    """Median per piksel dengan jaringan perbandingan (odd-even transposition).
+
+    np.median/np.partition di sepanjang sumbu tumpukan lambat karena aksesnya
+    tidak berurutan; untuk N kecil, N putaran minimum/maximum elemen-per-elemen
+    antar frame jauh lebih cepat.
+    """
+    ordered = [frame.copy() for frame in frames]
+    count = len(ordered)
+    for round_index in range(count):
+        for i in range(round_index % 2, count - 1, 2):
+            low = np.minimum(ordered[i], ordered[i + 1])
+            np.maximum(ordered[i], ordered[i + 1], out=ordered[i + 1])
+            ordered[i] = low
+    return ordered[count // 2]
+
+
+def fuse_frames(frames, clip_sigma=BURST_CLIP_SIGMA):
+    """Menggabungkan frame dengan rata-rata ber-sigma-clipping per piksel.
+
+    Acuan tiap piksel adalah median tumpukan; simpangan diestimasi dengan MAD
+    sehingga piksel yang menyimpang (gerakan, noise impuls) tidak ikut
+    dirata-rata. Seluruhnya operasi NumPy tervektorisasi tanpa loop piksel.
+    """
+    count = len(frames)
+    if count == 1:
+        return frames[0].copy()
+
+    median = _stack_median(frames)
+    deviations = [cv2.absdiff(frame, median) for frame in frames]
+    mad = _stack_median(deviations)
+    # 1.4826 * MAD ~ sigma untuk noise Gaussian; batas bawah agar area rata tetap dirata-rata
+    limit = np.maximum(mad.astype(np.float32) * (1.4826 * clip_sigma), 3.0)
+
+    total = np.zeros(median.shape, dtype=np.uint16)
+    kept = np.zeros(median.shape, dtype=np.uint16)
+    for frame, deviation in zip(frames, deviations):
+        keep = deviation <= limit
+        np.add(total, frame, out=total, where=keep)
+        kept += keep
+    # Median selalu lolos (simpangannya 0), jadi kept >= 1
+    fused = (total + kept // 2) // kept
+    return fused.astype(np.uint8)
+
+
+def fuse_burst(frames):
+    """Registrasi lalu fusi; mengembalikan frame RGB baru (tidak berbagi memori)."""
+    register_frames(frames)
+    return fuse_frames(frames)
@@ -0,0 +1,322 @@
+import os
+import json
+import time
+import bisect
+import threading
+
+import cv2
+from PySide6.QtCore import QObject, QTimer, Signal
+
+from config import (
+    CAMERA_STALL_TIMEOUT_MS, CAMERA_MAX_READ_FAILURES, CAMERA_WATCHDOG_INTERVAL_MS,
+    CAMERA_REOPEN_BASE_DELAY_MS, CAMERA_REOPEN_MAX_DELAY_MS, CAMERA_METRICS_PATH,
+    CAMERA_METRICS_FLUSH_MS
+)
+from services.frame_pool import FramePool, read_capture, convert_camera_frame
+
+try:
+    from picamera2 import Picamera2
+except ImportError:
+    Picamera2 = None
+
+# Batas atas bucket histogram jeda antar-frame (ms); bucket terakhir tanpa batas
+GAP_BUCKETS_MS = (50, 100, 200, 500, 1000, 2000)
+
+
+class FrameGapStats:
+    """Histogram jeda antar-frame dan penghitung kegagalan untuk satu kamera."""
+
+    def __init__(self):
+        self.histogram = [0] * (len(GAP_BUCKETS_MS) + 1)
+        self.frames = 0
+        self.read_failures = 0
+        self.stalls = 0
+        self.reopen_attempts = 0
+        self.reopen_successes = 0
+        self.max_gap_ms = 0.0
+        self.total_gap_ms = 0.0
+
+    def add_gap(self, gap_ms):
+        self.histogram[bisect.bisect_left(GAP_BUCKETS_MS, gap_ms)] += 1
+        self.max_gap_ms = max(self.max_gap_ms, gap_ms)
+        self.total_gap_ms += gap_ms
+
+    def to_dict(self):
+        labels = [f"<={limit}ms" for limit in GAP_BUCKETS_MS] + [f">{GAP_BUCKETS_MS[-1]}ms"]
+        gaps = sum(self.histogram)
+        return {
+            "frames": self.frames,
+            "read_failures": self.read_failures,
+            "stalls": self.stalls,
+            "reopen_attempts": self.reopen_attempts,
+            "reopen_successes": self.reopen_successes,
+            "max_gap_ms": round(self.max_gap_ms, 1),
+            "mean_gap_ms": round(self.total_gap_ms / gaps, 1) if gaps else 0.0,
+            "gap_histogram": dict(zip(labels, self.histogram)),
+        }
+
+
+class CameraWatchdog(QObject):
+    """Mendeteksi kamera yang macet dari jeda frame dan kegagalan baca.
+
+    Halaman kamera melapor lewat record_frame()/record_failure() untuk setiap
+    sinyal dari CameraGrabber; timer watchdog (di UI thread, tidak ikut
+    tertahan read() yang macet) memeriksa apakah frame terakhir sudah terlalu
+    lama atau gagal baca beruntun melewati batas, lalu memancarkan
+    stallDetected.
+    Pemulihan (membuka ulang perangkat) dilakukan pemanggil dengan
+    reopen_delay_ms() sebagai backoff eksponensial.
+    """
+
+    stallDetected = Signal(str)
+
+    def __init__(self, metrics_path=CAMERA_METRICS_PATH, parent=None):
+        super().__init__(parent)
+        self.metrics_path = metrics_path
+        self.stats = {}
+        self.camera_key = None
+        self.last_frame_time = None
+        self.consecutive_failures = 0
+        self.reopen_attempt = 0
+        self.timer = QTimer(self)
+        self.timer.setInterval(CAMERA_WATCHDOG_INTERVAL_MS)
+        self.timer.timeout.connect(self.check)
+        self.flush_timer = QTimer(self)
+        self.flush_timer.setInterval(CAMERA_METRICS_FLUSH_MS)
+        self.flush_timer.timeout.connect(self.write_metrics)
+
+    def current(self):
+        return self.stats.setdefault(self.camera_key, FrameGapStats())
+
+    def start(self, camera_key):
+        """Mulai memantau kamera yang baru terbuka."""
+        self.camera_key = str(camera_key)
+        self.current()
+        self.resume()
+        if not self.flush_timer.isActive():
+            self.flush_timer.start()
+
+    def resume(self):
+        # Jeda selama preview disuspend tidak dihitung sebagai macet
+        self.last_frame_time = time.monotonic()
+        self.consecutive_failures = 0
+        self.timer.start()
+
+    def pause(self):
+        self.timer.stop()
+        self.last_frame_time = None
+
+    def stop(self):
+        self.pause()
+        self.flush_timer.stop()
+        self.write_metrics()
+
+    def record_frame(self):
+        now = time.monotonic()
+        stats = self.current()
+        if self.last_frame_time is not None and stats.frames:
+            stats.add_gap((now - self.last_frame_time) * 1000)
+        stats.frames += 1
+        self.last_frame_time = now
+        self.consecutive_failures = 0
+        if self.reopen_attempt:
+            stats.reopen_successes += 1
+            self.reopen_attempt = 0
+
+    def record_failure(self):
+        self.current().read_failures += 1
+        self.consecutive_failures += 1
+
+    def check(self):
+        if self.last_frame_time is None:
+            return
+        stalled_ms = (time.monotonic() - self.last_frame_time) * 1000
+        if self.consecutive_failures >= CAMERA_MAX_READ_FAILURES:
+            reason = f"{self.consecutive_failures} kali gagal membaca frame"
+        elif stalled_ms >= CAMERA_STALL_TIMEOUT_MS:
+            reason = f"tidak ada frame selama {stalled_ms / 1000:.1f} detik"
+        else:
+            return
+        self.current().stalls += 1
+        self.pause()
+        self.stallDetected.emit(reason)
+
+    def reopen_delay_ms(self):
+        """Backoff eksponensial untuk percobaan buka ulang berikutnya."""
+        delay = min(CAMERA_REOPEN_MAX_DELAY_MS, CAMERA_REOPEN_BASE_DELAY_MS * (2 ** self.reopen_attempt))
+        self.reopen_attempt += 1
+        self.current().reopen_attempts += 1
+        return delay
+
+    def reset_backoff(self):
+        self.reopen_attempt = 0
+
+    def snapshot(self):
+        return {
+            "updated_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "cameras": {key: stats.to_dict() for key, stats in self.stats.items() if key is not None},
+        }
+
+    def write_metrics(self):
+        if not self.metrics_path or not self.stats:
+            return
+        try:
+            directory = os.path.dirname(self.metrics_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            tmp_path = f"{self.metrics_path}.tmp"
+            with open(tmp_path, "w") as f:
+                json.dump(self.snapshot(), f, indent=2)
+            os.replace(tmp_path, self.metrics_path)
+        except OSError as e:
+            print(f"Gagal menulis metrik kamera: {e}")
+
+
+def release_device(device):
+    """Melepas VideoCapture atau Picamera2."""
+    try:
+        if hasattr(device, "release"):
+            device.release()
+        else:
+            device.stop()
+            device.close()
+    except Exception as e:
+        print(f"Gagal melepas kamera: {e}")
+
+
+class CameraOpener(QObject):
+    """Membuka (dan melepas) perangkat kamera di background thread.
+
+    Membuka VideoCapture atau Picamera2 bisa memblokir beberapa detik; hasilnya
+    dikirim lewat opened(kind, device) atau failed(pesan). released berisi
+    event CameraGrabber lama: perangkat yang sama baru dibuka setelah grabber
+    lama melepasnya (atau batas tunggu habis jika read() lama macet).
+    """
+
+    opened = Signal(str, object)
+    failed = Signal(str)
+
+    RELEASE_TIMEOUT = 2.0
+
+    def __init__(self, camera_num, use_picamera=False, released=()):
+        super().__init__()
+        self.camera_num = camera_num
+        self.use_picamera = use_picamera
+        self.released = list(released)
+
+    def run(self):
+        for event in self.released:
+            event.wait(self.RELEASE_TIMEOUT)
+        self.released = []
+        picamera_error = None
+        if self.use_picamera and Picamera2 is not None:
+            try:
+                picam = Picamera2()
+                picam.configure(picam.create_preview_configuration(main={"size": (640, 480)}))
+                picam.start()
+                self.opened.emit("picamera", picam)
+                return
+            except Exception as e:
+                picamera_error = e
+
+        capture = cv2.VideoCapture(self.camera_num)
+        if not capture.isOpened():
+            capture.release()
+            message = "Gagal membuka kamera."
+            if picamera_error:
+                message = f"Gagal membuka Picamera2 ({picamera_error}) dan OpenCV."
+            self.failed.emit(message)
+            return
+        self.opened.emit("opencv", capture)
+
+
+class CameraGrabber(QObject):
+    """Membaca frame kamera terus-menerus di thread sendiri.
+
+    read() yang memblokir (kamera lambat atau macet) tidak lagi menahan UI
+    thread, sehingga watchdog tetap berjalan. Frame RGB dikirim lewat
+    frameReady (koneksi queued) memakai dua buffer bergantian: buffer yang
+    sudah dikirim tidak ditulis lagi sampai UI memanggil frame_consumed().
+    Selama itu frame baru tetap dibaca (agar antrean driver tidak basi) tapi
+    tidak dikirim. Perangkat dimiliki thread ini dan dilepas saat berhenti.
+    """
+
+    frameReady = Signal(object, float)
+    readFailed = Signal()
+    finished = Signal()
+
+    # Jeda setelah read() gagal agar perangkat yang error tidak membuat busy loop
+    FAILURE_BACKOFF = 0.05
+    # Batas tunggu thread saat aplikasi ditutup
+    SHUTDOWN_TIMEOUT_MS = 2000
+
+    def __init__(self, kind, device):
+        super().__init__()
+        self.kind = kind
+        self.device = device
+        self.pools = (FramePool(), FramePool())
+        self.write_index = 0
+        self.pending = threading.Event()
+        self.active = threading.Event()
+        self.active.set()
+        self.released = threading.Event()
+        self.stop_requested = False
+        self.min_interval = 0.0
+        self.last_emit = 0.0
+
+    def stop(self):
+        self.stop_requested = True
+        self.active.set()
+
+    def pause(self):
+        self.active.clear()
+
+    def resume(self):
+        self.active.set()
+
+    def frame_consumed(self):
+        """Dipanggil UI setelah selesai memakai frame terakhir (sudah disalin)."""
+        self.pending.clear()
+
+    def set_min_interval(self, interval_ms):
+        self.min_interval = interval_ms / 1000
+
+    def read_raw(self, pool):
+        if self.kind == "picamera":
+            try:
+                return self.device.capture_array()
+            except Exception:
+                return None
+        if not self.device.isOpened():
+            return None
+        return read_capture(pool, self.device)
+
+    def run(self):
+        try:
+            while not self.stop_requested:
+                if not self.active.wait(0.1):
+                    continue
+                pool = self.pools[self.write_index]
+                raw = self.read_raw(pool)
+                if self.stop_requested:
+                    break
+                if raw is None:
+                    self.readFailed.emit()
+                    time.sleep(self.FAILURE_BACKOFF)
+                    continue
+                now = time.perf_counter()
+                # Toleransi 10% agar jitter kamera tidak membuang frame yang pas di batas
+                if self.pending.is_set() or now - self.last_emit < self.min_interval * 0.9:
+                    continue
+                started = time.perf_counter()
+                frame = convert_camera_frame(pool, raw, mirror=self.kind != "picamera")
+                convert_ms = (time.perf_counter() - started) * 1000
+                self.last_emit = now
+                self.pending.set()
+                self.write_index ^= 1
+                self.frameReady.emit(frame, convert_ms)
+        finally:
+            release_device(self.device)
+            self.device = None
+            self.released.set()
+            self.finished.emit()
@@ -0,0 +1,71 @@
+import cv2
+import numpy as np
+
+from services.result_parser import COLOR_MAP
+
+BOX_KEYS = ("box", "bbox", "xyxy")
+DEFAULT_COLOR = "#4B5563"
+
+
+def _hex_to_rgb(color):
+    color = color.lstrip("#")
+    return tuple(int(color[i:i + 2], 16) for i in (0, 2, 4))
+
+
+def detection_box(detection):
+    """Mengambil kotak [x1, y1, x2, y2] dari satu deteksi, atau None."""
+    for key in BOX_KEYS:
+        box = detection.get(key)
+        if box is not None and len(box) == 4:
+            return [float(value) for value in box]
+    return None
+
+
+def detection_label(detection, result_data):
+    name = detection.get("name") or detection.get("label")
+    if not name:
+        name = "Normal" if int(detection.get("class", -1)) == 0 else result_data.get("category", "Terdeteksi")
+    return name, f"{name} {float(detection.get('conf', 0)) * 100:.0f}%"
+
+
+def draw_detections(frame, result_data, sent_size=None):
+    """Menggambar kotak deteksi, kelas, dan keyakinan di atas salinan frame RGB.
+
+    Koordinat dari server mengacu pada gambar yang dikirim (sent_size, bisa
+    lebih kecil karena profil jaringan); koordinat ternormalisasi (0..1) juga
+    diterima. Kotak berkoordinat piksel dilewati bila sent_size tidak diketahui.
+    Mengembalikan None jika tidak ada kotak yang bisa digambar.
+    """
+    detections = []
+    for detection in result_data.get("detections", []):
+        box = detection_box(detection)
+        if box and (sent_size or max(box) <= 1.0):
+            detections.append(detection)
+    if not detections:
+        return None
+
+    height, width = frame.shape[:2]
+    canvas = np.array(frame, copy=True)
+    thickness = max(2, round(max(width, height) / 320))
+    font_scale = max(0.5, max(width, height) / 1000)
+
+    for detection in detections:
+        x1, y1, x2, y2 = detection_box(detection)
+        if max(x1, y1, x2, y2) <= 1.0:
+            sx, sy = width, height
+        else:
+            sx, sy = width / sent_size[0], height / sent_size[1]
+        p1 = (int(round(x1 * sx)), int(round(y1 * sy)))
+        p2 = (int(round(x2 * sx)), int(round(y2 * sy)))
+
+        name, label = detection_label(detection, result_data)
+        color = _hex_to_rgb(COLOR_MAP.get(name, DEFAULT_COLOR))
+        cv2.rectangle(canvas, p1, p2, color, thickness, cv2.LINE_AA)
+
+        (text_w, text_h), baseline = cv2.getTextSize(label, cv2.FONT_HERSHEY_SIMPLEX, font_scale, 1)
+        text_y = p1[1] - baseline - 4 if p1[1] - text_h - baseline - 4 > 0 else p1[1] + text_h + 4
+        cv2.rectangle(canvas, (p1[0], text_y - text_h - 4), (p1[0] + text_w + 8, text_y + baseline),
+                      color, cv2.FILLED)
+        cv2.putText(canvas, label, (p1[0] + 4, text_y), cv2.FONT_HERSHEY_SIMPLEX, font_scale,
+                    (255, 255, 255), 1, cv2.LINE_AA)
+    return canvas
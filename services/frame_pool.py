@@ -0,0 +1,87 @@
+import cv2
+import numpy as np
+from PySide6.QtGui import QImage
+
+
+class FramePool:
+    """Kumpulan buffer frame yang dialokasikan sekali lalu dipakai ulang.
+
+    Setiap slot bernama menyimpan satu array; array hanya dialokasikan ulang
+    jika ukuran frame berubah (misalnya ganti kamera). Operasi OpenCV menulis
+    langsung ke buffer ini lewat argumen dst= sehingga preview yang berjalan
+    terus tidak mengalokasikan memori baru per frame.
+    """
+
+    def __init__(self):
+        self._buffers = {}
+
+    def get(self, name, shape, dtype=np.uint8):
+        buffer = self._buffers.get(name)
+        if buffer is None or buffer.shape != shape or buffer.dtype != dtype:
+            buffer = np.empty(shape, dtype=dtype)
+            self._buffers[name] = buffer
+        return buffer
+
+    def acquire(self, name):
+        """Buffer slot name saat ini atau None; untuk API yang menentukan ukuran sendiri."""
+        return self._buffers.get(name)
+
+    def store(self, name, array):
+        """Menjadikan array (mis. hasil VideoCapture.read) buffer slot name."""
+        self._buffers[name] = array
+
+    def clear(self):
+        self._buffers.clear()
+
+
+def read_capture(pool, capture):
+    """cv2.VideoCapture.read ke buffer "raw" milik pool; None jika gagal."""
+    ret, raw = capture.read(pool.acquire("raw"))
+    if not ret:
+        return None
+    pool.store("raw", raw)
+    return raw
+
+
+def convert_camera_frame(pool, raw, mirror=False, code=cv2.COLOR_BGR2RGB):
+    """Mengubah frame mentah kamera ke RGB (dan mirror) memakai buffer pool.
+
+    Hasilnya adalah buffer milik pool: salin dulu jika perlu disimpan lebih
+    lama dari satu tick preview.
+    """
+    height, width = raw.shape[:2]
+    rgb = pool.get("rgb", (height, width, 3))
+    cv2.cvtColor(raw, code, dst=rgb)
+    if not mirror:
+        return rgb
+    mirrored = pool.get("mirror", (height, width, 3))
+    cv2.flip(rgb, 1, dst=mirrored)
+    return mirrored
+
+
+def fit_for_display(pool, frame, width, height):
+    """Menyesuaikan frame ke ukuran tampilan (menjaga rasio) ke buffer "display".
+
+    Hasilnya selalu buffer milik pool (disalin jika ukurannya sudah pas), jadi
+    overlay boleh digambar di atasnya tanpa mengubah frame sumber.
+    """
+    frame_height, frame_width = frame.shape[:2]
+    scale = min(width / frame_width, height / frame_height)
+    target_width = max(1, int(frame_width * scale))
+    target_height = max(1, int(frame_height * scale))
+    display = pool.get("display", (target_height, target_width, 3))
+    if (target_width, target_height) == (frame_width, frame_height):
+        np.copyto(display, frame)
+        return display
+    cv2.resize(frame, (target_width, target_height), dst=display, interpolation=cv2.INTER_LINEAR)
+    return display
+
+
+def wrap_qimage(frame):
+    """QImage yang langsung memakai memori frame (tanpa salinan).
+
+    Frame harus tetap hidup dan tidak diubah selama QImage dipakai (VideoDisplay
+    menyimpan referensi frame untuk itu).
+    """
+    height, width, channels = frame.shape
+    return QImage(frame.data, width, height, channels * width, QImage.Format_RGB888)
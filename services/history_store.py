@@ -0,0 +1,250 @@
+import os
+import uuid
+import sqlite3
+import hashlib
+from contextlib import contextmanager
+from datetime import datetime
+
+from services.result_parser import parse_result
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS screenings (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    patient_name TEXT NOT NULL COLLATE NOCASE,
+    patient_age INTEGER,
+    patient_gender TEXT,
+    screening_type TEXT NOT NULL,
+    status TEXT,
+    confidence REAL,
+    started_at TEXT NOT NULL,
+    completed_at TEXT NOT NULL,
+    captured_image_path TEXT,
+    result_image_path TEXT,
+    network_profile TEXT,
+    record_uid TEXT,
+    updated_at TEXT,
+    sync_version INTEGER
+);
+CREATE TABLE IF NOT EXISTS sync_state (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_screenings_completed ON screenings (completed_at, id);
+CREATE INDEX IF NOT EXISTS idx_screenings_type ON screenings (screening_type, completed_at, id);
+CREATE INDEX IF NOT EXISTS idx_screenings_patient ON screenings (patient_name, completed_at, id);
+"""
+
+# Kolom yang ditambahkan setelah rilis awal; database lama di-ALTER saat dibuka
+MIGRATIONS = {
+    "network_profile": "ALTER TABLE screenings ADD COLUMN network_profile TEXT",
+    "record_uid": "ALTER TABLE screenings ADD COLUMN record_uid TEXT",
+    "updated_at": "ALTER TABLE screenings ADD COLUMN updated_at TEXT",
+    "sync_version": "ALTER TABLE screenings ADD COLUMN sync_version INTEGER",
+}
+
+# Dijalankan setelah kolom lengkap: isi nilai untuk baris lama lalu buat index
+POST_MIGRATION = """
+UPDATE screenings SET record_uid = lower(hex(randomblob(16))) WHERE record_uid IS NULL;
+UPDATE screenings SET updated_at = completed_at WHERE updated_at IS NULL;
+UPDATE screenings SET sync_version = id WHERE sync_version IS NULL;
+CREATE UNIQUE INDEX IF NOT EXISTS idx_screenings_uid ON screenings (record_uid);
+CREATE INDEX IF NOT EXISTS idx_screenings_version ON screenings (sync_version);
+"""
+
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+
+def now_timestamp():
+    return datetime.now().strftime(TIMESTAMP_FORMAT)
+
+
+class HistoryStore:
+    """Riwayat screening lokal berbasis SQLite.
+
+    Koneksi hanya boleh dipakai dari thread yang membuatnya; worker di thread
+    lain sebaiknya membuka HistoryStore sendiri ke file database yang sama.
+    """
+
+    def __init__(self, db_path, image_dir):
+        self.db_path = db_path
+        self.image_dir = image_dir
+        db_dir = os.path.dirname(db_path)
+        if db_dir:
+            os.makedirs(db_dir, exist_ok=True)
+        os.makedirs(image_dir, exist_ok=True)
+
+        self.conn = sqlite3.connect(db_path)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+        self.migrate()
+        self.conn.commit()
+
+    def migrate(self):
+        columns = {row["name"] for row in self.conn.execute("PRAGMA table_info(screenings)")}
+        for column, statement in MIGRATIONS.items():
+            if column not in columns:
+                self.conn.execute(statement)
+        self.conn.executescript(POST_MIGRATION)
+
+    def close(self):
+        if self.conn:
+            self.conn.close()
+            self.conn = None
+
+    def store_image(self, data, suffix=None):
+        """Menyimpan bytes gambar secara content-addressed, mengembalikan path file."""
+        if suffix is None:
+            suffix = "jpg" if data[:2] == b"\xff\xd8" else "png"
+        digest = hashlib.sha1(data).hexdigest()
+        path = os.path.join(self.image_dir, digest[:2], f"{digest}.{suffix}")
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        return path
+
+    def add_record(self, screening_type, patient_data, result_data,
+                   started_at=None, captured_image_path=None):
+        parsed = parse_result(result_data)
+        completed_at = now_timestamp()
+        with self.write_transaction():
+            cursor = self.conn.execute(
+                """
+                INSERT INTO screenings (
+                    patient_name, patient_age, patient_gender, screening_type,
+                    status, confidence, started_at, completed_at, captured_image_path,
+                    network_profile, record_uid, updated_at, sync_version
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                (
+                    patient_data.get("name", ""),
+                    patient_data.get("age"),
+                    patient_data.get("gender"),
+                    screening_type,
+                    parsed["status"],
+                    parsed["confidence"],
+                    started_at or completed_at,
+                    completed_at,
+                    captured_image_path,
+                    result_data.get("network_profile"),
+                    uuid.uuid4().hex,
+                    completed_at,
+                    self.next_sync_version(),
+                ),
+            )
+        return cursor.lastrowid
+
+    def record_screening(self, screening_type, patient_data, result_data,
+                         started_at=None, encoded_image=None):
+        captured_path = self.store_image(encoded_image) if encoded_image else None
+        return self.add_record(
+            screening_type, patient_data, result_data,
+            started_at=started_at, captured_image_path=captured_path
+        )
+
+    def set_result_image(self, record_id, path):
+        with self.write_transaction():
+            self.conn.execute(
+                "UPDATE screenings SET result_image_path = ?, updated_at = ?, sync_version = ? WHERE id = ?",
+                (path, now_timestamp(), self.next_sync_version(), record_id)
+            )
+
+    @contextmanager
+    def write_transaction(self):
+        """Transaksi BEGIN IMMEDIATE: kunci tulis diambil sebelum membaca versi.
+
+        Tanpa ini dua koneksi (mis. UI dan worker) bisa membaca MAX(sync_version)
+        yang sama dan menulis versi ganda, sehingga satu perubahan terlewat
+        oleh sinkronisasi delta.
+        """
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield
+        except BaseException:
+            self.conn.rollback()
+            raise
+        self.conn.commit()
+
+    def next_sync_version(self):
+        """Nomor versi naik setiap kali catatan dibuat atau diubah; panggil di dalam write_transaction()."""
+        return self.conn.execute(
+            "SELECT COALESCE(MAX(sync_version), 0) + 1 FROM screenings"
+        ).fetchone()[0]
+
+    def get_record(self, record_id):
+        row = self.conn.execute("SELECT * FROM screenings WHERE id = ?", (record_id,)).fetchone()
+        return dict(row) if row else None
+
+    def _filter_clause(self, screening_type=None, name_query=None):
+        clauses = []
+        params = []
+        if screening_type:
+            clauses.append("screening_type = ?")
+            params.append(screening_type)
+        if name_query:
+            # Prefix LIKE memakai index patient_name (COLLATE NOCASE)
+            escaped = name_query.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+            clauses.append("patient_name LIKE ? ESCAPE '\\'")
+            params.append(f"{escaped}%")
+        return clauses, params
+
+    def count(self, screening_type=None, name_query=None):
+        clauses, params = self._filter_clause(screening_type, name_query)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        return self.conn.execute(f"SELECT COUNT(*) FROM screenings {where}", params).fetchone()[0]
+
+    def fetch_page(self, limit, after=None, screening_type=None, name_query=None):
+        """Mengambil satu halaman riwayat, terbaru lebih dulu.
+
+        Paging memakai keyset (completed_at, id) dari baris terakhir halaman
+        sebelumnya sehingga biayanya tetap konstan sedalam apa pun halamannya.
+        """
+        clauses, params = self._filter_clause(screening_type, name_query)
+        if after:
+            clauses.append("(completed_at, id) < (?, ?)")
+            params.extend(after)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        rows = self.conn.execute(
+            f"SELECT * FROM screenings {where} ORDER BY completed_at DESC, id DESC LIMIT ?",
+            params + [limit],
+        ).fetchall()
+        return [dict(row) for row in rows]
+
+    def iter_records(self, screening_type=None, name_query=None, batch_size=500):
+        """Semua catatan yang cocok dengan filter, diambil per batch (untuk ekspor)."""
+        after = None
+        while True:
+            rows = self.fetch_page(batch_size, after, screening_type, name_query)
+            yield from rows
+            if len(rows) < batch_size:
+                return
+            after = (rows[-1]["completed_at"], rows[-1]["id"])
+
+    def fetch_changes(self, after_version, limit):
+        """Catatan yang dibuat/diubah setelah after_version, urut versi."""
+        rows = self.conn.execute(
+            "SELECT * FROM screenings WHERE sync_version > ? ORDER BY sync_version LIMIT ?",
+            (after_version, limit),
+        ).fetchall()
+        return [dict(row) for row in rows]
+
+    def pending_changes(self, after_version):
+        return self.conn.execute(
+            "SELECT COUNT(*) FROM screenings WHERE sync_version > ?", (after_version,)
+        ).fetchone()[0]
+
+    def get_sync_state(self, key, default=None):
+        row = self.conn.execute("SELECT value FROM sync_state WHERE key = ?", (key,)).fetchone()
+        return row["value"] if row else default
+
+    def set_sync_state(self, key, value):
+        self.conn.execute(
+            "INSERT INTO sync_state (key, value) VALUES (?, ?) "
+            "ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+            (key, str(value)),
+        )
+        self.conn.commit()
@@ -0,0 +1,19 @@
+import cv2
+import numpy as np
+from PySide6.QtGui import QImage
+
+
+def frame_to_qimage(frame):
+    """Mengubah frame RGB (numpy) menjadi QImage yang memiliki buffer sendiri."""
+    h, w, ch = frame.shape
+    bytes_per_line = ch * w
+    return QImage(frame.data, w, h, bytes_per_line, QImage.Format_RGB888).copy()
+
+
+def load_image_file(file_path):
+    """Membaca file gambar menjadi frame RGB, atau None jika gagal."""
+    data = np.fromfile(file_path, dtype=np.uint8)
+    frame = cv2.imdecode(data, cv2.IMREAD_COLOR)
+    if frame is None:
+        return None
+    return cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
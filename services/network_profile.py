@@ -0,0 +1,140 @@
+import threading
+from collections import deque
+
+import cv2
+
+from config import (
+    API_TIMEOUT, NETWORK_PROFILES, NETWORK_DEFAULT_PROFILE, NETWORK_TARGET_LATENCY, NETWORK_SAMPLE_WINDOW,
+    NETWORK_PRIOR_OVERHEAD, NETWORK_TIMEOUT_FACTOR, NETWORK_TIMEOUT_MIN, NETWORK_TIMEOUT_MAX
+)
+
+
+def scaled_size(width, height, max_side):
+    scale = min(1.0, max_side / max(width, height))
+    return max(1, int(round(width * scale))), max(1, int(round(height * scale)))
+
+
+def encode_for_upload(frame, profile):
+    """Meng-encode frame RGB sesuai profil; mengembalikan (bytes, nama file, mime, (w, h))."""
+    height, width = frame.shape[:2]
+    target = scaled_size(width, height, profile["max_side"])
+    if target != (width, height):
+        frame = cv2.resize(frame, target, interpolation=cv2.INTER_AREA)
+    bgr = cv2.cvtColor(frame, cv2.COLOR_RGB2BGR)
+
+    if profile["format"] == "jpeg":
+        ok, encoded = cv2.imencode(".jpg", bgr, [cv2.IMWRITE_JPEG_QUALITY, profile["quality"]])
+        filename, mime = "screening.jpg", "image/jpeg"
+    else:
+        ok, encoded = cv2.imencode(".png", bgr)
+        filename, mime = "screening.png", "image/png"
+    if not ok:
+        return None, filename, mime, target
+    return encoded.tobytes(), filename, mime, target
+
+
+class NetworkProfiler:
+    """Mengukur kualitas link dari request sebelumnya dan memilih profil upload.
+
+    Setiap request menghasilkan sampel (byte terkirim, durasi). Dari jendela
+    sampel terakhir diestimasi model linear durasi = overhead + byte/throughput
+    (overhead mencakup RTT dan waktu inferensi server). Profil terbaik yang
+    perkiraan durasinya masih di bawah NETWORK_TARGET_LATENCY yang dipakai.
+    """
+
+    def __init__(self, profiles=NETWORK_PROFILES, target_latency=NETWORK_TARGET_LATENCY,
+                 window=NETWORK_SAMPLE_WINDOW, prior_overhead=NETWORK_PRIOR_OVERHEAD):
+        self.profiles = profiles
+        self.target_latency = target_latency
+        self.samples = deque(maxlen=window)
+        # Overhead hasil regresi terakhir; dipakai saat sampel terlalu seragam
+        self.overhead = prior_overhead
+        # Rasio kompresi terukur per profil (byte per piksel)
+        self.bpp = {profile["name"]: profile["est_bpp"] for profile in profiles}
+        self._lock = threading.Lock()
+
+    def record_encoding(self, profile, pixels, size):
+        if pixels <= 0:
+            return
+        with self._lock:
+            current = self.bpp[profile["name"]]
+            self.bpp[profile["name"]] = current + 0.3 * (size / pixels - current)
+
+    def record_transfer(self, size, elapsed):
+        """Menyimpan satu sampel; request yang timeout dicatat dengan durasi timeout-nya."""
+        with self._lock:
+            self.samples.append((size, max(elapsed, 0.001)))
+
+    def link_estimate(self):
+        """Mengembalikan (overhead detik, throughput byte/detik) atau None tanpa sampel."""
+        with self._lock:
+            samples = list(self.samples)
+        if not samples:
+            return None
+
+        n = len(samples)
+        mean_size = sum(size for size, _ in samples) / n
+        mean_elapsed = sum(elapsed for _, elapsed in samples) / n
+        var_size = sum((size - mean_size) ** 2 for size, _ in samples)
+        if n >= 3 and var_size > (0.1 * mean_size) ** 2 * n:
+            cov = sum((size - mean_size) * (elapsed - mean_elapsed) for size, elapsed in samples)
+            slope = cov / var_size
+            if slope > 0:
+                overhead = max(0.0, mean_elapsed - slope * mean_size)
+                with self._lock:
+                    self.overhead = overhead
+                return overhead, 1.0 / slope
+
+        # Ukuran kiriman terlalu seragam untuk regresi: pakai overhead terakhir
+        # yang diketahui. Menganggap overhead nol membuat waktu inferensi server
+        # terhitung sebagai transfer, sehingga profil hanya bisa turun dan tidak
+        # pernah naik lagi setelah link membaik.
+        with self._lock:
+            overhead = self.overhead
+        overhead = min(overhead, 0.9 * min(elapsed for _, elapsed in samples))
+        total_size = sum(size for size, _ in samples)
+        transfer = sum(elapsed for _, elapsed in samples) - overhead * n
+        return overhead, total_size / max(transfer, 0.001 * n)
+
+    def predict(self, profile, width, height):
+        estimate = self.link_estimate()
+        if estimate is None:
+            return None
+        overhead, throughput = estimate
+        target_w, target_h = scaled_size(width, height, profile["max_side"])
+        with self._lock:
+            size = self.bpp[profile["name"]] * target_w * target_h
+        return overhead + size / throughput
+
+    def choose_profile(self, width, height):
+        if self.link_estimate() is None:
+            return self.profile_by_name(NETWORK_DEFAULT_PROFILE)
+        for profile in self.profiles:
+            predicted = self.predict(profile, width, height)
+            if predicted <= self.target_latency:
+                return profile
+        return self.profiles[-1]
+
+    def profile_by_name(self, name):
+        for profile in self.profiles:
+            if profile["name"] == name:
+                return profile
+        return self.profiles[0]
+
+    def timeout_for(self, profile, width, height):
+        predicted = self.predict(profile, width, height)
+        if predicted is None:
+            return API_TIMEOUT
+        return min(NETWORK_TIMEOUT_MAX, max(NETWORK_TIMEOUT_MIN, predicted * NETWORK_TIMEOUT_FACTOR))
+
+
+_profiler = None
+_profiler_lock = threading.Lock()
+
+
+def get_network_profiler():
+    global _profiler
+    with _profiler_lock:
+        if _profiler is None:
+            _profiler = NetworkProfiler()
+        return _profiler
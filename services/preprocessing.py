@@ -0,0 +1,230 @@
+import json
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+
+import cv2
+import numpy as np
+
+from config import PREPROCESSING_ENABLED, PREPROCESSING_PIPELINES, PREPROCESSING_CACHE_ENTRIES
+from services.network_profile import scaled_size
+
+# Batas penguatan white balance agar gambar yang hampir satu warna tidak rusak
+WB_MIN_GAIN = 0.5
+WB_MAX_GAIN = 2.5
+# Patch referensi dianggap valid jika cukup terang, tidak jenuh, dan seragam
+PATCH_MIN_MEAN = 40
+PATCH_MAX_MEAN = 250
+PATCH_MAX_REL_STD = 0.15
+
+
+def _apply_gains(frame, gains):
+    """Mengalikan tiap kanal dengan gain (matriks diagonal, saturasi uint8 oleh OpenCV)."""
+    gains = np.clip(gains, WB_MIN_GAIN, WB_MAX_GAIN)
+    return cv2.transform(frame, np.diag(gains).astype(np.float32))
+
+
+def gray_world_gains(frame, step=4):
+    """Gain grey-world dari sampel piksel; latar hitam dan piksel jenuh diabaikan."""
+    sample = np.ascontiguousarray(frame[::step, ::step])
+    mask = cv2.inRange(sample, (0, 0, 0), (249, 249, 249))
+    mask &= cv2.compare(cv2.cvtColor(sample, cv2.COLOR_RGB2GRAY), 10, cv2.CMP_GT)
+    if cv2.countNonZero(mask) < 100:
+        return None
+    means = np.array(cv2.mean(sample, mask)[:3])
+    return means.mean() / np.maximum(means, 1.0)
+
+
+def reference_patch_gains(frame, patch):
+    """Gain dari patch netral (kartu abu-abu/putih) di koordinat relatif patch."""
+    height, width = frame.shape[:2]
+    x, y, w, h = patch
+    region = frame[int(y * height):int((y + h) * height), int(x * width):int((x + w) * width)]
+    if region.size == 0:
+        return None
+    means, stds = cv2.meanStdDev(np.ascontiguousarray(region))
+    means, stds = means.ravel(), stds.ravel()
+    if means.min() < PATCH_MIN_MEAN or means.max() > PATCH_MAX_MEAN:
+        return None
+    if (stds / means).max() > PATCH_MAX_REL_STD:
+        return None
+    return means.mean() / means
+
+
+def white_balance(frame, method="gray_world", patch=None):
+    """White balance; reference_patch jatuh ke grey-world jika patch tidak valid."""
+    gains = None
+    if method == "reference_patch" and patch:
+        gains = reference_patch_gains(frame, patch)
+    if gains is None:
+        gains = gray_world_gains(frame)
+    if gains is None:
+        return frame
+    return _apply_gains(frame, gains)
+
+
+# Ruang warna untuk CLAHE: kanal pertama adalah luminans
+CLAHE_SPACES = {
+    "lab": (cv2.COLOR_RGB2LAB, cv2.COLOR_LAB2RGB),
+    # Konversi YCrCb jauh lebih murah daripada LAB, cocok untuk perangkat ARM
+    "ycrcb": (cv2.COLOR_RGB2YCrCb, cv2.COLOR_YCrCb2RGB),
+}
+
+
+def clahe(frame, clip_limit=2.0, tile_grid=8, space="lab"):
+    """CLAHE hanya pada kanal luminans sehingga warna tidak bergeser."""
+    to_space, to_rgb = CLAHE_SPACES[space]
+    channels = list(cv2.split(cv2.cvtColor(frame, to_space)))
+    # Objek CLAHE menyimpan buffer internal, jadi dibuat per panggilan (aman lintas thread)
+    channels[0] = cv2.createCLAHE(clipLimit=clip_limit, tileGridSize=(tile_grid, tile_grid)).apply(channels[0])
+    return cv2.cvtColor(cv2.merge(channels), to_rgb)
+
+
+def denoise(frame, method="bilateral", strength=5):
+    if method == "median":
+        return cv2.medianBlur(frame, strength | 1)
+    return cv2.bilateralFilter(frame, strength, 20 + strength * 5, strength)
+
+
+def resize(frame, max_side=1280):
+    height, width = frame.shape[:2]
+    target = scaled_size(width, height, max_side)
+    if target == (width, height):
+        return frame
+    return cv2.resize(frame, target, interpolation=cv2.INTER_AREA)
+
+
+STAGES = {
+    "white_balance": white_balance,
+    "clahe": clahe,
+    "denoise": denoise,
+    "resize": resize,
+}
+
+# Tahap yang jauh lebih mahal daripada hash SHA-1 input; pipeline tanpa tahap
+# ini (resize + white balance) lebih murah dihitung ulang daripada di-cache
+EXPENSIVE_STAGES = {"clahe", "denoise"}
+
+
+def worth_caching(stages):
+    return any(spec["stage"] in EXPENSIVE_STAGES for spec in stages)
+
+
+def frame_digest(frame):
+    frame = np.ascontiguousarray(frame)
+    return f"{frame.shape}:{hashlib.sha1(frame.data).hexdigest()}"
+
+
+class StageCache:
+    """LRU hasil tahap prapemrosesan, dikunci dengan (hash input, prefix pipeline).
+
+    Aman dipakai dari banyak ApiWorker sekaligus. Frame yang disimpan dibuat
+    read-only agar tidak berubah setelah masuk cache.
+    """
+
+    def __init__(self, max_entries=PREPROCESSING_CACHE_ENTRIES):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            frame = self._entries.get(key)
+            if frame is not None:
+                self._entries.move_to_end(key)
+            return frame
+
+    def put(self, key, frame):
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[key] = frame
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class PreprocessingPipeline:
+    """Rangkaian tahap prapemrosesan untuk satu jenis screening.
+
+    Setiap tahap dideklarasikan sebagai {"stage": nama, ...parameter}. Hasil
+    tiap tahap di-cache per prefix pipeline, sehingga gambar yang sama yang
+    dikirim ulang melanjutkan dari tahap terakhir yang sudah pernah dihitung.
+    """
+
+    def __init__(self, stages, cache=None):
+        self.stages = []
+        for spec in stages:
+            params = dict(spec)
+            name = params.pop("stage")
+            if name not in STAGES:
+                raise ValueError(f"Tahap prapemrosesan tidak dikenal: {name}")
+            self.stages.append((name, params))
+        self.cache = cache
+        # Kunci cache per prefix: tahap 0..i beserta parameternya
+        self.prefix_keys = [
+            json.dumps(stages[:index + 1], sort_keys=True) for index in range(len(stages))
+        ]
+
+    def run(self, frame, timings=None, digest=None):
+        """Mengembalikan frame hasil; timings (list) diisi durasi per tahap dalam ms.
+
+        digest (frame_digest) bisa diberikan jika pemanggil sudah menghitungnya.
+        """
+        if self.cache is None:
+            digest = None
+        elif digest is None:
+            digest = frame_digest(frame)
+        start = 0
+        if digest is not None:
+            for index in range(len(self.stages), 0, -1):
+                cached = self.cache.get((digest, self.prefix_keys[index - 1]))
+                if cached is not None:
+                    frame, start = cached, index
+                    break
+        if timings is not None:
+            timings.extend({"stage": name, "ms": 0.0, "cached": True} for name, _ in self.stages[:start])
+
+        for index in range(start, len(self.stages)):
+            name, params = self.stages[index]
+            started = time.perf_counter()
+            output = STAGES[name](frame, **params)
+            # Tahap yang tidak mengubah apa pun (mis. resize di bawah batas) tidak di-cache
+            if output is not frame:
+                output.flags.writeable = False
+                if digest is not None:
+                    self.cache.put((digest, self.prefix_keys[index]), output)
+            frame = output
+            if timings is not None:
+                timings.append({"stage": name, "ms": (time.perf_counter() - started) * 1000, "cached": False})
+        return frame
+
+
+_cache = StageCache()
+_pipelines = {}
+_pipelines_lock = threading.Lock()
+
+
+def get_pipeline(screening_type):
+    """Pipeline untuk jenis screening, atau None jika tidak ada tahap."""
+    with _pipelines_lock:
+        if screening_type not in _pipelines:
+            stages = PREPROCESSING_PIPELINES.get(screening_type) or []
+            cache = _cache if worth_caching(stages) else None
+            _pipelines[screening_type] = PreprocessingPipeline(stages, cache) if stages else None
+        return _pipelines[screening_type]
+
+
+def preprocess_frame(frame, screening_type, timings=None, digest=None):
+    """Menjalankan pipeline jenis screening pada frame RGB sebelum di-encode."""
+    if not PREPROCESSING_ENABLED:
+        return frame
+    pipeline = get_pipeline(screening_type)
+    if pipeline is None:
+        return frame
+    return pipeline.run(frame, timings, digest)
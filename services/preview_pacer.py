@@ -0,0 +1,33 @@
+from config import PREVIEW_CPU_BUDGET, PREVIEW_MIN_INTERVAL_MS, PREVIEW_MAX_INTERVAL_MS
+
+
+class PreviewPacer:
+    """Menentukan jeda minimal antar-frame preview dari anggaran CPU.
+
+    Laju kamera sudah membatasi dirinya sendiri karena read() berjalan di
+    CameraGrabber; pacer hanya menjaga kerja CPU per frame (konversi warna di
+    grabber ditambah resize, overlay, dan lukis di UI thread) tetap di bawah
+    anggaran: jika kerja itu 12 ms dan anggaran 30%, jeda minimal 40 ms.
+    """
+
+    SMOOTHING = 0.2
+
+    def __init__(self, cpu_budget=PREVIEW_CPU_BUDGET, min_interval_ms=PREVIEW_MIN_INTERVAL_MS,
+                 max_interval_ms=PREVIEW_MAX_INTERVAL_MS):
+        self.cpu_budget = cpu_budget
+        self.min_interval_ms = min_interval_ms
+        self.max_interval_ms = max_interval_ms
+        self.reset()
+
+    def reset(self):
+        self.tick_cost_ms = 0.0
+
+    def record_tick(self, cost_ms):
+        if self.tick_cost_ms == 0.0:
+            self.tick_cost_ms = cost_ms
+        else:
+            self.tick_cost_ms += self.SMOOTHING * (cost_ms - self.tick_cost_ms)
+
+    def interval_ms(self):
+        budget_interval = self.tick_cost_ms / self.cpu_budget if self.cpu_budget > 0 else 0
+        return int(min(self.max_interval_ms, max(self.min_interval_ms, budget_interval)))
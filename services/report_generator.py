@@ -0,0 +1,285 @@
+import os
+import re
+import html
+import base64
+import itertools
+import threading
+from datetime import datetime
+from functools import lru_cache
+from string import Template
+
+from PySide6.QtCore import QObject, Signal, Slot, QRunnable, QThreadPool, QUrl, QBuffer, QIODevice, QMarginsF
+from PySide6.QtGui import QImage, QTextDocument, QPdfWriter, QPageSize, QPageLayout
+
+from config import (
+    REPORT_OUTPUT_DIR, REPORT_TEMPLATE_PATH, REPORT_MAX_WORKERS, REPORT_IMAGE_WIDTH, REPORT_BATCH_MAX_PENDING
+)
+from services.history_store import HistoryStore
+from services.image_utils import frame_to_qimage
+from services.result_parser import COLOR_MAP, GENDER_LABELS, SCREENING_TITLES, summary_for_status
+
+IMAGE_CAPTIONS = (
+    ("annotated", "Hasil Deteksi"),
+    ("captured_image_path", "Gambar Screening"),
+    ("result_image_path", "Gambar Anotasi Server"),
+)
+
+
+@lru_cache(maxsize=4)
+def load_template(path=REPORT_TEMPLATE_PATH):
+    """Template laporan dibaca dan di-parse sekali per proses."""
+    with open(path, "r", encoding="utf-8") as f:
+        return Template(f.read())
+
+
+def report_basename(record):
+    name = re.sub(r"[^A-Za-z0-9]+", "_", record.get("patient_name") or "pasien").strip("_")
+    stamp = re.sub(r"[^0-9]", "", record.get("completed_at") or "")
+    return f"{stamp}_{record.get('id', 0)}_{name or 'pasien'}"
+
+
+def scaled_image(source):
+    """QImage dari path atau frame RGB, diperkecil ke lebar laporan."""
+    if source is None:
+        return None
+    image = QImage(source) if isinstance(source, str) else frame_to_qimage(source)
+    if image.isNull():
+        return None
+    if image.width() > REPORT_IMAGE_WIDTH:
+        image = image.scaledToWidth(REPORT_IMAGE_WIDTH)
+    return image
+
+
+def image_data_uri(image):
+    buffer = QBuffer()
+    buffer.open(QIODevice.WriteOnly)
+    image.save(buffer, "JPEG", 85)
+    return "data:image/jpeg;base64," + base64.b64encode(buffer.data().data()).decode("ascii")
+
+
+def render_html(record, image_sources):
+    """Mengisi template; image_sources berisi (caption, src) untuk tag <img>."""
+    status = record.get("status") or "-"
+    cells = "".join(
+        f'<td><img src="{src}" width="{REPORT_IMAGE_WIDTH}"><br>{html.escape(caption)}</td>'
+        for caption, src in image_sources
+    )
+    values = {
+        "record_id": record.get("id", "-"),
+        "generated_at": datetime.now().strftime("%d %b %Y, %H:%M"),
+        "status": status,
+        "status_color": COLOR_MAP.get(status, "#4B5563"),
+        "summary": summary_for_status(status),
+        "confidence": f"{record.get('confidence') or 0:.2f}",
+        "patient_name": record.get("patient_name") or "-",
+        "patient_age": record.get("patient_age") if record.get("patient_age") is not None else "-",
+        "patient_gender": GENDER_LABELS.get(record.get("patient_gender"), record.get("patient_gender") or "-"),
+        "screening_title": SCREENING_TITLES.get(record.get("screening_type"), record.get("screening_type") or "-"),
+        "completed_at": record.get("completed_at") or "-",
+    }
+    # Semua nilai berasal dari data pasien/database, jadi di-escape tanpa kecuali
+    values = {key: html.escape(str(value)) for key, value in values.items()}
+    values["images"] = cells
+    return load_template().safe_substitute(values)
+
+
+def write_report(record, output_dir, annotated=None, formats=("pdf", "html")):
+    """Membuat laporan satu catatan riwayat; mengembalikan path file pertama."""
+    images = []
+    for key, caption in IMAGE_CAPTIONS:
+        source = annotated if key == "annotated" else record.get(key)
+        if isinstance(source, str) and not os.path.exists(source):
+            continue
+        image = scaled_image(source)
+        if image is not None:
+            images.append((key, caption, image))
+
+    os.makedirs(output_dir, exist_ok=True)
+    base_path = os.path.join(output_dir, report_basename(record))
+    paths = []
+
+    if "pdf" in formats:
+        document = QTextDocument()
+        for key, _, image in images:
+            document.addResource(QTextDocument.ImageResource, QUrl(f"report:{key}"), image)
+        document.setHtml(render_html(record, [(caption, f"report:{key}") for key, caption, _ in images]))
+        tmp_path = f"{base_path}.pdf.tmp"
+        writer = QPdfWriter(tmp_path)
+        writer.setPageSize(QPageSize(QPageSize.A4))
+        writer.setPageMargins(QMarginsF(15, 15, 15, 15), QPageLayout.Millimeter)
+        writer.setTitle(f"Laporan Screening {record.get('patient_name') or ''}".strip())
+        document.print_(writer)
+        del writer
+        os.replace(tmp_path, f"{base_path}.pdf")
+        paths.append(f"{base_path}.pdf")
+
+    if "html" in formats:
+        content = render_html(record, [(caption, image_data_uri(image)) for _, caption, image in images])
+        tmp_path = f"{base_path}.html.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(content)
+        os.replace(tmp_path, f"{base_path}.html")
+        paths.append(f"{base_path}.html")
+
+    return paths[0] if paths else None
+
+
+class _ReportTask(QRunnable):
+    def __init__(self, service, tag, batch_id, record, annotated, slots=None):
+        super().__init__()
+        self.service = service
+        self.tag = tag
+        self.batch_id = batch_id
+        self.record = record
+        self.annotated = annotated
+        self.slots = slots
+
+    def run(self):
+        try:
+            path = write_report(self.record, self.service.output_dir, self.annotated)
+            self.service._taskDone.emit(self.tag, self.batch_id, path or "", "")
+        except Exception as e:
+            self.service._taskDone.emit(self.tag, self.batch_id, "", str(e))
+        finally:
+            if self.slots is not None:
+                self.slots.release()
+
+
+class _BatchFeeder(QRunnable):
+    """Membaca catatan per halaman dari database dan menjadwalkan laporannya.
+
+    Berjalan di thread sendiri dengan koneksi HistoryStore sendiri. Laporan
+    yang dijadwalkan tapi belum selesai dibatasi semaphore, sehingga memori
+    tetap kecil berapa pun jumlah catatan yang diekspor.
+    """
+
+    def __init__(self, service, batch_id, db_path, image_dir, screening_type, name_query):
+        super().__init__()
+        self.service = service
+        self.batch_id = batch_id
+        self.db_path = db_path
+        self.image_dir = image_dir
+        self.screening_type = screening_type
+        self.name_query = name_query
+
+    def run(self):
+        service = self.service
+        queued = 0
+        store = None
+        try:
+            store = HistoryStore(self.db_path, self.image_dir)
+            service._batchQueued.emit(self.batch_id, store.count(self.screening_type, self.name_query), False)
+            slots = threading.Semaphore(service.max_pending)
+            for record in store.iter_records(self.screening_type, self.name_query):
+                while not slots.acquire(timeout=0.2):
+                    if service.stopping.is_set():
+                        return
+                if service.stopping.is_set():
+                    return
+                tag = str(next(service._counter))
+                service.pool.start(_ReportTask(service, tag, self.batch_id, record, None, slots))
+                queued += 1
+        except Exception as e:
+            service.reportFailed.emit(self.batch_id, f"Gagal membaca riwayat: {e}")
+        finally:
+            if store is not None:
+                store.close()
+            service._batchQueued.emit(self.batch_id, queued, True)
+
+
+class ReportService(QObject):
+    """Membuat laporan pasien (PDF + HTML) di worker pool, tidak pernah di UI thread.
+
+    Laporan tunggal menerima catatan riwayat sebagai dict. Ekspor massal
+    membaca database sendiri per halaman di thread pengumpan (koneksi SQLite
+    terikat thread), lalu memakai pool yang sama sehingga jumlah laporan yang
+    dirender bersamaan dibatasi REPORT_MAX_WORKERS dan yang mengantre
+    dibatasi REPORT_BATCH_MAX_PENDING.
+    """
+
+    reportReady = Signal(str, str)
+    reportFailed = Signal(str, str)
+    batchProgress = Signal(str, int, int)
+    batchFinished = Signal(str, int, int)
+    _taskDone = Signal(str, str, str, str)
+    _batchQueued = Signal(str, int, bool)
+
+    def __init__(self, output_dir=REPORT_OUTPUT_DIR, max_workers=REPORT_MAX_WORKERS,
+                 max_pending=REPORT_BATCH_MAX_PENDING, parent=None):
+        super().__init__(parent)
+        self.output_dir = output_dir
+        self.max_pending = max(1, max_pending)
+        self.pool = QThreadPool(self)
+        self.pool.setMaxThreadCount(max_workers)
+        self.feeder_pool = QThreadPool(self)
+        self.feeder_pool.setMaxThreadCount(1)
+        self.stopping = threading.Event()
+        self.batches = {}
+        self._counter = itertools.count(1)
+        self._taskDone.connect(self.on_task_done)
+        self._batchQueued.connect(self.on_batch_queued)
+
+    def request(self, record, annotated=None):
+        """Menjadwalkan satu laporan; annotated = frame RGB hasil deteksi (opsional)."""
+        tag = str(next(self._counter))
+        self.pool.start(_ReportTask(self, tag, "", dict(record), annotated))
+        return tag
+
+    def export_batch(self, db_path, image_dir, screening_type=None, name_query=None):
+        """Mengekspor laporan semua catatan yang cocok dengan filter, mengembalikan id batch."""
+        batch_id = f"batch-{next(self._counter)}"
+        # total None sampai pengumpan selesai; expected dari COUNT untuk progress
+        self.batches[batch_id] = {"total": None, "expected": 0, "done": 0, "failed": 0}
+        self.feeder_pool.start(_BatchFeeder(self, batch_id, db_path, image_dir, screening_type, name_query))
+        return batch_id
+
+    @Slot(str, int, bool)
+    def on_batch_queued(self, batch_id, count, final):
+        batch = self.batches.get(batch_id)
+        if batch is None:
+            return
+        if final:
+            batch["total"] = count
+            self.finish_batch_if_done(batch_id)
+        else:
+            batch["expected"] = count
+            self.batchProgress.emit(batch_id, batch["done"], count)
+
+    def finish_batch_if_done(self, batch_id):
+        batch = self.batches[batch_id]
+        if batch["done"] == batch["total"]:
+            del self.batches[batch_id]
+            self.batchFinished.emit(batch_id, batch["done"] - batch["failed"], batch["failed"])
+
+    @Slot(str, str, str, str)
+    def on_task_done(self, tag, batch_id, path, error):
+        if error:
+            self.reportFailed.emit(tag, error)
+        else:
+            self.reportReady.emit(tag, path)
+
+        batch = self.batches.get(batch_id)
+        if batch is None:
+            return
+        batch["done"] += 1
+        if error:
+            batch["failed"] += 1
+        total = batch["total"] if batch["total"] is not None else max(batch["expected"], batch["done"])
+        self.batchProgress.emit(batch_id, batch["done"], total)
+        self.finish_batch_if_done(batch_id)
+
+    def shutdown(self):
+        self.stopping.set()
+        self.pool.clear()
+        self.feeder_pool.waitForDone()
+        self.pool.waitForDone()
+
+
+_service = None
+
+
+def get_report_service():
+    global _service
+    if _service is None:
+        _service = ReportService()
+    return _service
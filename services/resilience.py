@@ -0,0 +1,225 @@
+import time
+import random
+import threading
+
+import requests
+from urllib3.exceptions import NewConnectionError
+from PySide6.QtCore import QObject, QTimer, QUrl
+from PySide6.QtNetwork import QNetworkAccessManager, QNetworkRequest, QNetworkReply
+
+from config import (
+    API_BASE_URL, API_RETRY_ATTEMPTS, API_RETRY_BASE_DELAY, API_RETRY_MAX_DELAY, API_RETRY_DEADLINE,
+    API_BREAKER_FAILURE_THRESHOLD, API_BREAKER_RESET_TIMEOUT, API_HEALTH_PATH,
+    API_HEALTH_INTERVAL_MS, API_HEALTH_TIMEOUT_MS
+)
+
+
+class CircuitOpenError(Exception):
+    """Request ditolak karena server dianggap sedang tidak sehat."""
+
+
+def request_not_sent(error):
+    """True jika koneksi gagal dibuka, jadi server pasti belum menerima request."""
+    if isinstance(error, requests.exceptions.ConnectTimeout):
+        return True
+    reason = error.args[0] if error.args else None
+    return isinstance(getattr(reason, "reason", reason), NewConnectionError)
+
+
+def is_retryable(error, idempotent=True):
+    """Kegagalan sementara yang aman diulang: timeout, koneksi, 5xx, dan 429.
+
+    Untuk request non-idempoten (POST analisis), timeout baca atau koneksi
+    yang putus setelah request terkirim tidak diulang: server mungkin sudah
+    menjalankan inferensi, dan pengulangan hanya menggandakan bebannya.
+    """
+    if isinstance(error, (requests.exceptions.Timeout, requests.exceptions.ConnectionError)):
+        return idempotent or request_not_sent(error)
+    if isinstance(error, requests.exceptions.HTTPError) and error.response is not None:
+        status = error.response.status_code
+        return status >= 500 or status == 429
+    return False
+
+
+class CircuitBreaker:
+    """Circuit breaker tiga keadaan (closed, open, half_open), aman dipakai lintas thread.
+
+    Setelah API_BREAKER_FAILURE_THRESHOLD kegagalan sementara berturut-turut,
+    breaker terbuka dan request langsung ditolak. Setelah reset_timeout satu
+    request percobaan diizinkan (half_open); sukses menutup breaker, gagal
+    membukanya lagi. Health probe juga bisa menutup breaker lebih awal.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold=API_BREAKER_FAILURE_THRESHOLD, reset_timeout=API_BREAKER_RESET_TIMEOUT):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.trial_in_flight = False
+        self._lock = threading.Lock()
+
+    def allow_request(self):
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.OPEN and time.monotonic() - self.opened_at >= self.reset_timeout:
+                self.state = self.HALF_OPEN
+                self.trial_in_flight = False
+            if self.state == self.HALF_OPEN and not self.trial_in_flight:
+                self.trial_in_flight = True
+                return True
+            return False
+
+    def retry_after(self):
+        """Sisa detik sampai request percobaan berikutnya diizinkan."""
+        with self._lock:
+            if self.state != self.OPEN:
+                return 0.0
+            return max(0.0, self.reset_timeout - (time.monotonic() - self.opened_at))
+
+    def record_success(self):
+        with self._lock:
+            self.state = self.CLOSED
+            self.failures = 0
+            self.trial_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+            self.trial_in_flight = False
+
+    def release(self):
+        """Request selesai tanpa informasi kesehatan server (mis. error di klien).
+
+        Keadaan tidak berubah, tapi slot percobaan half_open dibebaskan agar
+        breaker tidak macet menolak semua request.
+        """
+        with self._lock:
+            self.trial_in_flight = False
+
+    def is_closed(self):
+        with self._lock:
+            return self.state == self.CLOSED
+
+
+class RetryPolicy:
+    """Percobaan ulang terbatas dengan backoff eksponensial "full jitter".
+
+    Breaker dicek sekali per request logis dan menerima tepat satu hasil:
+    sukses, atau satu kegagalan setelah semua percobaan habis.
+    """
+
+    def __init__(self, max_attempts=API_RETRY_ATTEMPTS, base_delay=API_RETRY_BASE_DELAY,
+                 max_delay=API_RETRY_MAX_DELAY, deadline=API_RETRY_DEADLINE, idempotent=True):
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.deadline = deadline
+        self.idempotent = idempotent
+
+    def backoff(self, attempt, error=None):
+        delay = random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+        response = getattr(error, "response", None)
+        retry_after = response.headers.get("Retry-After") if response is not None else None
+        if retry_after and retry_after.isdigit():
+            delay = max(delay, min(self.max_delay, float(retry_after)))
+        return delay
+
+    def call(self, fn, breaker=None, sleep=time.sleep):
+        """Menjalankan fn dengan retry; breaker (opsional) dicek sekali di awal."""
+        if breaker and not breaker.allow_request():
+            raise CircuitOpenError()
+        started = time.monotonic()
+        attempt = 0
+        outcome_recorded = False
+        try:
+            while True:
+                try:
+                    result = fn()
+                except Exception as e:
+                    if not is_retryable(e, self.idempotent):
+                        # Server menjawab (mis. 4xx): endpoint sehat, masalahnya di request
+                        if breaker and isinstance(e, requests.exceptions.HTTPError):
+                            breaker.record_success()
+                            outcome_recorded = True
+                        raise
+                    attempt += 1
+                    delay = self.backoff(attempt - 1, e)
+                    if attempt >= self.max_attempts or time.monotonic() - started + delay > self.deadline:
+                        if breaker:
+                            breaker.record_failure()
+                            outcome_recorded = True
+                        raise
+                    sleep(delay)
+                    continue
+                if breaker:
+                    breaker.record_success()
+                    outcome_recorded = True
+                return result
+        finally:
+            # Error lain (JSON rusak, bug klien, ...) tidak menilai server, tapi
+            # slot percobaan half_open tetap harus dilepas
+            if breaker and not outcome_recorded:
+                breaker.release()
+
+
+class HealthProbe(QObject):
+    """Memeriksa GET /api/health secara berkala selama breaker tidak closed.
+
+    Memakai QNetworkAccessManager sehingga berjalan asinkron di UI thread tanpa
+    thread tambahan; respons sukses langsung menutup breaker.
+    """
+
+    def __init__(self, breaker, base_url=None, parent=None):
+        super().__init__(parent)
+        self.breaker = breaker
+        self.base_url = base_url or API_BASE_URL
+        self.pending = None
+        self.manager = QNetworkAccessManager(self)
+        self.manager.finished.connect(self.on_reply)
+        self.timer = QTimer(self)
+        self.timer.setInterval(API_HEALTH_INTERVAL_MS)
+        self.timer.timeout.connect(self.probe)
+
+    def start(self):
+        self.timer.start()
+
+    def stop(self):
+        self.timer.stop()
+        if self.pending is not None:
+            self.pending.abort()
+
+    def probe(self):
+        if self.breaker.is_closed() or self.pending is not None:
+            return
+        request = QNetworkRequest(QUrl(f"{self.base_url}{API_HEALTH_PATH}"))
+        request.setTransferTimeout(API_HEALTH_TIMEOUT_MS)
+        self.pending = self.manager.get(request)
+
+    def on_reply(self, reply):
+        try:
+            if reply.error() == QNetworkReply.NoError:
+                self.breaker.record_success()
+        finally:
+            self.pending = None
+            reply.deleteLater()
+
+
+_breaker = None
+_breaker_lock = threading.Lock()
+
+
+def get_circuit_breaker():
+    global _breaker
+    with _breaker_lock:
+        if _breaker is None:
+            _breaker = CircuitBreaker()
+        return _breaker
@@ -0,0 +1,113 @@
+import copy
+import time
+import threading
+from collections import OrderedDict
+
+from config import API_BASE_URL, API_MODEL_VERSION, RESULT_CACHE_TTL, RESULT_CACHE_MAX_ENTRIES
+
+
+def make_cache_key(capture_digest, screening_type, version=API_MODEL_VERSION):
+    """Kunci dari digest tangkapan sebelum prapemrosesan/encode (lihat frame_digest).
+
+    Profil upload sengaja tidak masuk kunci: tangkapan yang sama tetap hit
+    walau profil jaringan berubah, dengan konsekuensi hasil dari kiriman
+    berkualitas lebih rendah bisa dipakai ulang selama TTL.
+    """
+    return f"{API_BASE_URL}|{version}|{screening_type}|{capture_digest}"
+
+
+class _InFlight:
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class ResultCache:
+    """Cache hasil analisis dengan TTL, batas ukuran (LRU), dan penggabungan request.
+
+    Aman dipakai dari banyak ApiWorker sekaligus. Request duplikat yang datang
+    selagi request pertama masih berjalan menunggu hasil request tersebut,
+    bukan mengirim ulang gambar ke server.
+    """
+
+    def __init__(self, ttl=RESULT_CACHE_TTL, max_entries=RESULT_CACHE_MAX_ENTRIES):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._in_flight = {}
+        self._lock = threading.Lock()
+
+    def _get_locked(self, key):
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, result = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return result
+
+    def get(self, key):
+        with self._lock:
+            result = self._get_locked(key)
+        return copy.deepcopy(result) if result is not None else None
+
+    def put(self, key, result):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, copy.deepcopy(result))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def get_or_compute(self, key, compute):
+        """Mengembalikan (hasil, sumber) dengan sumber "hit", "coalesced", atau "miss".
+
+        Error dari compute tidak di-cache dan diteruskan ke semua pemanggil
+        yang sedang menunggu key yang sama.
+        """
+        with self._lock:
+            result = self._get_locked(key)
+            if result is not None:
+                return copy.deepcopy(result), "hit"
+            in_flight = self._in_flight.get(key)
+            leader = in_flight is None
+            if leader:
+                in_flight = _InFlight()
+                self._in_flight[key] = in_flight
+
+        if not leader:
+            in_flight.event.wait()
+            if in_flight.error is not None:
+                raise in_flight.error
+            return copy.deepcopy(in_flight.result), "coalesced"
+
+        try:
+            result = compute()
+            self.put(key, result)
+            in_flight.result = result
+            return copy.deepcopy(result), "miss"
+        except Exception as e:
+            in_flight.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._in_flight[key]
+            in_flight.event.set()
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_result_cache():
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = ResultCache()
+        return _cache
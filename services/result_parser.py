@@ -0,0 +1,57 @@
+COLOR_MAP = {
+    "Normal": "#10B981",
+    "Anemia": "#F59E0B",
+    "Malnutrisi": "#EF4444",
+    "Diabetic Retinopathy": "#EF4444",
+    "Gagal Deteksi": "#6B7280"
+}
+
+ICON_MAP = {
+    "Normal": "fa5s.check-circle",
+    "Anemia": "fa5s.exclamation-triangle",
+    "Malnutrisi": "fa5s.exclamation-triangle",
+    "Diabetic Retinopathy": "fa5s.exclamation-triangle",
+    "Gagal Deteksi": "fa5s.times-circle"
+}
+
+SCREENING_TITLES = {
+    "diabetic_retinopathy": "Diabetic Retinopathy",
+    "anemia": "Anemia Detection",
+    "malnutrisi": "Malnutrition Screening",
+}
+
+GENDER_LABELS = {"male": "Pria", "female": "Wanita"}
+
+
+def summary_for_status(status):
+    if status == "Gagal Deteksi":
+        return "AI gagal mendeteksi apapun dari gambar ini."
+    if status == "Normal":
+        return "Hasil normal, tidak ada abnormalitas."
+    return f"Terdeteksi {status} pada gambar."
+
+
+def parse_result(result_data):
+    """Menerjemahkan respons API menjadi status, ringkasan, dan tingkat keyakinan."""
+    detections = result_data.get("detections", [])
+
+    # Default values
+    confidence = 0
+    if not detections:
+        status = "Gagal Deteksi"
+    else:
+        detected_class = int(detections[0].get("class", -1))
+        confidence = float(detections[0].get("conf", 0)) * 100
+
+        if detected_class == 0:
+            status = "Normal"
+        else:
+            status = result_data.get("category", "Terdeteksi")
+
+    return {
+        "status": status,
+        "summary": summary_for_status(status),
+        "confidence": confidence,
+        "color": COLOR_MAP.get(status, "#4B5563"),
+        "icon": ICON_MAP.get(status, "fa5s.question-circle"),
+    }
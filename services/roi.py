@@ -0,0 +1,138 @@
+import cv2
+import numpy as np
+
+from config import ROI_ENABLED, ROI_GUIDES, PREPROCESSING_ENABLED, PREPROCESSING_PIPELINES
+
+OVERLAY_COLOR = (16, 185, 129)
+PATCH_COLOR = (245, 158, 11)
+FUNDUS_DETECT_WIDTH = 160
+
+
+def guide_region(screening_type, width, height):
+    """Mengembalikan area panduan dalam piksel: ("circle", cx, cy, r) atau ("rect", x, y, w, h)."""
+    guide = ROI_GUIDES.get(screening_type)
+    if not guide:
+        return None
+    if guide["shape"] == "circle":
+        cx, cy = guide["center"]
+        radius = int(guide["radius"] * min(width, height))
+        return ("circle", int(cx * width), int(cy * height), radius)
+    x, y, w, h = guide["rect"]
+    return ("rect", int(x * width), int(y * height), int(w * width), int(h * height))
+
+
+def reference_patch_region(screening_type, width, height):
+    """Kotak patch referensi white balance dalam piksel frame preview, atau None.
+
+    Patch di PREPROCESSING_PIPELINES relatif terhadap gambar yang dikirim,
+    yaitu hasil crop area panduan persegi, jadi dipetakan ke dalam area itu.
+    """
+    if not PREPROCESSING_ENABLED:
+        return None
+    patch = None
+    for spec in PREPROCESSING_PIPELINES.get(screening_type) or []:
+        if spec.get("stage") == "white_balance" and spec.get("method") == "reference_patch":
+            patch = spec.get("patch")
+    if not patch:
+        return None
+    region = guide_region(screening_type, width, height)
+    if region is None:
+        left, top, area_w, area_h = 0, 0, width, height
+    elif region[0] == "rect":
+        _, left, top, area_w, area_h = region
+    else:
+        # Crop lingkaran menghitamkan sudut, tempat patch biasanya berada
+        return None
+    x, y, w, h = patch
+    return left + int(x * area_w), top + int(y * area_h), int(w * area_w), int(h * area_h)
+
+
+def draw_guide_overlay(frame, screening_type):
+    """Menggambar garis panduan langsung pada frame preview (RGB, in-place)."""
+    if not ROI_ENABLED:
+        return frame
+    region = guide_region(screening_type, frame.shape[1], frame.shape[0])
+    if region is None:
+        return frame
+    if region[0] == "circle":
+        _, cx, cy, r = region
+        cv2.circle(frame, (cx, cy), r, OVERLAY_COLOR, 2, cv2.LINE_AA)
+    else:
+        _, x, y, w, h = region
+        cv2.rectangle(frame, (x, y), (x + w, y + h), OVERLAY_COLOR, 2, cv2.LINE_AA)
+    # Tempat kartu abu-abu/putih untuk white balance reference_patch
+    patch = reference_patch_region(screening_type, frame.shape[1], frame.shape[0])
+    if patch is not None:
+        x, y, w, h = patch
+        cv2.rectangle(frame, (x, y), (x + w, y + h), PATCH_COLOR, 2, cv2.LINE_AA)
+    return frame
+
+
+def detect_fundus_circle(frame):
+    """Mendeteksi lingkaran fundus (area terang di atas latar hitam).
+
+    Deteksi dilakukan pada versi kecil frame agar murah; mengembalikan
+    (cx, cy, r) dalam koordinat frame asli atau None jika tidak yakin.
+    """
+    height, width = frame.shape[:2]
+    scale = FUNDUS_DETECT_WIDTH / width
+    small = cv2.resize(frame, (FUNDUS_DETECT_WIDTH, max(1, int(height * scale))), interpolation=cv2.INTER_AREA)
+    gray = cv2.cvtColor(small, cv2.COLOR_RGB2GRAY)
+    gray = cv2.GaussianBlur(gray, (5, 5), 0)
+    _, mask = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+    # Tanpa latar hitam di sekeliling tidak ada yang perlu dipotong
+    if cv2.countNonZero(mask) > 0.95 * mask.size:
+        return None
+
+    contours, _ = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+    if not contours:
+        return None
+    contour = max(contours, key=cv2.contourArea)
+    (cx, cy), radius = cv2.minEnclosingCircle(contour)
+    if radius < 0.2 * min(small.shape[:2]):
+        return None
+    # Kontur harus cukup "bulat" untuk dianggap fundus
+    if cv2.contourArea(contour) < 0.5 * np.pi * radius * radius:
+        return None
+    return int(cx / scale), int(cy / scale), int(radius / scale)
+
+
+def crop_circle(frame, cx, cy, radius):
+    height, width = frame.shape[:2]
+    x0, y0 = max(0, cx - radius), max(0, cy - radius)
+    x1, y1 = min(width, cx + radius), min(height, cy + radius)
+    # Selalu salinan: irisan selebar frame sudah contiguous sehingga
+    # ascontiguousarray akan berbagi memori dengan frame preview/burst
+    cropped = frame[y0:y1, x0:x1].copy()
+    # Area di luar lingkaran dihitamkan agar payload lebih kecil
+    mask = np.zeros(cropped.shape[:2], dtype=np.uint8)
+    cv2.circle(mask, (cx - x0, cy - y0), radius, 255, -1)
+    cropped[mask == 0] = 0
+    return cropped
+
+
+def crop_to_roi(frame, screening_type, use_guide=True):
+    """Memotong frame RGB ke area subjek untuk jenis screening tertentu.
+
+    use_guide=False dipakai untuk gambar upload: hanya deteksi otomatis
+    (misalnya fundus) yang diterapkan karena subjek tidak diposisikan
+    mengikuti panduan di layar.
+    """
+    if not ROI_ENABLED:
+        return frame
+    guide = ROI_GUIDES.get(screening_type)
+    if not guide:
+        return frame
+
+    if guide.get("auto_detect"):
+        circle = detect_fundus_circle(frame)
+        if circle is not None:
+            return crop_circle(frame, *circle)
+    if not use_guide:
+        return frame
+
+    region = guide_region(screening_type, frame.shape[1], frame.shape[0])
+    if region[0] == "circle":
+        return crop_circle(frame, *region[1:])
+    _, x, y, w, h = region
+    return np.ascontiguousarray(frame[y:y + h, x:x + w])
@@ -0,0 +1,153 @@
+import gzip
+import json
+import time
+import uuid
+import hashlib
+import threading
+
+import requests
+from PySide6.QtCore import QObject, Signal
+
+from config import (
+    SYNC_ENDPOINT, SYNC_BATCH_SIZE, SYNC_MAX_BYTES_PER_SEC, SYNC_TIMEOUT, HISTORY_DB_PATH, HISTORY_IMAGE_DIR
+)
+from services.history_store import HistoryStore
+
+# Kolom riwayat yang dikirim ke server pusat (path gambar lokal tidak ikut)
+SYNC_FIELDS = (
+    "record_uid", "patient_name", "patient_age", "patient_gender", "screening_type",
+    "status", "confidence", "started_at", "completed_at", "updated_at", "network_profile",
+)
+
+
+class TokenBucket:
+    """Pembatas bandwidth: consume() menunggu sampai kuota byte tersedia."""
+
+    def __init__(self, rate, capacity=None):
+        self.rate = rate
+        self.capacity = capacity or rate
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def consume(self, amount, sleep=time.sleep):
+        if not self.rate:
+            return 0.0
+        waited = 0.0
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            # Kiriman yang lebih besar dari kapasitas boleh berutang token
+            self.tokens -= amount
+            if self.tokens < 0:
+                waited = -self.tokens / self.rate
+        if waited:
+            sleep(waited)
+        return waited
+
+
+class SyncEngine:
+    """Mengirim catatan riwayat baru/berubah ke server pusat secara batch.
+
+    Checkpoint berupa sync_version terakhir yang sudah diterima server dan
+    disimpan di tabel sync_state, sehingga sinkronisasi yang terputus
+    dilanjutkan dari batch berikutnya. Setiap batch dikirim sebagai JSON gzip
+    dengan header Idempotency-Key (hash isi batch) dan setiap catatan membawa
+    record_uid, jadi pengiriman ulang tidak membuat data ganda di server.
+    """
+
+    CHECKPOINT_KEY = "last_synced_version"
+    DEVICE_KEY = "device_id"
+
+    def __init__(self, history_store, endpoint=SYNC_ENDPOINT, batch_size=SYNC_BATCH_SIZE,
+                 max_bytes_per_sec=SYNC_MAX_BYTES_PER_SEC, timeout=SYNC_TIMEOUT, session=None):
+        self.history_store = history_store
+        self.endpoint = endpoint
+        self.batch_size = batch_size
+        self.timeout = timeout
+        self.bucket = TokenBucket(max_bytes_per_sec)
+        self.session = session or requests.Session()
+        self.device_id = history_store.get_sync_state(self.DEVICE_KEY)
+        if not self.device_id:
+            self.device_id = uuid.uuid4().hex
+            history_store.set_sync_state(self.DEVICE_KEY, self.device_id)
+
+    def checkpoint(self):
+        return int(self.history_store.get_sync_state(self.CHECKPOINT_KEY, 0))
+
+    def build_payload(self, rows):
+        payload = {
+            "device_id": self.device_id,
+            "from_version": rows[0]["sync_version"],
+            "to_version": rows[-1]["sync_version"],
+            "records": [{field: row.get(field) for field in SYNC_FIELDS} for row in rows],
+        }
+        body = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+        return gzip.compress(body, compresslevel=6), hashlib.sha256(body).hexdigest()
+
+    def send_batch(self, rows):
+        compressed, digest = self.build_payload(rows)
+        self.bucket.consume(len(compressed))
+        response = self.session.post(
+            self.endpoint,
+            data=compressed,
+            headers={
+                "Content-Type": "application/json",
+                "Content-Encoding": "gzip",
+                "Idempotency-Key": f"{self.device_id}-{digest[:32]}",
+            },
+            timeout=self.timeout,
+        )
+        response.raise_for_status()
+        return len(compressed)
+
+    def sync_once(self, max_batches=None, should_stop=None):
+        """Mengirim batch sampai tidak ada perubahan; mengembalikan statistik."""
+        stats = {"batches": 0, "records": 0, "bytes": 0}
+        checkpoint = self.checkpoint()
+        while max_batches is None or stats["batches"] < max_batches:
+            if should_stop and should_stop():
+                break
+            rows = self.history_store.fetch_changes(checkpoint, self.batch_size)
+            if not rows:
+                break
+            stats["bytes"] += self.send_batch(rows)
+            # Checkpoint hanya maju setelah server menerima batch
+            checkpoint = rows[-1]["sync_version"]
+            self.history_store.set_sync_state(self.CHECKPOINT_KEY, checkpoint)
+            stats["batches"] += 1
+            stats["records"] += len(rows)
+        stats["pending"] = self.history_store.pending_changes(checkpoint)
+        return stats
+
+
+class SyncWorker(QObject):
+    """Menjalankan SyncEngine di QThread dengan koneksi database sendiri."""
+
+    finished = Signal(dict)
+    error = Signal(str)
+
+    def __init__(self, db_path=HISTORY_DB_PATH, image_dir=HISTORY_IMAGE_DIR, endpoint=None):
+        super().__init__()
+        self.db_path = db_path
+        self.image_dir = image_dir
+        self.endpoint = endpoint or SYNC_ENDPOINT
+        self.stop_requested = False
+
+    def stop(self):
+        self.stop_requested = True
+
+    def run(self):
+        store = None
+        try:
+            store = HistoryStore(self.db_path, self.image_dir)
+            engine = SyncEngine(store, endpoint=self.endpoint)
+            self.finished.emit(engine.sync_once(should_stop=lambda: self.stop_requested))
+        except requests.exceptions.RequestException as e:
+            self.error.emit(f"Sinkronisasi gagal: {e}")
+        except Exception as e:
+            self.error.emit(f"Terjadi error saat sinkronisasi: {str(e)}")
+        finally:
+            if store:
+                store.close()
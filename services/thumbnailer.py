@@ -0,0 +1,176 @@
+import os
+import time
+import hashlib
+import itertools
+import threading
+import numpy as np
+
+from PySide6.QtCore import Qt, QObject, Signal, QRunnable, QThreadPool
+from PySide6.QtGui import QImage
+
+from config import (
+    THUMBNAIL_CACHE_DIR, THUMBNAIL_SIZES, THUMBNAIL_WORKERS, THUMBNAIL_CACHE_MAX_BYTES,
+    THUMBNAIL_CACHE_MAX_AGE_DAYS, THUMBNAIL_CACHE_PRUNE_EVERY
+)
+from services.image_utils import frame_to_qimage
+
+
+def touch(path):
+    try:
+        os.utime(path)
+    except OSError:
+        pass
+
+
+def prune_cache(cache_dir, max_bytes, max_age_seconds, now=None):
+    """Menghapus thumbnail yang kedaluwarsa, lalu yang terlama sampai total <= max_bytes.
+
+    Mengembalikan jumlah file yang dihapus.
+    """
+    now = now or time.time()
+    entries = []
+    removed = 0
+    for root, _, files in os.walk(cache_dir):
+        for name in files:
+            path = os.path.join(root, name)
+            try:
+                stat = os.stat(path)
+                if now - stat.st_mtime > max_age_seconds:
+                    os.remove(path)
+                    removed += 1
+                    continue
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+
+    total = sum(size for _, size, _ in entries)
+    entries.sort()
+    for _, size, path in entries:
+        if total <= max_bytes:
+            break
+        try:
+            os.remove(path)
+        except OSError:
+            continue
+        total -= size
+        removed += 1
+    return removed
+
+
+class _ThumbnailTask(QRunnable):
+    def __init__(self, service, tag, source, sizes):
+        super().__init__()
+        self.service = service
+        self.tag = tag
+        self.source = source
+        self.sizes = sizes
+
+    def read_source(self):
+        """Mengembalikan (bytes untuk hash, fungsi decode)."""
+        if isinstance(self.source, np.ndarray):
+            frame = np.ascontiguousarray(self.source)
+            header = f"{frame.shape}:".encode()
+            return header + frame.tobytes(), lambda: frame_to_qimage(frame)
+        if isinstance(self.source, QImage):
+            image = self.source
+            header = f"{image.width()}x{image.height()}:{int(image.format())}:".encode()
+            return header + bytes(image.constBits()), lambda: image
+        if isinstance(self.source, str):
+            with open(self.source, "rb") as f:
+                data = f.read()
+        else:
+            data = bytes(self.source)
+        return data, lambda: QImage.fromData(data)
+
+    def run(self):
+        try:
+            data, decode = self.read_source()
+            digest = hashlib.sha1(data).hexdigest()
+            source_image = None
+
+            for size_name in self.sizes:
+                width, height = THUMBNAIL_SIZES[size_name]
+                path = self.service.cache_path(digest, width, height)
+                thumbnail = QImage(path) if os.path.exists(path) else QImage()
+                if not thumbnail.isNull():
+                    touch(path)
+
+                if thumbnail.isNull():
+                    if source_image is None:
+                        source_image = decode()
+                        if source_image.isNull():
+                            self.service.thumbnailFailed.emit(self.tag, "Gagal membaca gambar.")
+                            return
+                    thumbnail = source_image.scaled(
+                        width, height, Qt.KeepAspectRatio, Qt.SmoothTransformation
+                    )
+                    os.makedirs(os.path.dirname(path), exist_ok=True)
+                    thumbnail.save(path, "PNG")
+                    self.service.note_write()
+
+                self.service.thumbnailReady.emit(self.tag, size_name, thumbnail)
+        except Exception as e:
+            self.service.thumbnailFailed.emit(self.tag, str(e))
+
+
+class ThumbnailService(QObject):
+    """Membuat thumbnail di luar UI thread.
+
+    Sumber bisa berupa path file, bytes hasil encode, frame RGB (numpy), atau
+    QImage; frame numpy tidak disalin sehingga tidak boleh diubah lagi. Setiap
+    ukuran di THUMBNAIL_SIZES dikirim lewat thumbnailReady(tag, size_name,
+    QImage) begitu selesai; view cukup mengubahnya ke QPixmap saat ditampilkan.
+    """
+
+    thumbnailReady = Signal(str, str, QImage)
+    thumbnailFailed = Signal(str, str)
+
+    def __init__(self, cache_dir=THUMBNAIL_CACHE_DIR, max_workers=THUMBNAIL_WORKERS, parent=None):
+        super().__init__(parent)
+        self.cache_dir = cache_dir
+        self.pool = QThreadPool(self)
+        self.pool.setMaxThreadCount(max_workers)
+        self._counter = itertools.count(1)
+        self._writes = 0
+        self._prune_lock = threading.Lock()
+        # Cache dari sesi sebelumnya dirapikan sekali di awal, di luar UI thread
+        self.pool.start(self.prune)
+
+    def note_write(self):
+        """Dipanggil worker setiap menulis thumbnail baru; sesekali merapikan cache."""
+        with self._prune_lock:
+            self._writes += 1
+            if self._writes < THUMBNAIL_CACHE_PRUNE_EVERY:
+                return
+            self._writes = 0
+        self.prune()
+
+    def prune(self):
+        if os.path.isdir(self.cache_dir):
+            prune_cache(self.cache_dir, THUMBNAIL_CACHE_MAX_BYTES, THUMBNAIL_CACHE_MAX_AGE_DAYS * 24 * 3600)
+
+    def cache_path(self, digest, width, height):
+        return os.path.join(self.cache_dir, digest[:2], f"{digest}_{width}x{height}.png")
+
+    def request(self, source, sizes=None):
+        """Menjadwalkan pembuatan thumbnail, mengembalikan tag permintaan."""
+        tag = str(next(self._counter))
+        if isinstance(source, QImage):
+            # Salinan agar buffer milik pemanggil boleh langsung dipakai ulang
+            source = source.copy()
+        self.pool.start(_ThumbnailTask(self, tag, source, tuple(sizes or THUMBNAIL_SIZES)))
+        return tag
+
+    def shutdown(self):
+        self.pool.clear()
+        self.pool.waitForDone()
+
+
+_service = None
+
+
+def get_thumbnail_service():
+    global _service
+    if _service is None:
+        _service = ThumbnailService()
+    return _service
@@ -0,0 +1,17 @@
+import os
+import sys
+
+# Modul aplikasi diimpor dari root repo (tanpa paket), sama seperti main.py
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+from services.history_store import HistoryStore
+
+
+@pytest.fixture
+def store(tmp_path):
+    """HistoryStore baru di tmp_path; path-nya dipakai ulang lewat store.db_path/image_dir."""
+    store = HistoryStore(str(tmp_path / "history.db"), str(tmp_path / "images"))
+    yield store
+    store.close()
@@ -0,0 +1,68 @@
+import threading
+
+import numpy as np
+import pytest
+from PySide6.QtCore import Qt
+
+import api_woker
+from api_woker import ApiWorker
+from services.result_cache import ResultCache
+from tools.stub_server import start_in_background
+
+PATIENT = {"name": "Pasien", "nik": "1234567890123456"}
+
+
+@pytest.fixture
+def stub(monkeypatch):
+    server, url = start_in_background(latency=0.2)
+    monkeypatch.setattr(api_woker, "API_BASE_URL", url)
+    cache = ResultCache()
+    monkeypatch.setattr(api_woker, "get_result_cache", lambda: cache)
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def make_frame():
+    rng = np.random.default_rng(7)
+    return rng.integers(0, 255, (480, 640, 3), dtype=np.uint8)
+
+
+def run_worker(frame):
+    worker = ApiWorker("anemia", dict(PATIENT), frame)
+    results, errors = [], []
+    worker.finished.connect(results.append, Qt.DirectConnection)
+    worker.error.connect(errors.append, Qt.DirectConnection)
+    worker.run()
+    assert not errors, errors
+    return worker, results[0]
+
+
+def test_duplicate_submission_restores_upload_metadata(stub):
+    frame = make_frame()
+    first, first_result = run_worker(frame)
+    second, second_result = run_worker(frame.copy())
+
+    assert first_result["cache"] == "miss"
+    assert second_result["cache"] == "hit"
+    assert second.encoded_image == first.encoded_image and second.encoded_image
+    assert second.sent_size == first.sent_size
+    assert second.network_profile == first.network_profile
+    assert second_result["network_profile"] == first.network_profile
+    assert second_result["user"]["nik"] == PATIENT["nik"]
+
+
+def test_coalesced_submission_restores_upload_metadata(stub):
+    frame = make_frame()
+    outcomes = []
+    threads = [threading.Thread(target=lambda: outcomes.append(run_worker(frame))) for _ in range(2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert sorted(result["cache"] for _, result in outcomes) == ["coalesced", "miss"]
+    (a, _), (b, _) = outcomes
+    assert a.encoded_image == b.encoded_image and a.encoded_image
+    assert a.sent_size == b.sent_size and a.sent_size is not None
+    assert a.network_profile == b.network_profile
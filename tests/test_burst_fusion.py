@@ -0,0 +1,46 @@
+import numpy as np
+
+from services.burst_fusion import BurstStack, _stack_median, fuse_frames, fuse_burst
+
+
+def test_burst_stack_reuses_buffer():
+    stack = BurstStack()
+    stack.reset(3, (4, 4, 3))
+    buffer = stack.frames
+    stack.add(np.ones((4, 4, 3), np.uint8))
+    assert not stack.full() and len(stack.active()) == 1
+    stack.add(np.ones((4, 4, 3), np.uint8))
+    stack.add(np.ones((4, 4, 3), np.uint8))
+    assert stack.full()
+    stack.reset(3, (4, 4, 3))
+    assert stack.frames is buffer and stack.count == 0
+    stack.reset(3, (8, 8, 3))
+    assert stack.frames is not buffer
+
+
+def test_stack_median_matches_numpy():
+    rng = np.random.default_rng(1)
+    frames = rng.integers(0, 256, (5, 6, 7, 3), dtype=np.uint8)
+    np.testing.assert_array_equal(_stack_median(frames), np.median(frames, axis=0).astype(np.uint8))
+
+
+def test_fuse_frames_rejects_outliers_and_reduces_noise():
+    rng = np.random.default_rng(2)
+    clean = np.full((32, 32, 3), 120, np.uint8)
+    frames = np.clip(clean + rng.normal(0, 8, (5, 32, 32, 3)), 0, 255).astype(np.uint8)
+    frames[0, :8, :8] = 255
+    fused = fuse_frames(frames)
+    naive = frames.mean(axis=0)
+    assert np.abs(fused[:8, :8].astype(int) - 120).mean() < 6
+    assert np.abs(naive[:8, :8] - 120).mean() > 20
+    assert np.abs(fused.astype(int) - 120).mean() < np.abs(frames[1].astype(int) - 120).mean()
+
+
+def test_fuse_burst_aligns_shifted_frames():
+    rng = np.random.default_rng(3)
+    base = np.zeros((96, 128, 3), np.uint8)
+    base[30:60, 40:80] = 200
+    base = np.clip(base + rng.normal(0, 2, base.shape), 0, 255).astype(np.uint8)
+    frames = np.stack([np.roll(base, shift, axis=1) for shift in (-3, 0, 0, 3, 0)])
+    fused = fuse_burst(frames)
+    assert np.abs(fused.astype(int) - base.astype(int)).mean() < 5
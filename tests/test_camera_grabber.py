@@ -0,0 +1,88 @@
+import time
+import threading
+
+import numpy as np
+from PySide6.QtCore import Qt
+
+from services.camera_watchdog import CameraGrabber
+
+
+class FakeCapture:
+    """read() mengisi frame dengan nomor urutnya."""
+
+    def __init__(self):
+        self.count = 0
+        self.opened = True
+
+    def isOpened(self):
+        return self.opened
+
+    def read(self, image=None):
+        time.sleep(0.002)
+        self.count += 1
+        if image is None:
+            image = np.empty((4, 6, 3), np.uint8)
+        image[:] = self.count % 256
+        return True, image
+
+    def release(self):
+        self.opened = False
+
+
+def wait_until(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline
+        time.sleep(0.002)
+
+
+# Grabber dijalankan di thread Python biasa; slot dipanggil langsung dari thread itu
+def test_sent_buffer_is_not_overwritten_until_consumed():
+    capture = FakeCapture()
+    grabber = CameraGrabber("opencv", capture)
+    frames = []
+    grabber.frameReady.connect(
+        lambda frame, convert_ms: frames.append((frame, int(frame[0, 0, 0]))), Qt.DirectConnection
+    )
+    thread = threading.Thread(target=grabber.run)
+    thread.start()
+    try:
+        wait_until(lambda: frames)
+        reads = capture.count
+        wait_until(lambda: capture.count > reads + 5)
+        first, value = frames[0]
+        # Kamera terus dibaca, tapi frame yang belum dipakai UI tidak berubah
+        assert len(frames) == 1
+        assert (first == value).all()
+
+        grabber.frame_consumed()
+        wait_until(lambda: len(frames) == 2)
+        second, second_value = frames[1]
+        assert second_value > value
+        assert not np.shares_memory(first, second)
+    finally:
+        grabber.stop()
+        thread.join(2)
+    assert not thread.is_alive()
+    assert grabber.released.is_set() and not capture.opened
+
+
+def test_read_failures_are_reported_and_paused_grabber_stops_reading():
+    capture = FakeCapture()
+    capture.opened = False
+    grabber = CameraGrabber("opencv", capture)
+    failures = []
+    grabber.readFailed.connect(lambda: failures.append(1), Qt.DirectConnection)
+    thread = threading.Thread(target=grabber.run)
+    thread.start()
+    try:
+        wait_until(lambda: len(failures) >= 2)
+        grabber.pause()
+        time.sleep(0.15)
+        count = len(failures)
+        time.sleep(0.15)
+        assert len(failures) == count
+    finally:
+        grabber.stop()
+        thread.join(2)
+    assert not thread.is_alive()
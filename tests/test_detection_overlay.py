@@ -0,0 +1,22 @@
+import numpy as np
+
+from services.detection_overlay import draw_detections
+
+FRAME = np.zeros((960, 1280, 3), dtype=np.uint8)
+
+
+def test_pixel_boxes_are_scaled_from_sent_size():
+    result = {"detections": [{"class": 1, "conf": 0.9, "box": [100, 100, 200, 200]}]}
+    overlay = draw_detections(FRAME, result, sent_size=(640, 480))
+    changed = np.argwhere(overlay.any(axis=2))
+    assert changed[:, 0].max() >= 395 and changed[:, 1].max() >= 395
+
+
+def test_pixel_boxes_without_sent_size_are_skipped():
+    result = {"detections": [{"class": 1, "conf": 0.9, "box": [100, 100, 200, 200]}]}
+    assert draw_detections(FRAME, result) is None
+
+
+def test_normalized_boxes_do_not_need_sent_size():
+    result = {"detections": [{"class": 1, "conf": 0.9, "box": [0.1, 0.1, 0.5, 0.5]}]}
+    assert draw_detections(FRAME, result) is not None
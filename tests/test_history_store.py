@@ -0,0 +1,70 @@
+from services.history_store import HistoryStore
+
+PATIENT = {"name": "Budi Santoso", "age": 30, "gender": "male"}
+RESULT = {"detections": [{"class": 1, "conf": 0.87}], "category": "Anemia", "network_profile": "high"}
+
+
+def test_record_screening_stores_fields_and_image(store):
+    record_id = store.record_screening("anemia", PATIENT, RESULT, encoded_image=b"\xff\xd8jpegdata")
+    record = store.get_record(record_id)
+    assert record["patient_name"] == "Budi Santoso"
+    assert record["screening_type"] == "anemia"
+    assert record["network_profile"] == "high"
+    assert record["captured_image_path"].endswith(".jpg")
+    with open(record["captured_image_path"], "rb") as f:
+        assert f.read() == b"\xff\xd8jpegdata"
+
+
+def test_store_image_is_content_addressed(store):
+    assert store.store_image(b"same") == store.store_image(b"same")
+    assert store.store_image(b"same") != store.store_image(b"other")
+
+
+def test_fetch_page_keyset_paging_covers_all_rows_once(store):
+    ids = [store.add_record("anemia", {"name": f"P{i}"}, RESULT) for i in range(25)]
+    seen, after = [], None
+    while True:
+        rows = store.fetch_page(10, after)
+        seen.extend(row["id"] for row in rows)
+        if len(rows) < 10:
+            break
+        after = (rows[-1]["completed_at"], rows[-1]["id"])
+    assert sorted(seen) == sorted(ids)
+    assert len(seen) == len(set(seen))
+
+
+def test_filters_by_type_and_name_prefix(store):
+    store.add_record("anemia", {"name": "Siti"}, RESULT)
+    store.add_record("malnutrisi", {"name": "Siti"}, RESULT)
+    store.add_record("anemia", {"name": "Andi"}, RESULT)
+    assert store.count(screening_type="anemia") == 2
+    assert store.count(name_query="si") == 2
+    assert store.count(name_query="%") == 0
+    assert store.count(screening_type="anemia", name_query="Si") == 1
+
+
+def test_sync_versions_increase_on_insert_and_update(store):
+    first = store.add_record("anemia", PATIENT, RESULT)
+    second = store.add_record("anemia", PATIENT, RESULT)
+    v1, v2 = store.get_record(first)["sync_version"], store.get_record(second)["sync_version"]
+    assert v2 > v1
+    store.set_result_image(first, "result.png")
+    assert store.get_record(first)["sync_version"] > v2
+    assert [row["id"] for row in store.fetch_changes(v2, 10)] == [first]
+    assert store.pending_changes(0) == 2
+
+
+def test_sync_state_round_trip(store):
+    assert store.get_sync_state("missing", "x") == "x"
+    store.set_sync_state("last_synced_version", 5)
+    store.set_sync_state("last_synced_version", 7)
+    assert store.get_sync_state("last_synced_version") == "7"
+
+
+def test_reopen_keeps_records(store):
+    record_id = store.add_record("anemia", PATIENT, RESULT)
+    uid = store.get_record(record_id)["record_uid"]
+    store.close()
+    reopened = HistoryStore(store.db_path, store.image_dir)
+    assert reopened.get_record(record_id)["record_uid"] == uid
+    reopened.close()
@@ -0,0 +1,47 @@
+from services.network_profile import NetworkProfiler, scaled_size
+
+PROFILES = [
+    {"name": "full", "max_side": 1280, "format": "png", "quality": None, "est_bpp": 1.6},
+    {"name": "high", "max_side": 1024, "format": "jpeg", "quality": 92, "est_bpp": 0.35},
+    {"name": "low", "max_side": 512, "format": "jpeg", "quality": 75, "est_bpp": 0.15},
+]
+
+
+def simulate(profiler, requests, server_seconds, throughput, width=1280, height=960):
+    """Menjalankan sejumlah request pada link simulasi; mengembalikan profil terakhir."""
+    profile = None
+    for _ in range(requests):
+        profile = profiler.choose_profile(width, height)
+        target_w, target_h = scaled_size(width, height, profile["max_side"])
+        size = int(profile["est_bpp"] * target_w * target_h)
+        profiler.record_encoding(profile, target_w * target_h, size)
+        profiler.record_transfer(size, server_seconds + size / throughput)
+    return profile["name"]
+
+
+def test_no_samples_uses_default_profile():
+    profiler = NetworkProfiler(PROFILES, target_latency=8.0, window=20)
+    assert profiler.link_estimate() is None
+    assert profiler.timeout_for(PROFILES[0], 1280, 960) is not None
+
+
+def test_regression_separates_overhead_from_throughput():
+    profiler = NetworkProfiler(PROFILES, target_latency=8.0, window=20)
+    for size in (100_000, 200_000, 400_000, 800_000):
+        profiler.record_transfer(size, 1.5 + size / 200_000)
+    overhead, throughput = profiler.link_estimate()
+    assert abs(overhead - 1.5) < 0.01
+    assert abs(throughput - 200_000) < 1
+
+
+def test_slow_link_degrades_profile():
+    profiler = NetworkProfiler(PROFILES, target_latency=8.0, window=20)
+    assert simulate(profiler, 40, server_seconds=2.0, throughput=15_000) == "low"
+
+
+def test_profile_recovers_after_link_improves():
+    profiler = NetworkProfiler(PROFILES, target_latency=8.0, window=20)
+    simulate(profiler, 40, server_seconds=2.0, throughput=15_000)
+    # Semua sampel kini berukuran sama ("low"); overhead server tidak boleh
+    # dianggap waktu transfer, kalau tidak profil tidak pernah naik lagi
+    assert simulate(profiler, 40, server_seconds=2.0, throughput=2_000_000) == "full"
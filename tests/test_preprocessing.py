@@ -0,0 +1,86 @@
+import numpy as np
+import pytest
+
+from services.preprocessing import (
+    PreprocessingPipeline, StageCache, clahe, gray_world_gains, reference_patch_gains,
+    resize, white_balance, worth_caching
+)
+
+PATCH = (0.0, 0.0, 0.2, 0.2)
+
+
+def tinted_frame(tint=(1.2, 1.0, 0.8), seed=0):
+    rng = np.random.default_rng(seed)
+    base = rng.integers(60, 180, (120, 160, 1)).repeat(3, axis=2).astype(np.float32)
+    return np.clip(base * np.array(tint), 0, 255).astype(np.uint8)
+
+
+def channel_spread(frame):
+    means = frame.reshape(-1, 3).mean(axis=0)
+    return means.max() - means.min()
+
+
+def test_gray_world_removes_color_cast():
+    frame = tinted_frame()
+    balanced = white_balance(frame, "gray_world")
+    assert channel_spread(balanced) < channel_spread(frame) / 4
+
+
+def test_gray_world_ignores_nearly_black_frame():
+    assert gray_world_gains(np.zeros((50, 50, 3), np.uint8)) is None
+
+
+def test_reference_patch_uses_neutral_card():
+    frame = tinted_frame()
+    # Kartu abu-abu di sudut kiri atas terkena cast yang sama
+    frame[:24, :32] = np.array([150 * 1.2, 150, 150 * 0.8], np.uint8)
+    gains = reference_patch_gains(frame, PATCH)
+    assert gains is not None
+    balanced = white_balance(frame, "reference_patch", PATCH)
+    assert channel_spread(balanced[:24, :32]) <= 2
+
+
+def test_reference_patch_falls_back_to_gray_world_when_card_missing():
+    frame = tinted_frame()
+    # Patch bertekstur (bukan kartu netral) tidak lolos uji keseragaman
+    assert reference_patch_gains(frame, PATCH) is None
+    np.testing.assert_array_equal(white_balance(frame, "reference_patch", PATCH),
+                                  white_balance(frame, "gray_world"))
+
+
+@pytest.mark.parametrize("space", ["lab", "ycrcb"])
+def test_clahe_keeps_shape_and_dtype(space):
+    frame = tinted_frame()
+    output = clahe(frame, space=space)
+    assert output.shape == frame.shape and output.dtype == np.uint8
+
+
+def test_resize_only_shrinks():
+    frame = np.zeros((300, 400, 3), np.uint8)
+    assert resize(frame, max_side=800) is frame
+    assert resize(frame, max_side=200).shape == (150, 200, 3)
+
+
+def test_unknown_stage_is_rejected():
+    with pytest.raises(ValueError):
+        PreprocessingPipeline([{"stage": "sharpen"}])
+
+
+def test_pipeline_resumes_from_cached_prefix():
+    stages = [{"stage": "white_balance", "method": "gray_world"}, {"stage": "denoise", "method": "median", "strength": 3}]
+    cache = StageCache(max_entries=8)
+    frame = tinted_frame()
+    first = PreprocessingPipeline(stages, cache).run(frame)
+    assert not first.flags.writeable
+
+    timings = []
+    # Pipeline lain dengan prefix yang sama memakai hasil white balance dari cache
+    longer = PreprocessingPipeline(stages + [{"stage": "resize", "max_side": 80}], cache)
+    output = longer.run(frame, timings)
+    assert [timing["cached"] for timing in timings] == [True, True, False]
+    assert output.shape == (60, 80, 3)
+
+
+def test_only_expensive_pipelines_are_cached():
+    assert not worth_caching([{"stage": "resize", "max_side": 1280}, {"stage": "white_balance"}])
+    assert worth_caching([{"stage": "resize", "max_side": 1280}, {"stage": "clahe"}])
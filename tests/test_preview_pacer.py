@@ -0,0 +1,23 @@
+from services.preview_pacer import PreviewPacer
+
+
+def test_interval_follows_cpu_budget():
+    pacer = PreviewPacer(cpu_budget=0.3, min_interval_ms=15, max_interval_ms=200)
+    pacer.record_tick(12)
+    assert pacer.interval_ms() == 40
+
+
+def test_interval_is_clamped():
+    pacer = PreviewPacer(cpu_budget=0.3, min_interval_ms=15, max_interval_ms=200)
+    assert pacer.interval_ms() == 15
+    pacer.record_tick(500)
+    assert pacer.interval_ms() == 200
+
+
+def test_cost_is_smoothed_and_reset():
+    pacer = PreviewPacer(cpu_budget=0.5, min_interval_ms=1, max_interval_ms=1000)
+    pacer.record_tick(10)
+    pacer.record_tick(60)
+    assert pacer.interval_ms() == 40
+    pacer.reset()
+    assert pacer.interval_ms() == 1
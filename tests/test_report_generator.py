@@ -0,0 +1,91 @@
+import os
+import time
+import threading
+
+import pytest
+from PySide6.QtCore import QCoreApplication, QDeadlineTimer
+
+import services.report_generator as report_generator
+from services.report_generator import ReportService, render_html
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture
+def app():
+    return QCoreApplication.instance() or QCoreApplication([])
+
+
+def test_render_html_escapes_every_record_field(monkeypatch):
+    monkeypatch.chdir(ROOT_DIR)
+    record = {
+        "id": 7, "status": "<b>", "patient_name": "<script>", "patient_gender": "<i>x</i>",
+        "completed_at": "<img src=x>", "screening_type": "<u>", "patient_age": "<age>",
+    }
+    content = render_html(record, [])
+    for raw in ("<script>", "<i>x</i>", "<img src=x>", "<u>", "<age>"):
+        assert raw not in content
+    assert "&lt;i&gt;x&lt;/i&gt;" in content
+
+
+def test_export_batch_streams_with_bounded_pending(app, store, tmp_path, monkeypatch):
+    for index in range(25):
+        store.record_screening("anemia", {"name": f"Pasien {index}", "age": 30, "gender": "male"},
+                               {"detections": [], "category": "Normal"})
+
+    service = ReportService(output_dir=str(tmp_path / "reports"), max_workers=2, max_pending=3)
+    pending = {"now": 0, "max": 0}
+    lock = threading.Lock()
+
+    class CountingTask(report_generator._ReportTask):
+        def __init__(self, *args):
+            super().__init__(*args)
+            with lock:
+                pending["now"] += 1
+                pending["max"] = max(pending["max"], pending["now"])
+
+    def fake_write_report(record, output_dir, annotated=None):
+        time.sleep(0.005)
+        # Dihitung selesai sebelum slot semaphore dilepas
+        with lock:
+            pending["now"] -= 1
+        return os.path.join(output_dir, f"{record['id']}.pdf")
+
+    monkeypatch.setattr(report_generator, "_ReportTask", CountingTask)
+    monkeypatch.setattr(report_generator, "write_report", fake_write_report)
+    finished = []
+    service.batchFinished.connect(lambda batch_id, ok, failed: finished.append((batch_id, ok, failed)))
+    batch_id = service.export_batch(store.db_path, store.image_dir, "anemia")
+
+    deadline = QDeadlineTimer(10000)
+    while not finished and not deadline.hasExpired():
+        app.processEvents()
+    service.shutdown()
+    assert finished == [(batch_id, 25, 0)]
+    assert 1 <= pending["max"] <= 3
+
+
+def test_export_batch_without_matches_finishes_empty(app, store, tmp_path):
+    service = ReportService(output_dir=str(tmp_path / "reports"))
+    finished = []
+    service.batchFinished.connect(lambda batch_id, ok, failed: finished.append((ok, failed)))
+    service.export_batch(store.db_path, store.image_dir)
+    deadline = QDeadlineTimer(5000)
+    while not finished and not deadline.hasExpired():
+        app.processEvents()
+    service.shutdown()
+    assert finished == [(0, 0)]
+
+
+def test_export_batch_reports_unreadable_history(app, tmp_path):
+    service = ReportService(output_dir=str(tmp_path / "reports"))
+    events = []
+    service.reportFailed.connect(lambda tag, error: events.append(("failed", tag)))
+    service.batchFinished.connect(lambda batch_id, ok, failed: events.append(("finished", batch_id)))
+    # Direktori sebagai path database: HistoryStore gagal dibuka di thread pengumpan
+    batch_id = service.export_batch(str(tmp_path), str(tmp_path / "images"))
+    deadline = QDeadlineTimer(5000)
+    while len(events) < 2 and not deadline.hasExpired():
+        app.processEvents()
+    service.shutdown()
+    assert events == [("failed", batch_id), ("finished", batch_id)]
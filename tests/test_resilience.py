@@ -0,0 +1,110 @@
+import pytest
+import requests
+from urllib3.exceptions import MaxRetryError, NewConnectionError
+
+from services.resilience import CircuitBreaker, CircuitOpenError, RetryPolicy, is_retryable
+
+
+def http_error(status):
+    response = requests.Response()
+    response.status_code = status
+    return requests.exceptions.HTTPError(response=response)
+
+
+def connection_refused():
+    reason = NewConnectionError(None, "Connection refused")
+    return requests.exceptions.ConnectionError(MaxRetryError(None, "/api/anemia", reason))
+
+
+class Calls:
+    """fn untuk RetryPolicy: melempar error berurutan lalu mengembalikan hasil."""
+
+    def __init__(self, *outcomes):
+        self.outcomes = list(outcomes)
+        self.count = 0
+
+    def __call__(self):
+        self.count += 1
+        outcome = self.outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+
+def policy(**kwargs):
+    return RetryPolicy(max_attempts=3, base_delay=0.01, max_delay=0.01, deadline=10, **kwargs)
+
+
+def no_sleep(delay):
+    pass
+
+
+def test_breaker_opens_after_threshold_and_half_open_admits_one_trial(monkeypatch):
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=30)
+    breaker.record_failure()
+    assert breaker.allow_request()
+    breaker.record_failure()
+    assert not breaker.allow_request()
+
+    monkeypatch.setattr(breaker, "opened_at", breaker.opened_at - 31)
+    assert breaker.allow_request()
+    assert not breaker.allow_request()
+    breaker.record_success()
+    assert breaker.is_closed()
+
+
+def test_retries_count_as_one_breaker_failure():
+    breaker = CircuitBreaker(failure_threshold=3, reset_timeout=30)
+    fn = Calls(http_error(503), http_error(503), http_error(503))
+    with pytest.raises(requests.exceptions.HTTPError):
+        policy().call(fn, breaker, sleep=no_sleep)
+    assert fn.count == 3
+    assert breaker.failures == 1 and breaker.is_closed()
+
+
+def test_success_after_retry_closes_breaker():
+    breaker = CircuitBreaker(failure_threshold=3, reset_timeout=30)
+    fn = Calls(requests.exceptions.ConnectTimeout(), {"ok": True})
+    assert policy(idempotent=False).call(fn, breaker, sleep=no_sleep) == {"ok": True}
+    assert fn.count == 2 and breaker.failures == 0
+
+
+def test_client_error_in_half_open_releases_trial(monkeypatch):
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=30)
+    breaker.record_failure()
+    monkeypatch.setattr(breaker, "opened_at", breaker.opened_at - 31)
+    with pytest.raises(ValueError):
+        policy().call(Calls(ValueError("bukan JSON")), breaker, sleep=no_sleep)
+    # Dulu trial_in_flight tertinggal True dan semua request berikutnya ditolak
+    assert policy().call(Calls("hasil"), breaker, sleep=no_sleep) == "hasil"
+    assert breaker.is_closed()
+
+
+def test_http_4xx_is_not_retried_and_counts_as_healthy():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=30)
+    fn = Calls(http_error(422))
+    with pytest.raises(requests.exceptions.HTTPError):
+        policy().call(fn, breaker, sleep=no_sleep)
+    assert fn.count == 1 and breaker.is_closed()
+
+
+def test_open_breaker_rejects_without_calling():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=30)
+    breaker.record_failure()
+    fn = Calls("hasil")
+    with pytest.raises(CircuitOpenError):
+        policy().call(fn, breaker, sleep=no_sleep)
+    assert fn.count == 0
+
+
+def test_non_idempotent_post_is_not_retried_once_sent():
+    fn = Calls(requests.exceptions.ReadTimeout(), "hasil")
+    with pytest.raises(requests.exceptions.ReadTimeout):
+        policy(idempotent=False).call(fn, sleep=no_sleep)
+    assert fn.count == 1
+
+    assert not is_retryable(requests.exceptions.ConnectionError("Connection aborted."), idempotent=False)
+    assert is_retryable(connection_refused(), idempotent=False)
+    assert is_retryable(requests.exceptions.ReadTimeout(), idempotent=True)
+    assert is_retryable(http_error(503), idempotent=False)
+    assert not is_retryable(http_error(404))
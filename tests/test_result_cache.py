@@ -0,0 +1,73 @@
+import threading
+import time
+
+import numpy as np
+import pytest
+
+from services.preprocessing import frame_digest
+from services.result_cache import ResultCache, make_cache_key
+
+
+def test_cache_key_depends_on_capture_and_type():
+    first = frame_digest(np.zeros((4, 4, 3), np.uint8))
+    second = frame_digest(np.ones((4, 4, 3), np.uint8))
+    assert make_cache_key(first, "anemia") == make_cache_key(first, "anemia")
+    assert make_cache_key(first, "anemia") != make_cache_key(second, "anemia")
+    assert make_cache_key(first, "anemia") != make_cache_key(first, "malnutrisi")
+
+
+def test_get_or_compute_miss_then_hit_returns_copies():
+    cache = ResultCache()
+    result, source = cache.get_or_compute("k", lambda: {"detections": []})
+    assert source == "miss"
+    result["detections"].append("changed")
+    again, source = cache.get_or_compute("k", lambda: pytest.fail("tidak boleh dihitung ulang"))
+    assert source == "hit"
+    assert again == {"detections": []}
+
+
+def test_entries_expire_after_ttl():
+    cache = ResultCache(ttl=0.01)
+    cache.put("k", {"x": 1})
+    time.sleep(0.02)
+    assert cache.get("k") is None
+
+
+def test_lru_evicts_oldest():
+    cache = ResultCache(max_entries=2)
+    cache.put("a", {})
+    cache.put("b", {})
+    cache.get("a")
+    cache.put("c", {})
+    assert cache.get("b") is None
+    assert cache.get("a") == {} and cache.get("c") == {}
+
+
+def test_errors_are_not_cached():
+    cache = ResultCache()
+    with pytest.raises(RuntimeError):
+        cache.get_or_compute("k", lambda: (_ for _ in ()).throw(RuntimeError("gagal")))
+    assert cache.get_or_compute("k", lambda: {"ok": True}) == ({"ok": True}, "miss")
+
+
+def test_concurrent_requests_are_coalesced():
+    cache = ResultCache()
+    calls = []
+    release = threading.Event()
+
+    def compute():
+        calls.append(1)
+        release.wait(1)
+        return {"ok": True}
+
+    sources = []
+    threads = [threading.Thread(target=lambda: sources.append(cache.get_or_compute("k", compute)[1]))
+               for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    time.sleep(0.05)
+    release.set()
+    for thread in threads:
+        thread.join()
+    assert len(calls) == 1
+    assert sorted(sources) == ["coalesced"] * 3 + ["miss"]
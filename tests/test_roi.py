@@ -0,0 +1,35 @@
+import numpy as np
+
+from services.roi import crop_circle, crop_to_roi, guide_region
+
+
+def test_crop_circle_never_writes_into_source_frame():
+    frame = np.full((100, 100, 3), 200, np.uint8)
+    # Irisan selebar frame: contiguous, dulu berbagi memori dengan frame
+    cropped = crop_circle(frame, 50, 50, 60)
+    assert not np.shares_memory(cropped, frame)
+    assert (frame == 200).all()
+    assert cropped[0, 0].sum() == 0 and cropped[50, 50].sum() > 0
+
+
+def test_rect_guide_crop_uses_relative_region():
+    frame = np.zeros((100, 200, 3), np.uint8)
+    kind, x, y, w, h = guide_region("anemia", 200, 100)
+    assert kind == "rect"
+    assert crop_to_roi(frame, "anemia").shape == (h, w, 3)
+
+
+def test_unknown_type_returns_frame_unchanged():
+    frame = np.zeros((10, 10, 3), np.uint8)
+    assert crop_to_roi(frame, "unknown") is frame
+
+
+def test_reference_patch_box_maps_into_guide_region(monkeypatch):
+    import services.roi as roi
+    monkeypatch.setattr(roi, "PREPROCESSING_PIPELINES", {
+        "anemia": [{"stage": "white_balance", "method": "reference_patch", "patch": (0.1, 0.1, 0.2, 0.2)}],
+    })
+    monkeypatch.setattr(roi, "ROI_GUIDES", {"anemia": {"shape": "rect", "rect": (0.5, 0.5, 0.5, 0.5)}})
+    # Patch relatif terhadap gambar hasil crop, bukan frame preview penuh
+    assert roi.reference_patch_region("anemia", 200, 100) == (110, 55, 20, 10)
+    assert roi.reference_patch_region("malnutrisi", 200, 100) is None
@@ -0,0 +1,81 @@
+import threading
+
+import pytest
+
+from services.history_store import HistoryStore
+from services.sync_engine import SyncEngine
+from tools.stub_server import start_in_background
+
+PATIENT = {"name": "Siti", "age": 41, "gender": "female"}
+RESULT = {"detections": [], "category": "Normal"}
+
+
+@pytest.fixture
+def server():
+    server, url = start_in_background()
+    yield server, url
+    server.shutdown()
+    server.server_close()
+
+
+def make_engine(store, url):
+    return SyncEngine(store, endpoint=f"{url}/api/sync", batch_size=2, max_bytes_per_sec=0, timeout=5)
+
+
+def test_sync_sends_only_deltas(server, store):
+    stub, url = server
+    for _ in range(5):
+        store.record_screening("anemia", PATIENT, RESULT)
+    engine = make_engine(store, url)
+
+    stats = engine.sync_once()
+    assert (stats["batches"], stats["records"], stats["pending"]) == (3, 5, 0)
+    assert engine.sync_once()["records"] == 0
+
+    record_id = store.record_screening("malnutrisi", PATIENT, RESULT)
+    store.set_result_image(record_id, "/tmp/anotasi.jpg")
+    stats = engine.sync_once()
+    # Catatan baru yang langsung diubah hanya dikirim sekali, dengan versi terakhirnya
+    assert (stats["batches"], stats["records"]) == (1, 1)
+    assert stub.state.stats()["records"] == 6
+
+
+def test_resent_batches_are_deduplicated_by_idempotency_key(server, store):
+    stub, url = server
+    for _ in range(4):
+        store.record_screening("anemia", PATIENT, RESULT)
+    engine = make_engine(store, url)
+    engine.sync_once()
+
+    # Checkpoint hilang (mis. crash sebelum tersimpan): batch yang sama dikirim ulang
+    store.set_sync_state(SyncEngine.CHECKPOINT_KEY, 0)
+    engine.sync_once()
+    stats = stub.state.stats()
+    assert stats["batches"] == 2
+    assert stats["duplicate_batches"] == 2
+    assert stats["records"] == 4
+
+
+def test_sync_versions_unique_across_connections(store):
+    errors = []
+
+    def writer():
+        writer_store = HistoryStore(store.db_path, store.image_dir)
+        try:
+            for _ in range(50):
+                writer_store.record_screening("anemia", PATIENT, RESULT)
+        except Exception as e:
+            errors.append(e)
+        finally:
+            writer_store.close()
+
+    threads = [threading.Thread(target=writer) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    versions = [row[0] for row in store.conn.execute("SELECT sync_version FROM screenings")]
+    assert not errors
+    assert len(versions) == 150
+    assert len(set(versions)) == 150
@@ -0,0 +1,34 @@
+import os
+
+from services.thumbnailer import prune_cache
+
+
+def make_file(directory, name, size, mtime):
+    path = os.path.join(directory, name)
+    with open(path, "wb") as f:
+        f.write(b"x" * size)
+    os.utime(path, (mtime, mtime))
+    return path
+
+
+def test_prune_removes_expired_then_oldest_until_under_limit(tmp_path):
+    now = 1_000_000
+    subdir = tmp_path / "ab"
+    subdir.mkdir()
+    expired = make_file(subdir, "expired.png", 10, now - 1000)
+    oldest = make_file(subdir, "oldest.png", 40, now - 300)
+    middle = make_file(tmp_path, "middle.png", 40, now - 200)
+    newest = make_file(tmp_path, "newest.png", 40, now - 100)
+
+    removed = prune_cache(str(tmp_path), max_bytes=80, max_age_seconds=500, now=now)
+
+    assert removed == 2
+    assert not os.path.exists(expired) and not os.path.exists(oldest)
+    assert os.path.exists(middle) and os.path.exists(newest)
+
+
+def test_prune_keeps_everything_under_limits(tmp_path):
+    now = 1_000_000
+    paths = [make_file(tmp_path, f"{i}.png", 10, now - i) for i in range(5)]
+    assert prune_cache(str(tmp_path), max_bytes=1000, max_age_seconds=500, now=now) == 0
+    assert all(os.path.exists(path) for path in paths)
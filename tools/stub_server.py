@@ -0,0 +1,167 @@
+"""Server pengganti lokal untuk API MedScan (pengembangan dan pengujian).
+
+Endpoint:
+    POST /api/<jenis_screening>  hasil deteksi tiruan (multipart seperti ApiWorker)
+    POST /api/sync               menerima batch sinkronisasi JSON gzip
+    GET  /api/sync/stats         jumlah batch/catatan yang sudah diterima
+    GET  /api/health             cek kesehatan
+
+Contoh:
+    python tools/stub_server.py --port 8765 --latency 0.5
+    MEDSCAN_API_BASE_URL=http://127.0.0.1:8765 python main.py
+"""
+import gzip
+import json
+import time
+import random
+import argparse
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+DETECTIONS = {
+    "diabetic_retinopathy": ("Diabetic Retinopathy", [0.18, 0.22, 0.46, 0.5]),
+    "anemia": ("Anemia", [0.25, 0.3, 0.6, 0.65]),
+    "malnutrisi": ("Malnutrisi", [0.2, 0.15, 0.8, 0.9]),
+}
+
+
+class StubState:
+    def __init__(self, latency=0.0, fail_rate=0.0):
+        self.latency = latency
+        self.fail_rate = fail_rate
+        self.records = {}
+        self.idempotency = {}
+        self.batches = 0
+        self.duplicate_batches = 0
+        self.bytes_received = 0
+        self.lock = threading.Lock()
+
+    def stats(self):
+        with self.lock:
+            return {
+                "batches": self.batches,
+                "duplicate_batches": self.duplicate_batches,
+                "records": len(self.records),
+                "bytes_received": self.bytes_received,
+            }
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    server_version = "MedScanStub/1.0"
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    @property
+    def state(self):
+        return self.server.state
+
+    def send_json(self, status, payload):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def read_body(self):
+        length = int(self.headers.get("Content-Length", 0))
+        return self.rfile.read(length) if length else b""
+
+    def should_fail(self):
+        return self.state.fail_rate and random.random() < self.state.fail_rate
+
+    def do_GET(self):
+        if self.path == "/api/health":
+            self.send_json(200, {"status": "ok"})
+        elif self.path == "/api/sync/stats":
+            self.send_json(200, self.state.stats())
+        else:
+            self.send_json(404, {"error": "not found"})
+
+    def do_POST(self):
+        body = self.read_body()
+        if self.should_fail():
+            self.send_json(503, {"error": "simulated failure"})
+            return
+        if self.path == "/api/sync":
+            self.handle_sync(body)
+            return
+
+        screening_type = self.path.rsplit("/", 1)[-1]
+        if screening_type not in DETECTIONS:
+            self.send_json(404, {"error": f"unknown screening type {screening_type}"})
+            return
+        time.sleep(self.state.latency)
+        category, box = DETECTIONS[screening_type]
+        self.send_json(200, {
+            "detections": [{"class": 1, "conf": 0.87, "box": box}],
+            "category": category,
+            "user": {},
+        })
+
+    def handle_sync(self, body):
+        key = self.headers.get("Idempotency-Key")
+        with self.state.lock:
+            if key and key in self.state.idempotency:
+                self.state.duplicate_batches += 1
+                self.send_json(200, self.state.idempotency[key])
+                return
+        try:
+            if self.headers.get("Content-Encoding") == "gzip":
+                body = gzip.decompress(body)
+            payload = json.loads(body)
+        except (OSError, ValueError):
+            self.send_json(400, {"error": "invalid payload"})
+            return
+
+        with self.state.lock:
+            device_id = payload.get("device_id")
+            for record in payload.get("records", []):
+                self.state.records[(device_id, record.get("record_uid"))] = record
+            self.state.batches += 1
+            self.state.bytes_received += len(body)
+            response = {"accepted": len(payload.get("records", [])), "to_version": payload.get("to_version")}
+            if key:
+                self.state.idempotency[key] = response
+        self.send_json(200, response)
+
+
+def make_server(host="127.0.0.1", port=0, latency=0.0, fail_rate=0.0, verbose=False):
+    server = ThreadingHTTPServer((host, port), StubHandler)
+    server.daemon_threads = True
+    server.state = StubState(latency, fail_rate)
+    server.verbose = verbose
+    return server
+
+
+def start_in_background(**kwargs):
+    """Menjalankan server di thread daemon, mengembalikan (server, base_url)."""
+    server = make_server(**kwargs)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    host, port = server.server_address[:2]
+    return server, f"http://{host}:{port}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.3, help="jeda respons analisis (detik)")
+    parser.add_argument("--fail-rate", type=float, default=0.0, help="fraksi request yang dijawab HTTP 503")
+    parser.add_argument("--verbose", action="store_true")
+    args = parser.parse_args()
+
+    server = make_server(args.host, args.port, args.latency, args.fail_rate, args.verbose)
+    print(f"Stub server MedScan berjalan di http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()